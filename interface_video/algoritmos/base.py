@@ -0,0 +1,179 @@
+# base.py
+import cv2
+import numpy as np
+
+from algoritmos.frame_format import annotation_color
+
+
+class Detections:
+    """
+    Resultado compacto de uma detecção, baseado em arrays:
+      boxes     -> N×4 int32 no formato (x, y, largura, altura)
+      scores    -> N float32 (1.0 para detectores sem confiança, como as cascatas)
+      track_ids -> N int32 opcional, preenchido pelo modo rastreamento
+    """
+
+    __slots__ = ("boxes", "scores", "track_ids")
+
+    def __init__(self, boxes=None, scores=None, track_ids=None):
+        if boxes is None:
+            self.boxes = np.zeros((0, 4), dtype=np.int32)
+        else:
+            self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        if scores is None:
+            self.scores = np.ones(len(self.boxes), dtype=np.float32)
+        else:
+            self.scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        self.track_ids = None if track_ids is None else np.asarray(track_ids, dtype=np.int32).reshape(-1)
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __repr__(self):
+        return f"Detections(n={len(self)})"
+
+    @classmethod
+    def concatenate(cls, items):
+        items = [item for item in items if len(item)]
+        if not items:
+            return cls()
+        track_ids = None
+        if all(item.track_ids is not None for item in items):
+            track_ids = np.concatenate([item.track_ids for item in items])
+        return cls(np.concatenate([item.boxes for item in items]),
+                   np.concatenate([item.scores for item in items]),
+                   track_ids)
+
+    def select(self, index):
+        """Subconjunto por máscara booleana ou índices."""
+        track_ids = None if self.track_ids is None else self.track_ids[index]
+        return Detections(self.boxes[index], self.scores[index], track_ids)
+
+    def scaled(self, scale_x, scale_y):
+        """Caixas reescaladas, p. ex. da resolução de detecção para a de exibição."""
+        factors = np.array([scale_x, scale_y, scale_x, scale_y], dtype=np.float32)
+        return Detections(np.rint(self.boxes * factors), self.scores, self.track_ids)
+
+    def offset(self, dx, dy):
+        """Caixas deslocadas, p. ex. de coordenadas de um recorte para as do frame."""
+        return Detections(self.boxes + np.array([dx, dy, 0, 0], dtype=np.int32), self.scores, self.track_ids)
+
+    def to_faces_data(self):
+        """Lista de dicts no formato antigo ('bbox', 'confidence'), útil para logs e depuração."""
+        return [{"bbox": tuple(int(v) for v in box), "confidence": float(score)}
+                for box, score in zip(self.boxes, self.scores)]
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """IoU entre todas as caixas (x, y, w, h) de A (N) e B (M), retorna N×M."""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(1, -1, 4)
+    inter_w = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    inter_h = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - inter
+    return inter / np.maximum(union, 1e-6)
+
+
+def nms(boxes, scores, iou_threshold=0.45):
+    """
+    Supressão de não-máximos gulosa sobre caixas (x, y, w, h).
+    Retorna os índices mantidos, do maior para o menor score. Cada iteração
+    compara a melhor caixa restante com todas as outras de uma vez.
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    order = np.argsort(np.asarray(scores, dtype=np.float32))[::-1]
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        if order.size == 1:
+            break
+        overlap = iou_matrix(boxes[best], boxes[order[1:]])[0]
+        order = order[1:][overlap <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def draw_detections(frame, detections, label, color=(0, 255, 0), show_scores=True, identities=None):
+    """Desenha caixas e rótulos no próprio frame; 'identities' ((nome ou None, semelhança) por face) substitui o rótulo."""
+    color = annotation_color(color, frame)
+    for i, (x, y, w, h) in enumerate(detections.boxes.tolist()):
+        text = label
+        if show_scores:
+            text = f"{text}: {detections.scores[i]:.2f}"
+        if identities is not None:
+            identity, similarity = identities[i]
+            text = f"{identity} ({similarity:.2f})" if identity else "Desconhecido"
+        if detections.track_ids is not None:
+            text = f"{text} #{detections.track_ids[i]}"
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(frame, text, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+
+
+class FaceDetector:
+    """
+    Interface comum dos detectores.
+    As subclasses implementam apenas detect(), que não desenha nada no frame.
+    A anotação fica num estágio separado (veja annotation.Annotator) e pode ser desligada.
+    """
+
+    # Formato de pixel preferido; a câmera pode entregá-lo diretamente.
+    input_format = "BGR"
+    # Rótulo e cor usados na anotação.
+    label = "Face"
+    color = (0, 255, 0)
+    # False para detectores que não produzem confiança (a anotação omite o valor).
+    has_scores = True
+    # True quando detect_batch() roda vários frames numa única inferência.
+    supports_batch = False
+
+    @property
+    def algorithm_name(self):
+        return self.__class__.__name__
+
+    def detect(self, frame, frame_format="BGR"):
+        """Retorna um Detections com as faces encontradas no frame."""
+        raise NotImplementedError
+
+    def detect_cached(self, cache):
+        """
+        Detecta a partir de um preprocessing.FrameCache, reaproveitando conversões já feitas no frame
+        por outros detectores. O padrão ignora o cache; detectores que convertem o frame o sobrescrevem.
+        """
+        return self.detect(cache.frame, cache.frame_format)
+
+    def detect_batch(self, frames, frame_formats):
+        """Detecta em vários frames de uma vez, um Detections por frame. O padrão chama detect() para cada um."""
+        return [self.detect(frame, frame_format) for frame, frame_format in zip(frames, frame_formats)]
+
+    def new_context(self):
+        """
+        Instância para outra thread de detecção (veja detector_pool.DetectorPool), que compartilha
+        com esta os pesos imutáveis e tem o próprio estado de inferência (entrada da rede, buffers).
+        Retorna None quando o detector não separa os dois; o pool então carrega uma instância nova.
+        """
+        return None
+
+    def annotate(self, frame, detections):
+        draw_detections(frame, detections, self.label, self.color, self.has_scores)
+
+    def process_frame(self, frame, frame_format="BGR"):
+        """Compatibilidade: detecta e desenha no próprio frame, retornando (frame, detections)."""
+        detections = self.detect(frame, frame_format)
+        self.annotate(frame, detections)
+        return frame, detections
+
+
+class DetectorWrapper(FaceDetector):
+    """Base para estágios que envolvem outro detector (rastreamento, porteiro de movimento...)."""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.input_format = detector.input_format
+        self.label = detector.label
+        self.color = detector.color
+        self.has_scores = detector.has_scores
+
+    @property
+    def algorithm_name(self):
+        return self.detector.algorithm_name
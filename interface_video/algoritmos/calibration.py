@@ -0,0 +1,40 @@
+# calibration.py
+# Frames representativos para calibrar a quantização INT8 dos modelos neurais.
+import glob
+import os
+
+import cv2
+
+from config import QUANT_CALIBRATION_SOURCE, QUANT_CALIBRATION_FRAMES
+
+IMAGE_EXTENSIONS = ("*.jpg", "*.jpeg", "*.png", "*.bmp")
+
+
+def load_calibration_frames(source=QUANT_CALIBRATION_SOURCE, count=QUANT_CALIBRATION_FRAMES):
+    """
+    Lê até 'count' frames BGR de um vídeo ou de um diretório de imagens,
+    espaçados ao longo da fonte para cobrir cenas diferentes.
+    """
+    if os.path.isdir(source):
+        paths = sorted(p for pattern in IMAGE_EXTENSIONS for p in glob.glob(os.path.join(source, pattern)))
+        step = max(1, len(paths) // count)
+        frames = [cv2.imread(path) for path in paths[::step][:count]]
+        frames = [frame for frame in frames if frame is not None]
+    else:
+        capture = cv2.VideoCapture(source)
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+        step = max(1, total // count)
+        frames = []
+        for index in range(0, total, step):
+            capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ret, frame = capture.read()
+            if not ret:
+                break
+            frames.append(frame)
+            if len(frames) == count:
+                break
+        capture.release()
+
+    if not frames:
+        raise IOError(f"Nenhum frame de calibração em '{source}'.")
+    return frames
@@ -0,0 +1,91 @@
+# cascade.py
+# Base das cascatas do OpenCV (Viola-Jones e LBP), com detecção em imagem reduzida e
+# tamanhos mínimo/máximo de face calculados a partir da geometria da cena.
+import math
+
+import cv2
+from algoritmos.base import FaceDetector, Detections
+from algoritmos.preprocessing import FrameCache
+from config import (CAMERA_HFOV_DEGREES, FACE_WIDTH_M, FACE_MIN_DISTANCE_M, FACE_MAX_DISTANCE_M,
+                    CASCADE_MIN_FACE_PX, CASCADE_DOWNSCALE)
+
+
+def face_size_fraction(hfov_degrees=CAMERA_HFOV_DEGREES, face_width_m=FACE_WIDTH_M,
+                       min_distance_m=FACE_MIN_DISTANCE_M, max_distance_m=FACE_MAX_DISTANCE_M):
+    """
+    Largura da face como fração da largura da imagem, para a pessoa mais distante (menor face)
+    e a mais próxima (maior face). A uma distância d a imagem cobre 2·d·tan(fov/2) metros.
+    """
+    half_fov = math.tan(math.radians(hfov_degrees) / 2)
+    return face_width_m / (2 * max_distance_m * half_fov), face_width_m / (2 * min_distance_m * half_fov)
+
+
+class CascadeFaceDetector(FaceDetector):
+    """
+    detectMultiScale sobre a luminância, reduzida até a menor face esperada ficar com 'min_face_px'
+    pixels (a janela das cascatas tem 24 px; faces maiores que isso só custam mais níveis de pirâmide).
+    As caixas voltam para a resolução do frame. A luminância e a imagem reduzida vêm de um FrameCache,
+    compartilhado quando mais de uma cascata roda no mesmo frame.
+
+    A imagem nunca é ampliada: se nela a menor face esperada já tem menos de 'min_face_px' pixels,
+    o minSize fica em 'min_face_px' e as faces mais distantes que isso não são encontradas (aviso
+    uma vez). min_input_width diz a largura necessária; a câmera pede o 'lores' com ela (main.py).
+    """
+
+    input_format = "GRAY"
+    has_scores = False
+
+    def __init__(self, cascade_path, scale_factor, min_neighbors, downscale=CASCADE_DOWNSCALE,
+                 min_face_px=CASCADE_MIN_FACE_PX, face_fraction=None):
+        self.face_cascade = cv2.CascadeClassifier(cascade_path)
+        if self.face_cascade.empty():
+            raise IOError(f"Não foi possível carregar o arquivo do classificador {self.label}: {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.downscale = downscale
+        self.min_face_px = min_face_px
+        self.face_fraction = face_fraction or face_size_fraction()
+        self._clamp_warned = False
+
+    @property
+    def min_input_width(self):
+        """Largura de imagem em que a menor face esperada (FACE_MAX_DISTANCE_M) tem 'min_face_px' pixels."""
+        return math.ceil(self.min_face_px / self.face_fraction[0])
+
+    def detection_scale(self, width):
+        """Fator de redução para uma imagem de 'width' pixels (1.0 quando já é pequena o bastante)."""
+        if not self.downscale:
+            return 1.0
+        return min(1.0, self.min_face_px / (width * self.face_fraction[0]))
+
+    def detect(self, frame, frame_format="BGR"):
+        return self.detect_cached(FrameCache(frame, frame_format))
+
+    def detect_cached(self, cache):
+        gray = cache.gray()
+        # Os tamanhos de face são frações da largura do frame da câmera, não da imagem recebida,
+        # que pode ser um recorte (um recorte de 150 px limitaria as faces a ~48 px).
+        scale = self.detection_scale(cache.reference_width)
+        small = cache.gray_scaled(scale)
+
+        width = cache.reference_width * scale
+        if width * self.face_fraction[0] < self.min_face_px and not self._clamp_warned:
+            # Frame estreito demais para a geometria configurada: minSize fica limitado à janela.
+            self._clamp_warned = True
+            print(f"{self.label}: a {cache.reference_width} px a face mais distante teria "
+                  f"{width * self.face_fraction[0]:.0f} px, abaixo de {self.min_face_px} px; faces menores "
+                  f"não serão encontradas (são necessários {self.min_input_width} px de largura).")
+        min_size = max(self.min_face_px, int(width * self.face_fraction[0]))
+        if min_size > min(small.shape[:2]):
+            # Recorte menor que a menor face esperada.
+            return Detections()
+        max_size = max(min_size, min(int(width * self.face_fraction[1]) + 1, small.shape[0], small.shape[1]))
+        faces = self.face_cascade.detectMultiScale(small, scaleFactor=self.scale_factor,
+                                                   minNeighbors=self.min_neighbors,
+                                                   minSize=(min_size, min_size), maxSize=(max_size, max_size))
+
+        # detectMultiScale já retorna um array N×4 (ou uma tupla vazia)
+        detections = Detections(faces if len(faces) else None)
+        if small is not gray:
+            detections = detections.scaled(gray.shape[1] / small.shape[1], gray.shape[0] / small.shape[0])
+        return detections
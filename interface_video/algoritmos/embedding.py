@@ -0,0 +1,138 @@
+# embedding.py
+# Descritores de face (embeddings) para o reconhecimento: um vetor por face, normalizado (norma 1),
+# para que a semelhança entre duas faces seja um produto escalar.
+import copy
+import importlib
+
+import cv2
+import numpy as np
+from algoritmos.frame_format import to_bgr, to_rgb
+from config import EMBEDDING_ONNX_MODEL, EMBEDDING_ONNX_INPUT_SIZE
+
+
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+class FaceEmbedder:
+    """
+    Interface comum dos extratores de descritor.
+    embed() recebe o frame inteiro e as caixas (x, y, w, h) e devolve uma matriz N×dimension float32
+    com linhas de norma 1, calculada numa única chamada ao modelo sempre que o backend permite.
+    """
+
+    name = None
+    dimension = None
+    # Semelhança (cosseno) mínima para duas faces serem da mesma pessoa.
+    default_threshold = 0.5
+
+    def embed(self, frame, frame_format, boxes):
+        raise NotImplementedError
+
+    def new_context(self):
+        """Como FaceDetector.new_context(): contexto com os pesos compartilhados, ou None."""
+        return None
+
+
+class DlibFaceEmbedder(FaceEmbedder):
+    """ResNet do dlib (128 dimensões), com os 5 pontos faciais para alinhar cada face."""
+
+    name = "dlib"
+    dimension = 128
+    # Distância euclidiana 0,6 (limiar do dlib) entre vetores de norma 1 equivale a cosseno 0,82.
+    default_threshold = 0.82
+
+    def __init__(self, shape_predictor_path='arquivos_algoritmos/dlib/shape_predictor_5_face_landmarks.dat',
+                 model_path='arquivos_algoritmos/dlib/dlib_face_recognition_resnet_model_v1.dat'):
+        import dlib
+        self._dlib = dlib
+        self.shape_predictor = dlib.shape_predictor(shape_predictor_path)
+        self.model = dlib.face_recognition_model_v1(model_path)
+
+    def embed(self, frame, frame_format, boxes):
+        if not len(boxes):
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        rgb = np.ascontiguousarray(to_rgb(frame, frame_format))
+        shapes = self._dlib.full_object_detections()
+        for x, y, w, h in np.asarray(boxes).tolist():
+            shapes.append(self.shape_predictor(rgb, self._dlib.rectangle(x, y, x + w, y + h)))
+        # Uma chamada para todas as faces do frame.
+        return normalize_rows(self.model.compute_face_descriptor(rgb, shapes))
+
+
+class ONNXFaceEmbedder(FaceEmbedder):
+    """
+    Modelo de descritor em ONNX no estilo ArcFace/MobileFaceNet: entrada RGB quadrada
+    (112×112 por padrão) normalizada para [-1, 1]; a saída é N×dimensão.
+    Os recortes são quadrados em volta da caixa, sem alinhamento por pontos faciais.
+    """
+
+    name = "onnx"
+    default_threshold = 0.35
+
+    def __init__(self, model_path=EMBEDDING_ONNX_MODEL, input_size=EMBEDDING_ONNX_INPUT_SIZE, margin=0.2):
+        self.model_path = model_path
+        self.input_size = (input_size, input_size)
+        self.margin = margin
+        # onnxruntime só é importado quando este extrator é usado; sem ele, cv2.dnn.
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            ort = None
+        if ort is not None:
+            self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+            self.input_name = self.session.get_inputs()[0].name
+            self.net = None
+        else:
+            self.session = None
+            self.net = cv2.dnn.readNetFromONNX(model_path)
+        # Dimensão descoberta na primeira chamada (depende do modelo).
+        self.dimension = None
+
+    def new_context(self):
+        # A sessão do onnxruntime é compartilhável entre threads; o cv2.dnn.Net guarda a entrada.
+        if self.session is not None:
+            return self
+        context = copy.copy(self)
+        context.net = cv2.dnn.readNetFromONNX(self.model_path)
+        return context
+
+    def _crops(self, bgr, boxes):
+        frame_h, frame_w = bgr.shape[:2]
+        crops = []
+        for x, y, w, h in np.asarray(boxes).tolist():
+            side = int(max(w, h) * (1 + self.margin))
+            x0 = min(max(0, x + w // 2 - side // 2), max(0, frame_w - side))
+            y0 = min(max(0, y + h // 2 - side // 2), max(0, frame_h - side))
+            crops.append(bgr[y0:y0 + side, x0:x0 + side])
+        return crops
+
+    def embed(self, frame, frame_format, boxes):
+        if not len(boxes):
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        # Todos os recortes num único blob NCHW: uma inferência por frame, não por face.
+        blob = cv2.dnn.blobFromImages(self._crops(to_bgr(frame, frame_format), boxes), 1 / 127.5,
+                                      self.input_size, (127.5, 127.5, 127.5), swapRB=True)
+        if self.session is not None:
+            output = self.session.run(None, {self.input_name: blob})[0]
+        else:
+            self.net.setInput(blob)
+            output = self.net.forward()
+        embeddings = normalize_rows(output.reshape(len(blob), -1))
+        self.dimension = embeddings.shape[1]
+        return embeddings
+
+
+# nome -> (módulo, classe), como os detectores em registry.py.
+EMBEDDERS = {
+    "dlib": ("algoritmos.embedding", "DlibFaceEmbedder"),
+    "onnx": ("algoritmos.embedding", "ONNXFaceEmbedder"),
+}
+
+
+def create_embedder(name, **kwargs):
+    if name not in EMBEDDERS:
+        raise ValueError(f"Extrator de descritor desconhecido: '{name}'. Disponíveis: {', '.join(EMBEDDERS)}")
+    module_name, class_name = EMBEDDERS[name]
+    return getattr(importlib.import_module(module_name), class_name)(**kwargs)
@@ -1,51 +1,53 @@
 # face_recognition_blazeface.py
-import cv2
 import mediapipe as mp
+import numpy as np
+from algoritmos.base import FaceDetector, Detections
+from algoritmos.preprocessing import FrameCache
+from algoritmos.registry import register_detector
 
-class BlazeFaceDetector:
+@register_detector("blazeface")
+class BlazeFaceDetector(FaceDetector):
 
-    def __init__(self):
+    # O MediaPipe trabalha em RGB; pedir RGB à câmera evita a conversão por frame.
+    input_format = "RGB"
+    label = "BlazeFace"
+    color = (255, 0, 255)
+
+    def __init__(self, margin=0.4):
         # Inicializa a solução de detecção de rostos do MediaPipe.
         self.mp_face_detection = mp.solutions.face_detection
         self.face_detection = self.mp_face_detection.FaceDetection(
             min_detection_confidence=0.5)
+        # Margem adicionada à caixa do BlazeFace, que é justa ao rosto (40%)
+        self.margin = margin
+
+    def detect(self, frame, frame_format="BGR"):
+        return self.detect_cached(FrameCache(frame, frame_format))
 
-    def process_frame(self, frame):
-        # A biblioteca MediaPipe espera imagens no formato RGB.
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def detect_cached(self, cache):
+        # A biblioteca MediaPipe espera imagens no formato RGB (convertido uma vez por frame).
+        frame_rgb = cache.rgb()
 
         # Processa o frame para detecção.
         results = self.face_detection.process(frame_rgb)
-
-        faces_data = []
-        if results.detections:
-            for detection in results.detections:
-                confidence = detection.score[0]
-                bboxC = detection.location_data.relative_bounding_box
-                ih, iw, _ = frame.shape
-
-                # Converte as coordenadas normalizadas para pixels.
-                x, y, w, h = int(bboxC.xmin * iw), int(bboxC.ymin * ih), int(bboxC.width * iw), int(bboxC.height * ih)
-                
-                margin = 0.4  # 40%
-            
-                # Calcular o novo tamanho e posição da caixa
-                new_w = int(w * (1 + margin))
-                new_h = int(h * (1 + margin))
-                new_x = x - int((new_w - w) / 2)
-                new_y = y - int((new_h - h) / 2)
-                
-                # Garantir que a bounding box não saia do frame
-                new_x = max(0, new_x)
-                new_y = max(0, new_y)
-                new_w = min(iw - new_x, new_w)
-                new_h = min(ih - new_y, new_h)
-
-                faces_data.append({"bbox": (new_x, new_y, new_w, new_h), "confidence": confidence})
-
-                # Desenhar o novo bounding box com a margem
-                cv2.rectangle(frame, (new_x, new_y), (new_x + new_w, new_y + new_h), (255, 0, 255), 2)
-                text = f"BlazeFace: {confidence:.2f}"
-                cv2.putText(frame, text, (new_x, new_y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 2)
-
-        return frame, faces_data
\ No newline at end of file
+        if not results.detections:
+            return Detections()
+
+        ih, iw = frame_rgb.shape[:2]
+        relative = np.array([(d.location_data.relative_bounding_box.xmin,
+                              d.location_data.relative_bounding_box.ymin,
+                              d.location_data.relative_bounding_box.width,
+                              d.location_data.relative_bounding_box.height) for d in results.detections],
+                            dtype=np.float32)
+        scores = np.array([d.score[0] for d in results.detections], dtype=np.float32)
+
+        # Converte as coordenadas normalizadas para pixels e aplica a margem
+        boxes = relative * np.array([iw, ih, iw, ih], dtype=np.float32)
+        new_wh = boxes[:, 2:] * (1 + self.margin)
+        new_xy = boxes[:, :2] - (new_wh - boxes[:, 2:]) / 2
+
+        # Garantir que a bounding box não saia do frame
+        new_xy = np.maximum(new_xy, 0)
+        new_wh = np.minimum(np.array([iw, ih], dtype=np.float32) - new_xy, new_wh)
+
+        return Detections(np.hstack([new_xy, new_wh]).astype(np.int32), scores)
@@ -1,16 +1,27 @@
-import cv2
 import dlib 
+from algoritmos.base import FaceDetector, Detections
+from algoritmos.preprocessing import FrameCache
+from algoritmos.registry import register_detector
 
-class DLIBFaceRecognizer:
+@register_detector("hog")
+class DLIBFaceRecognizer(FaceDetector):
+
+    input_format = "GRAY"
+    label = "HOG"
+    color = (255, 0, 0)
+    has_scores = False
    
     def __init__(self):
         # O dlib já vem com um detector de faces frontais pré-treinado.
         # Não é necessário um arquivo .xml como no Haar Cascades.
         self.detector = dlib.get_frontal_face_detector()
 
-    def process_frame(self, frame):
-        # Converte para escala de cinza
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def detect(self, frame, frame_format="BGR"):
+        return self.detect_cached(FrameCache(frame, frame_format))
+
+    def detect_cached(self, cache):
+        # Escala de cinza (reaproveitada se outro detector já converteu este frame)
+        gray_frame = cache.gray()
         
         # O detector do dlib retorna uma lista de retângulos (faces)
         # O '1' no parâmetro 'upsample_num_times' instrui o detector a
@@ -19,21 +30,7 @@ class DLIBFaceRecognizer:
         # você pode começar com 0.
         faces = self.detector(gray_frame, 0)
 
-        faces_data = []
-        for face_rect in faces:
-            # O dlib retorna um objeto 'dlib.rectangle'.
-            # Precisamos extrair as coordenadas (x, y, largura, altura).
-            x1, y1 = face_rect.left(), face_rect.top()
-            x2, y2 = face_rect.right(), face_rect.bottom()
-            width, height = x2 - x1, y2 - y1
-            
-            # Adiciona os dados à lista de retorno
-            faces_data.append({"bbox": (x1, y1, width, height)})
-
-            # Desenha o bounding box no frame original
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
-            
-            # Adiciona o texto do algoritmo para identificação visual
-            cv2.putText(frame, "HOG", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
-        
-        return frame, faces_data
\ No newline at end of file
+        # O dlib retorna objetos 'dlib.rectangle'.
+        # Precisamos extrair as coordenadas (x, y, largura, altura).
+        boxes = [(r.left(), r.top(), r.right() - r.left(), r.bottom() - r.top()) for r in faces]
+        return Detections(boxes if boxes else None)
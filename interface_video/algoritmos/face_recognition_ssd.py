@@ -1,52 +1,119 @@
 # face_recognition_ssd.py
+import copy
+
 import cv2
 import numpy as np
+from algoritmos.base import FaceDetector, Detections
+from algoritmos.frame_format import to_bgr
+from algoritmos.registry import register_detector
+from algoritmos.calibration import load_calibration_frames
+from algoritmos.preprocessing import FrameCache
+from config import SSD_PRECISION, SSD_INPUT_SIZE
+
+# Pesos de cada precisão. O int8 parte dos pesos fp32 e é quantizado ao carregar.
+SSD_MODELS = {
+    "fp32": 'arquivos_algoritmos/ssd/res10_300x300_ssd_iter_140000.caffemodel',
+    "fp16": 'arquivos_algoritmos/ssd/res10_300x300_ssd_iter_140000_fp16.caffemodel',
+    "int8": 'arquivos_algoritmos/ssd/res10_300x300_ssd_iter_140000.caffemodel',
+}
+
+@register_detector("ssd")
+class SSDFaceDetector(FaceDetector):
 
-class SSDFaceDetector:
+    input_format = "BGR"
+    label = "SSD"
+    color = (255, 255, 0)
+    supports_batch = True
    
-    def __init__(self, prototxt_path='arquivos_algoritmos/ssd/deploy.prototxt', model_path='arquivos_algoritmos/ssd/res10_300x300_ssd_iter_140000_fp16.caffemodel'):
-        # Carrega a rede neural SSD pré-treinada para detecção de faces
-        self.net = cv2.dnn.readNetFromCaffe(prototxt_path, model_path)
-        
-        # O SSD foi treinado com imagens de 300x300 pixels
-        self.input_size = (300, 300)
-        
+    def __init__(self, prototxt_path='arquivos_algoritmos/ssd/deploy.prototxt', model_path=None,
+                 precision=SSD_PRECISION, input_size=SSD_INPUT_SIZE):
+        if precision not in SSD_MODELS:
+            raise ValueError(f"Precisão '{precision}' não suportada; use {tuple(SSD_MODELS)}.")
+        self.precision = precision
+
+        # O SSD foi treinado com imagens de 300x300 pixels; entradas menores são mais rápidas
+        # e perdem as faces pequenas.
+        self.input_size = (input_size, input_size)
+
         # Confiança mínima para considerar uma detecção válida
-        self.confidence_threshold = 0.5 
+        self.confidence_threshold = 0.5
+
+        # Arquivos lidos uma vez; novos contextos montam a rede a partir da memória.
+        self._prototxt = np.fromfile(prototxt_path, dtype=np.uint8)
+        self._weights = np.fromfile(model_path or SSD_MODELS[precision], dtype=np.uint8)
+        self._calibration = None
+        if precision == "int8":
+            # Escalas do INT8 calibradas com frames reais; os blobs ficam para os outros contextos.
+            self._calibration = [self._blob([frame], ["BGR"]) for frame in load_calibration_frames()]
+
+        # Carrega a rede neural SSD pré-treinada para detecção de faces
+        self.net = self._load_net()
+
+    def _load_net(self):
+        net = cv2.dnn.readNetFromCaffe(self._prototxt, self._weights)
+        if self.precision == "fp16" and hasattr(cv2.dnn, "DNN_TARGET_CPU_FP16"):
+            # Cálculo em meia precisão na CPU (OpenCV >= 4.8, ARMv8.2 em diante).
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU_FP16)
+        elif self.precision == "int8":
+            net = net.quantize(self._calibration, cv2.CV_32F, cv2.CV_32F)
+        return net
+
+    def new_context(self):
+        # O cv2.dnn.Net guarda entrada e ativações na própria rede (setInput/forward), então cada
+        # contexto tem a sua, montada dos arquivos já em memória, sem ler o disco de novo.
+        context = copy.copy(self)
+        context.net = self._load_net()
+        return context
 
-    def process_frame(self, frame):
+    @property
+    def algorithm_name(self):
+        name = f"{self.__class__.__name__}-{self.precision}"
+        return name if self.input_size[0] == 300 else f"{name}-{self.input_size[0]}"
+
+    def _blob(self, frames, frame_formats):
+        # Prepara os frames para o modelo SSD (cria um "blob")
+        # O blob é uma representação das imagens que pode ser passada para a rede
+        images = [cv2.resize(to_bgr(frame, frame_format), self.input_size)
+                  for frame, frame_format in zip(frames, frame_formats)]
+        return cv2.dnn.blobFromImages(images, 1.0, self.input_size, (104.0, 177.0, 123.0))
+
+    def _to_detections(self, rows, w, h):
+        """
+        Converte as linhas de saída da rede (image_id, classe, confiança, x1, y1, x2, y2) em Detections,
+        com operações sobre o array inteiro: máscara de confiança, uma multiplicação de escala e conversão.
+        """
+        # Filtra detecções fracas pela confiança
+        rows = rows[rows[:, 2] > self.confidence_threshold]
+        # Escala as coordenadas normalizadas para o tamanho original do frame e passa para (x, y, w, h)
+        corners = (rows[:, 3:7] * np.array([w, h, w, h], dtype=np.float32)).astype(np.int32)
+        corners[:, 2:] -= corners[:, :2]
+        return Detections(corners, rows[:, 2])
+
+    def detect(self, frame, frame_format="BGR"):
         """
-        Recebe um frame, detecta faces usando SSD e retorna o frame com as anotações.
+        Recebe um frame e retorna as faces detectadas usando SSD.
         """
-        (h, w) = frame.shape[:2]
-        
-        # Prepara o frame para o modelo SSD (cria um "blob")
-        # O blob é uma representação da imagem que pode ser passada para a rede
-        blob = cv2.dnn.blobFromImage(cv2.resize(frame, self.input_size), 1.0, 
-                                     self.input_size, (104.0, 177.0, 123.0))
+        return self.detect_cached(FrameCache(frame, frame_format))
+
+    def detect_cached(self, cache):
+        (h, w) = cache.frame.shape[:2]
+
+        # O blob 300x300 fica no cache do frame: outro estágio que precise dele não o refaz.
+        blob = cache.get(("ssd_blob", self.input_size), lambda: self._blob([cache.bgr()], ["BGR"]))
 
         # Passa o blob pela rede para obter as detecções
         self.net.setInput(blob)
         detections = self.net.forward()
 
-        faces_data = []
-        # Itera sobre as detecções
-        for i in range(0, detections.shape[2]):
-            confidence = detections[0, 0, i, 2]
-
-            # Filtra detecções fracas pela confiança
-            if confidence > self.confidence_threshold:
-                # Pega as coordenadas do bounding box e as escala para o tamanho original do frame
-                box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
-                (startX, startY, endX, endY) = box.astype("int")
-
-                # Adiciona os dados à lista
-                faces_data.append({"bbox": (startX, startY, endX - startX, endY - startY), 
-                                   "confidence": confidence})
-
-                # Desenha o retângulo e o texto no frame
-                cv2.rectangle(frame, (startX, startY), (endX, endY), (255, 255, 0), 2)
-                text = f"SSD: {confidence:.2f}"
-                cv2.putText(frame, text, (startX, startY - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 2)
-        
-        return frame, faces_data
\ No newline at end of file
+        return self._to_detections(detections[0, 0], w, h)
+
+    def detect_batch(self, frames, frame_formats):
+        """
+        Um único forward para vários frames (ex.: um de cada câmera).
+        A saída junta as detecções de todas as imagens; a coluna 0 diz de qual imagem veio cada linha.
+        """
+        self.net.setInput(self._blob(frames, frame_formats))
+        rows = self.net.forward()[0, 0]
+        image_ids = rows[:, 0].astype(np.int32)
+        return [self._to_detections(rows[image_ids == i], frame.shape[1], frame.shape[0])
+                for i, frame in enumerate(frames)]
@@ -1,7 +1,18 @@
-import cv2
+import copy
+
+import numpy as np
 from ultralytics import YOLO
+from algoritmos.base import FaceDetector, Detections
+from algoritmos.frame_format import to_bgr
+from algoritmos.registry import register_detector
+
+@register_detector("yolo")
+class YOLOv8FaceDetector(FaceDetector):
 
-class YOLOv8FaceDetector:
+    input_format = "BGR"
+    label = "YOLOv8"
+    color = (255, 0, 0)
+    supports_batch = True
     
     def __init__(self, model_path='arquivos_algoritmos/yolo/yolov8n-face.pt'):
         # Carrega o modelo YOLOv8 pré-treinado para detecção de faces
@@ -10,38 +21,47 @@ class YOLOv8FaceDetector:
         # Confiança mínima para considerar uma detecção válida
         self.confidence_threshold = 0.5 
 
-    def process_frame(self, frame):
+        # Aquecimento: monta o predictor e funde as camadas do modelo agora, numa thread só,
+        # antes que new_context() o compartilhe com as threads de detecção.
+        self.detect(np.zeros((64, 64, 3), dtype=np.uint8))
+
+    def new_context(self):
+        """
+        Contexto que compartilha os pesos (o nn.Module) e tem o próprio predictor do ultralytics,
+        onde ficam o pré-processamento e os resultados da última chamada.
+        O modelo já foi fundido no __init__, então a cópia não altera o nn.Module compartilhado.
+        """
+        context = copy.copy(self)
+        context.model = copy.copy(self.model)
+        context.model.predictor = None
+        return context
+
+    def _to_detections(self, result):
+        """Converte o resultado do ultralytics para uma imagem em Detections, sem laço por caixa."""
+        # Um único tensor N×4 (x1, y1, x2, y2) e N confianças, trazidos para NumPy de uma vez
+        corners = result.boxes.xyxy.cpu().numpy().astype(np.int32)
+        scores = result.boxes.conf.cpu().numpy()
+        # Converte para o formato (x, y, largura, altura)
+        corners[:, 2:] -= corners[:, :2]
+        return Detections(corners, scores)
+
+    def detect(self, frame, frame_format="BGR"):
         """
-        Recebe um frame, detecta faces usando YOLOv8n e retorna o frame com as anotações.
+        Recebe um frame e retorna as faces detectadas usando YOLOv8n.
         """
-        # Passa o frame pelo modelo para obter as detecções
+        return self.detect_batch([frame], [frame_format])[0]
+
+    def detect_cached(self, cache):
+        return self.detect_batch([cache.bgr()], ["BGR"])[0]
+
+    def detect_batch(self, frames, frame_formats):
+        """
+        Uma única chamada ao modelo para vários frames; o ultralytics os agrupa num só tensor.
+        """
+        # Passa os frames pelo modelo para obter as detecções (um resultado por imagem)
         results = self.model.predict(
-            frame, 
-            conf=self.confidence_threshold, 
+            [to_bgr(frame, frame_format) for frame, frame_format in zip(frames, frame_formats)],
+            conf=self.confidence_threshold,
             verbose=False # Desativa a impressão de logs para o console
         )
-        
-        faces_data = []
-        # Itera sobre os resultados da detecção
-        for r in results:
-            for box in r.boxes:
-                confidence = box.conf[0].item()
-
-                # Pega as coordenadas do bounding box
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                
-                # Converte para o formato (x, y, largura, altura)
-                x = int(x1)
-                y = int(y1)
-                w = int(x2 - x1)
-                h = int(y2 - y1)
-
-                # Adiciona os dados à lista
-                faces_data.append({"bbox": (x, y, w, h), "confidence": confidence})
-
-                # Desenha o retângulo e o texto no frame
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
-                text = f"YOLOv8: {confidence:.2f}"
-                cv2.putText(frame, text, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
-        
-        return frame, faces_data
\ No newline at end of file
+        return [self._to_detections(r) for r in results]
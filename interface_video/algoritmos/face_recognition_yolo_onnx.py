@@ -0,0 +1,150 @@
+# face_recognition_yolo_onnx.py
+# YOLOv8-face exportado para ONNX, sem PyTorch nem ultralytics.
+# Letterbox, decodificação e NMS são feitos aqui, em NumPy vetorizado.
+import copy
+
+import cv2
+import numpy as np
+from algoritmos.base import FaceDetector, Detections, nms
+from algoritmos.preprocessing import FrameCache
+from algoritmos.registry import register_detector
+from config import YOLO_ONNX_INPUT_SIZE, YOLO_ONNX_BACKEND, YOLO_ONNX_THREADS, YOLO_ONNX_PRECISION
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+SUPPORTED_INPUT_SIZES = (320, 416, 640)
+SUPPORTED_PRECISIONS = ("fp32", "fp16", "int8")
+
+
+def model_path_for(input_size, precision="fp32"):
+    """Arquivo gerado por export_yolo_onnx.py (fp32) ou quantize_models.py (fp16/int8)."""
+    suffix = "" if precision == "fp32" else f"-{precision}"
+    return f'arquivos_algoritmos/yolo/yolov8n-face-{input_size}{suffix}.onnx'
+
+
+def letterbox(frame, canvas):
+    """
+    Redimensiona o frame mantendo a proporção e o centraliza no quadrado 'canvas'.
+    Só escreve a área da imagem; a borda (114) fica como estava. Retorna (escala, pad_x, pad_y).
+    """
+    size = canvas.shape[0]
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+        frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    return scale, pad_x, pad_y
+
+
+def to_blob(canvas):
+    # BGR -> RGB, 0-255 -> 0-1 e HWC -> NCHW numa única chamada
+    return cv2.dnn.blobFromImage(canvas, 1 / 255.0, swapRB=True)
+
+
+@register_detector("yolo_onnx")
+class YOLOv8ONNXFaceDetector(FaceDetector):
+
+    input_format = "BGR"
+    label = "YOLOv8-ONNX"
+    color = (255, 0, 0)
+
+    def __init__(self, model_path=None, input_size=YOLO_ONNX_INPUT_SIZE, backend=YOLO_ONNX_BACKEND,
+                 num_threads=YOLO_ONNX_THREADS, precision=YOLO_ONNX_PRECISION):
+        if input_size not in SUPPORTED_INPUT_SIZES:
+            raise ValueError(f"Tamanho de entrada {input_size} não suportado; use {SUPPORTED_INPUT_SIZES}.")
+        if precision not in SUPPORTED_PRECISIONS:
+            raise ValueError(f"Precisão '{precision}' não suportada; use {SUPPORTED_PRECISIONS}.")
+        self.input_size = input_size
+        self.precision = precision
+        # O modelo é exportado com entrada fixa, um arquivo por tamanho e precisão.
+        self.model_path = model_path or model_path_for(input_size, precision)
+
+        # Confiança mínima e sobreposição máxima entre caixas mantidas
+        self.confidence_threshold = 0.5
+        self.iou_threshold = 0.45
+
+        if backend == "onnxruntime" and ort is None:
+            print("onnxruntime não instalado; usando cv2.dnn.")
+            backend = "opencv"
+        self.backend = backend
+
+        if backend == "onnxruntime":
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if num_threads:
+                options.intra_op_num_threads = num_threads
+            self.session = ort.InferenceSession(self.model_path, sess_options=options,
+                                                providers=["CPUExecutionProvider"])
+            self.input_name = self.session.get_inputs()[0].name
+        else:
+            self.net = cv2.dnn.readNetFromONNX(self.model_path)
+            if num_threads:
+                cv2.setNumThreads(num_threads)  # no OpenCV a configuração é global
+
+        # Imagem quadrada reaproveitada a cada frame (borda cinza 114, como no treino do YOLO).
+        self._canvas = np.full((input_size, input_size, 3), 114, dtype=np.uint8)
+        self._letterbox_shape = None
+
+    @property
+    def algorithm_name(self):
+        return f"{self.__class__.__name__}-{self.input_size}-{self.precision}"
+
+    def new_context(self):
+        # A InferenceSession do onnxruntime aceita chamadas de várias threads: os contextos a
+        # compartilham e só o letterbox é separado. O cv2.dnn.Net guarda a entrada, então lá cada um lê o seu.
+        context = copy.copy(self)
+        if self.backend != "onnxruntime":
+            context.net = cv2.dnn.readNetFromONNX(self.model_path)
+        context._canvas = np.full_like(self._canvas, 114)
+        context._letterbox_shape = None
+        return context
+
+    def _letterbox(self, frame):
+        # A borda só precisa ser repintada quando o tamanho do frame muda.
+        if self._letterbox_shape != frame.shape[:2]:
+            self._canvas[:] = 114
+            self._letterbox_shape = frame.shape[:2]
+        return letterbox(frame, self._canvas)
+
+    def _forward(self, blob):
+        if self.backend == "onnxruntime":
+            return self.session.run(None, {self.input_name: blob})[0]
+        self.net.setInput(blob)
+        return self.net.forward()
+
+    def detect(self, frame, frame_format="BGR"):
+        """
+        Recebe um frame e retorna as faces detectadas pelo YOLOv8-face em ONNX.
+        """
+        return self.detect_cached(FrameCache(frame, frame_format))
+
+    def detect_cached(self, cache):
+        h, w = cache.frame.shape[:2]
+        scale, pad_x, pad_y = self._letterbox(cache.bgr())
+        blob = to_blob(self._canvas)
+
+        # Saída 1×C×N: (cx, cy, w, h, confiança, pontos faciais...) por âncora
+        output = self._forward(blob)[0].astype(np.float32, copy=False)
+        scores = output[4]
+        mask = scores > self.confidence_threshold
+        if not mask.any():
+            return Detections()
+        cx, cy, bw, bh = output[:4, mask]
+        scores = scores[mask]
+
+        # Do espaço do letterbox de volta para o frame original, em (x, y, largura, altura)
+        boxes = np.stack(((cx - bw / 2 - pad_x) / scale, (cy - bh / 2 - pad_y) / scale,
+                          bw / scale, bh / scale), axis=1)
+        keep = nms(boxes, scores, self.iou_threshold)
+        boxes = boxes[keep]
+        # Limita ao frame: caixas que saem da imagem atrapalham recortes e rastreamento
+        x1 = np.clip(boxes[:, 0], 0, w)
+        y1 = np.clip(boxes[:, 1], 0, h)
+        x2 = np.clip(boxes[:, 0] + boxes[:, 2], 0, w)
+        y2 = np.clip(boxes[:, 1] + boxes[:, 3], 0, h)
+        boxes = np.stack((x1, y1, x2 - x1, y2 - y1), axis=1).astype(np.int32)
+        return Detections(boxes, scores[keep])
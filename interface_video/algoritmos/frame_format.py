@@ -0,0 +1,34 @@
+# frame_format.py
+import cv2
+
+# Formatos de pixel que a câmera pode entregar diretamente aos detectores.
+# "GRAY" corresponde ao plano de luminância (Y) do YUV420.
+FRAME_FORMATS = ("BGR", "RGB", "GRAY")
+
+
+def to_gray(frame, frame_format="BGR"):
+    if frame_format == "GRAY" or frame.ndim == 2:
+        return frame
+    code = cv2.COLOR_RGB2GRAY if frame_format == "RGB" else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(frame, code)
+
+
+def to_bgr(frame, frame_format="BGR"):
+    if frame_format == "GRAY" or frame.ndim == 2:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    if frame_format == "RGB":
+        return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+    return frame
+
+
+def to_rgb(frame, frame_format="BGR"):
+    if frame_format == "GRAY" or frame.ndim == 2:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+    if frame_format == "BGR":
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return frame
+
+
+def annotation_color(color, frame):
+    """Em frames de um canal (luminância) desenha em branco, pois a cor seria reduzida ao primeiro componente."""
+    return 255 if frame.ndim == 2 else color
@@ -0,0 +1,48 @@
+# preprocessing.py
+# Pré-processamento compartilhado: cada conversão ou redução de um frame é feita uma única vez,
+# mesmo quando vários detectores (ou várias cascatas) rodam sobre o mesmo frame.
+import cv2
+
+from algoritmos.frame_format import to_gray, to_bgr, to_rgb
+
+
+class FrameCache:
+    """
+    Conversões derivadas de um frame (cinza, BGR, RGB, versões reduzidas, blobs), calculadas sob demanda
+    e guardadas até o fim do frame. Usado por uma única thread; crie um por frame.
+    'reference_width' é a largura do frame da câmera quando 'frame' é só um recorte dele (porteiro de
+    movimento, recorte e refino): detectores que estimam o tamanho das faces pela imagem usam esta largura.
+    """
+
+    __slots__ = ("frame", "frame_format", "reference_width", "_items")
+
+    def __init__(self, frame, frame_format="BGR", reference_width=None):
+        self.frame = frame
+        self.frame_format = frame_format
+        self.reference_width = reference_width or frame.shape[1]
+        self._items = {}
+
+    def get(self, key, factory):
+        """Retorna o item 'key', calculando-o com factory() na primeira vez."""
+        item = self._items.get(key)
+        if item is None:
+            item = self._items[key] = factory()
+        return item
+
+    def gray(self):
+        return self.get("gray", lambda: to_gray(self.frame, self.frame_format))
+
+    def bgr(self):
+        return self.get("bgr", lambda: to_bgr(self.frame, self.frame_format))
+
+    def rgb(self):
+        return self.get("rgb", lambda: to_rgb(self.frame, self.frame_format))
+
+    def gray_scaled(self, scale):
+        """Luminância reduzida por 'scale' (um nível da pirâmide), compartilhada por quem pedir a mesma escala."""
+        gray = self.gray()
+        if scale >= 1.0:
+            return gray
+        h, w = gray.shape[:2]
+        size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+        return self.get(("gray", size), lambda: cv2.resize(gray, size, interpolation=cv2.INTER_AREA))
@@ -0,0 +1,71 @@
+# registry.py
+# Registro dos detectores por nome, para que a aplicação troque de algoritmo em tempo de execução.
+#
+# Os módulos dos detectores só são importados no primeiro uso: importar todos de uma vez
+# traria dlib, mediapipe e ultralytics/torch para a memória mesmo usando só um deles.
+import importlib
+import time
+
+# nome -> (módulo, classe). Importados sob demanda por get_detector_class().
+DETECTOR_MODULES = {
+    "viola": ("algoritmos.face_recognition", "ViolaFaceRecognizer"),
+    "hog": ("algoritmos.face_recognition_hog", "DLIBFaceRecognizer"),
+    "lbp": ("algoritmos.face_recognition_lbp", "LBPFaceRecognizer"),
+    "ssd": ("algoritmos.face_recognition_ssd", "SSDFaceDetector"),
+    "yolo": ("algoritmos.face_recognition_yolo", "YOLOv8FaceDetector"),
+    "yolo_onnx": ("algoritmos.face_recognition_yolo_onnx", "YOLOv8ONNXFaceDetector"),
+    "blazeface": ("algoritmos.face_recognition_blazeface", "BlazeFaceDetector"),
+}
+
+DETECTOR_REGISTRY = {}
+
+# nome -> {"import_s": ..., "load_s": ...}, preenchido à medida que os detectores são usados.
+STARTUP_TIMES = {}
+
+
+def register_detector(name):
+    """Decorador de classe: registra o detector sob 'name'."""
+    def decorator(cls):
+        cls.registry_name = name
+        DETECTOR_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def get_detector_class(name):
+    """Retorna a classe do detector, importando o módulo dele no primeiro uso."""
+    if name not in DETECTOR_REGISTRY:
+        if name not in DETECTOR_MODULES:
+            raise ValueError(f"Detector desconhecido: '{name}'. Disponíveis: {', '.join(available_detectors())}")
+        module_name, class_name = DETECTOR_MODULES[name]
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        STARTUP_TIMES.setdefault(name, {})["import_s"] = time.perf_counter() - start
+        # O decorador já registrou a classe; o getattr cobre módulos sem o decorador.
+        DETECTOR_REGISTRY.setdefault(name, getattr(module, class_name))
+    return DETECTOR_REGISTRY[name]
+
+
+def create_detector(name, **kwargs):
+    """Importa (se preciso) e instancia o detector, medindo o tempo de carga do modelo."""
+    detector_class = get_detector_class(name)
+    start = time.perf_counter()
+    detector = detector_class(**kwargs)
+    STARTUP_TIMES.setdefault(name, {})["load_s"] = time.perf_counter() - start
+    return detector
+
+
+def available_detectors():
+    """Nomes de todos os detectores conhecidos, sem importar nenhum deles."""
+    return sorted(set(DETECTOR_MODULES) | set(DETECTOR_REGISTRY))
+
+
+def startup_report(names=None):
+    """Texto com o tempo de importação e de carga do modelo de cada detector já usado."""
+    lines = ["Tempo de inicialização dos detectores:"]
+    for name in names or sorted(STARTUP_TIMES):
+        times = STARTUP_TIMES.get(name, {})
+        import_ms = times.get("import_s", 0.0) * 1000
+        load_ms = times.get("load_s", 0.0) * 1000
+        lines.append(f"  {name:<10} importação: {import_ms:8.1f} ms  carga do modelo: {load_ms:8.1f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,19 @@
+from algoritmos.base import draw_detections
+from config import ANNOTATE_FRAMES
+
+
+class Annotator:
+    """
+    Estágio de anotação, separado da inferência.
+    Desenha as detecções no frame de exibição usando rótulo e cor do detector;
+    pode ser desligado (execuções sem tela, benchmarks).
+    """
+
+    def __init__(self, enabled=ANNOTATE_FRAMES):
+        self.enabled = enabled
+
+    def draw(self, frame, detections, detector, identities=None):
+        if not self.enabled or not len(detections):
+            return frame
+        draw_detections(frame, detections, detector.label, detector.color, detector.has_scores, identities)
+        return frame
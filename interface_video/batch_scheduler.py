@@ -0,0 +1,94 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from algoritmos.base import DetectorWrapper
+from config import BATCH_WINDOW_MS, BATCH_DETECT_TIMEOUT
+
+
+class BatchScheduler(DetectorWrapper):
+    """
+    Agrupa as chamadas de várias câmeras num único detect_batch().
+
+    Cada thread de detecção chama detect() e espera; uma thread própria junta os pedidos que chegam
+    dentro de 'window_ms' após o primeiro (ou até 'max_batch' pedidos, normalmente uma por câmera),
+    executa uma inferência só e devolve a cada câmera as suas detecções.
+    Como só essa thread usa o detector, as câmeras não precisam de lock.
+    detect_batch() (ex.: os recortes do CropRefineDetector) entra como um pedido só, com todos os
+    frames no mesmo lote; 'max_batch' conta pedidos, não frames.
+    """
+
+    supports_batch = True
+
+    def __init__(self, detector, max_batch, window_ms=BATCH_WINDOW_MS):
+        super().__init__(detector)
+        self.max_batch = max(1, max_batch)
+        self.window = window_ms / 1000.0
+        self.batches = 0
+        self.frames = 0
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="lote-detector", daemon=True)
+        self._thread.start()
+
+    def submit(self, frames, frame_formats):
+        """Enfileira os frames para o próximo lote e retorna um Future com a lista de Detections."""
+        future = Future()
+        self._requests.put((list(frames), list(frame_formats), future))
+        return future
+
+    def detect(self, frame, frame_format="BGR"):
+        return self.submit([frame], [frame_format]).result(timeout=BATCH_DETECT_TIMEOUT)[0]
+
+    def detect_batch(self, frames, frame_formats):
+        if not frames:
+            return []
+        return self.submit(frames, frame_formats).result(timeout=BATCH_DETECT_TIMEOUT)
+
+    def average_batch_size(self):
+        return self.frames / self.batches if self.batches else 0.0
+
+    def shutdown(self):
+        self._requests.put(None)
+        self._thread.join(timeout=2)
+
+    def _collect(self, first):
+        """Junta pedidos até encher o lote ou a janela expirar. Retorna (lote, parar)."""
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._requests.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+
+            frames = [frame for request in batch for frame in request[0]]
+            frame_formats = [frame_format for request in batch for frame_format in request[1]]
+            try:
+                results = self.detector.detect_batch(frames, frame_formats)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.frames += len(frames)
+            start = 0
+            for request_frames, _, future in batch:
+                future.set_result(results[start:start + len(request_frames)])
+                start += len(request_frames)
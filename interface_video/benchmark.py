@@ -0,0 +1,283 @@
+"""
+Benchmark sem câmera e sem GUI.
+
+Reproduz um vídeo gravado (ou um diretório de imagens) em cada detector registrado,
+varrendo a grade RESOLUTION_OPTIONS × FPS_OPTIONS, e grava resultados legíveis por
+máquina (JSON Lines ou CSV): latência p50/p95/p99, vazão, RSS de pico e CPU.
+Cada detector roda num processo próprio, e os frames são entregues no ritmo de cada FPS
+(--no-realtime entrega o mais rápido possível).
+
+Uso (a partir de interface_video/):
+
+    python benchmark.py --video gravacao.mp4
+    python benchmark.py --frames frames/ --detectors viola lbp --output resultados.jsonl
+    python benchmark.py --video gravacao.mp4 --output resultados.csv --max-frames 150
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+import psutil
+
+from algoritmos.frame_format import to_gray, to_rgb
+from algoritmos.registry import available_detectors, create_detector, STARTUP_TIMES
+from config import RESOLUTION_OPTIONS, FPS_OPTIONS
+from frame_scheduler import FrameScheduler
+
+IMAGE_EXTENSIONS = ("*.jpg", "*.jpeg", "*.png", "*.bmp")
+
+
+def load_frames(video=None, frames_dir=None, max_frames=300):
+    """Decodifica os frames uma única vez (em BGR), para que a decodificação fique fora da medição."""
+    frames = []
+    source_fps = 30.0
+    if video:
+        capture = cv2.VideoCapture(video)
+        if not capture.isOpened():
+            raise IOError(f"Não foi possível abrir o vídeo: {video}")
+        source_fps = capture.get(cv2.CAP_PROP_FPS) or source_fps
+        while len(frames) < max_frames:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            frames.append(frame)
+        capture.release()
+    else:
+        paths = sorted(p for pattern in IMAGE_EXTENSIONS for p in glob.glob(os.path.join(frames_dir, pattern)))
+        for path in paths[:max_frames]:
+            frame = cv2.imread(path)
+            if frame is not None:
+                frames.append(frame)
+    if not frames:
+        raise IOError("Nenhum frame carregado.")
+    return frames, source_fps
+
+
+def prepare_frames(frames, width, height, pixel_format):
+    """Redimensiona e converte para o formato que a câmera entregaria ao detector."""
+    prepared = []
+    for frame in frames:
+        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        if pixel_format == "GRAY":
+            frame = to_gray(frame, "BGR")
+        elif pixel_format == "RGB":
+            frame = to_rgb(frame, "BGR")
+        prepared.append(np.ascontiguousarray(frame))
+    return prepared
+
+
+def decimate(frames, source_fps, desired_fps):
+    """
+    Mesma seleção do pipeline: FrameScheduler (modo "fixed") sobre os instantes de captura
+    sintéticos i / fps_fonte, de modo que 20 FPS num vídeo de 30 processam 2 de cada 3 frames.
+    Retorna pares (instante de captura em s, frame).
+    """
+    scheduler = FrameScheduler(desired_fps, mode="fixed")
+    return [(i / source_fps, frame) for i, frame in enumerate(frames) if scheduler.should_process(i / source_fps)]
+
+
+def run_case(detector, frames, annotate=False, realtime=True):
+    """
+    Executa o detector sobre os pares (instante, frame) e retorna as métricas da rodada.
+    realtime=True espera o instante de captura de cada frame, como a câmera entregaria: a CPU e o
+    atraso (fim da detecção - captura) passam a depender do FPS. Sem espera, mede só a vazão máxima.
+    """
+    process = psutil.Process()
+    latencies = np.empty(len(frames), dtype=np.float64)
+    lags = np.empty(len(frames), dtype=np.float64)
+    detections_total = 0
+
+    cpu_before = process.cpu_times()
+    wall_start = time.perf_counter()
+    for i, (captured_at, frame) in enumerate(frames):
+        if annotate:
+            # Anota uma cópia (fora da medição): os frames preparados são reutilizados nas próximas rodadas.
+            frame = frame.copy()
+        captured_at = wall_start + captured_at if realtime else time.perf_counter()
+        delay = captured_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        start = time.perf_counter()
+        if annotate:
+            _, detections = detector.process_frame(frame, detector.input_format)
+        else:
+            detections = detector.detect(frame, detector.input_format)
+        end = time.perf_counter()
+        latencies[i] = (end - start) * 1000
+        lags[i] = (end - captured_at) * 1000
+        detections_total += len(detections)
+    wall = time.perf_counter() - wall_start
+    cpu_after = process.cpu_times()
+
+    cpu_seconds = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "frames": len(frames),
+        "realtime": realtime,
+        "latency_mean_ms": float(latencies.mean()),
+        "latency_p50_ms": float(p50),
+        "latency_p95_ms": float(p95),
+        "latency_p99_ms": float(p99),
+        "latency_max_ms": float(latencies.max()),
+        # Atraso em relação à captura: cresce sem parar quando o detector não acompanha o FPS.
+        "lag_p95_ms": float(np.percentile(lags, 95)),
+        "throughput_fps": len(frames) / wall if wall > 0 else 0.0,
+        # CPU em % de um núcleo (pode passar de 100 com backends multithread).
+        "cpu_percent": 100.0 * cpu_seconds / wall if wall > 0 else 0.0,
+        # Pico de memória do processo deste detector (só ele foi carregado nele) até o fim da rodada.
+        # ru_maxrss é em KiB no Linux.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+        "detections_per_frame": detections_total / len(frames),
+    }
+
+
+def run_benchmark(frames, source_fps, detector_names, resolutions, fps_options, annotate=False, realtime=True,
+                  warmup=5):
+    """Gera um dicionário de resultado por combinação detector × resolução × FPS, no processo atual."""
+    environment = {"python": platform.python_version(), "machine": platform.machine(),
+                   "cpu_count": os.cpu_count(), "opencv": cv2.__version__}
+    for name in detector_names:
+        try:
+            detector = create_detector(name)
+        except Exception as e:
+            print(f"[{name}] ignorado: {e}", file=sys.stderr)
+            yield {"detector": name, "error": repr(e), **environment}
+            continue
+        startup = STARTUP_TIMES.get(name, {})
+
+        for resolution_name, resolution in resolutions.items():
+            prepared = prepare_frames(frames, resolution["width"], resolution["height"], detector.input_format)
+            # Aquecimento: a primeira inferência costuma incluir alocações e compilação de kernels.
+            for frame in prepared[:warmup]:
+                detector.detect(frame, detector.input_format)
+
+            for fps_name, desired_fps in fps_options.items():
+                selected = decimate(prepared, source_fps, desired_fps)
+                if not selected:
+                    continue
+                metrics = run_case(detector, selected, annotate, realtime)
+                # A câmera entrega um frame a cada 1/fps s; p95 acima disso significa atraso acumulado.
+                metrics["realtime_ok"] = metrics["latency_p95_ms"] <= 1000.0 / desired_fps
+                yield {
+                    "detector": name,
+                    "algorithm": detector.algorithm_name,
+                    "resolution": f"{resolution['width']}x{resolution['height']}",
+                    "resolution_option": resolution_name,
+                    "target_fps": desired_fps,
+                    "import_ms": startup.get("import_s", 0.0) * 1000,
+                    "load_ms": startup.get("load_s", 0.0) * 1000,
+                    **metrics,
+                    **environment,
+                }
+        del detector
+
+
+def run_isolated(args, detector_names):
+    """
+    Cada detector roda num processo Python novo (como em startup_report.py): o pico de memória de um
+    não inclui os backends carregados pelos anteriores, e a ordem dos detectores não muda o resultado.
+    """
+    common = [sys.executable, __file__, "--max-frames", str(args.max_frames)]
+    common += ["--video", args.video] if args.video else ["--frames", args.frames]
+    if args.resolutions:
+        common += ["--resolutions", *args.resolutions]
+    if args.fps:
+        common += ["--fps", *map(str, args.fps)]
+    if args.annotate:
+        common.append("--annotate")
+    if args.no_realtime:
+        common.append("--no-realtime")
+
+    for name in detector_names:
+        completed = subprocess.run(common + ["--single", name], capture_output=True, text=True)
+        sys.stderr.write(completed.stderr)
+        lines = [json.loads(line) for line in completed.stdout.splitlines() if line.startswith("{")]
+        if not lines:
+            stderr_lines = completed.stderr.strip().splitlines()
+            lines = [{"detector": name, "error": stderr_lines[-1] if stderr_lines else "sem saída"}]
+        yield from lines
+
+
+def write_results(results, output):
+    """Grava em CSV se a extensão for .csv, senão em JSON Lines. Sem 'output', imprime JSON Lines."""
+    if output and output.endswith(".csv"):
+        fieldnames = []
+        for result in results:
+            for key in result:
+                if key not in fieldnames:
+                    fieldnames.append(key)
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(results)
+        return
+
+    stream = open(output, "w") if output else sys.stdout
+    try:
+        for result in results:
+            stream.write(json.dumps(result) + "\n")
+    finally:
+        if output:
+            stream.close()
+
+
+def print_table(results):
+    print(f"\n{'detector':<10} {'resolução':>10} {'FPS':>4} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'vazão':>8} {'CPU':>6} {'RSS':>8}", file=sys.stderr)
+    for r in results:
+        if "error" in r:
+            continue
+        print(f"{r['detector']:<10} {r['resolution']:>10} {r['target_fps']:>4} "
+              f"{r['latency_p50_ms']:>6.1f}ms {r['latency_p95_ms']:>6.1f}ms {r['latency_p99_ms']:>6.1f}ms "
+              f"{r['throughput_fps']:>6.1f}/s {r['cpu_percent']:>5.0f}% {r['peak_rss_mb']:>6.0f}MB", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos detectores sem câmera e sem GUI.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="arquivo de vídeo a ser reproduzido")
+    source.add_argument("--frames", help="diretório com imagens (jpg/png/bmp), em ordem alfabética")
+    parser.add_argument("--detectors", nargs="*", help="nomes registrados (padrão: todos)")
+    parser.add_argument("--resolutions", nargs="*", help="chaves de RESOLUTION_OPTIONS (padrão: todas)")
+    parser.add_argument("--fps", nargs="*", type=int, help="valores de FPS_OPTIONS (padrão: todos)")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--annotate", action="store_true", help="inclui o custo de desenhar as caixas")
+    parser.add_argument("--no-realtime", action="store_true",
+                        help="não espera o instante de captura dos frames (mede só a vazão máxima)")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="arquivo de saída (.jsonl ou .csv); padrão: JSON Lines na saída padrão")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.single:
+        results = list(run_isolated(args, args.detectors or available_detectors()))
+        write_results(results, args.output)
+        print_table(results)
+        return
+
+    # Processo filho de run_isolated(): mede um detector e grava JSON Lines na saída padrão.
+    frames, source_fps = load_frames(args.video, args.frames, args.max_frames)
+    print(f"[{args.single}] {len(frames)} frames carregados (fonte a {source_fps:.1f} FPS).", file=sys.stderr)
+
+    resolutions = RESOLUTION_OPTIONS
+    if args.resolutions:
+        resolutions = {name: RESOLUTION_OPTIONS[name] for name in args.resolutions}
+    fps_options = FPS_OPTIONS
+    if args.fps:
+        fps_options = {name: fps for name, fps in FPS_OPTIONS.items() if fps in args.fps}
+    write_results(run_benchmark(frames, source_fps, [args.single], resolutions, fps_options,
+                                args.annotate, not args.no_realtime), None)
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,682 @@
+import threading
+import time
+from collections import deque, namedtuple
+
 import cv2
-from picamera2 import Picamera2
+import numpy as np
+
+from algoritmos.frame_format import FRAME_FORMATS
+from config import (FRAME_RING_SIZE, PICAMERA_ASYNC_CAPTURE, CAPTURE_RECENT_FRAMES, CAMERA_SOURCE, CAMERA_DEVICE,
+                    VIDEO_FILE_PATH, VIDEO_FILE_REALTIME, VIDEO_FILE_LOOP, SYNTHETIC_FPS, FPS_METER_WINDOW)
+from rate_limited_log import RateLimitedLog
+
+# Formato pedido ao libcamera para cada formato entregue ao detector.
+# Atenção: no libcamera "RGB888" é armazenado como B,G,R na memória (ordem do OpenCV)
+# e "BGR888" como R,G,B. Para tons de cinza usamos apenas o plano Y do YUV420.
+PICAMERA_FORMATS = {
+    "BGR": "RGB888",
+    "RGB": "BGR888",
+    "GRAY": "YUV420",
+}
+
+
+class FrameRing:
+    """
+    Anel fixo de buffers pré-alocados. Cada captura é escrita no próximo buffer livre,
+    então nenhum array novo é alocado por frame.
+    A posse é explícita: next() entrega o buffer já reservado para quem chamou, retain() acrescenta
+    um dono e release() devolve; o buffer só é reescrito depois que todos os donos o devolveram.
+    Com todos os buffers em uso, next() retorna None e a fonte descarta o frame novo: um frame em
+    trânsito nunca é sobrescrito e a memória não cresce. O tamanho (FRAME_RING_SIZE) cobre os
+    frames que o pipeline retém ao mesmo tempo, então isso só acontece se um dono não devolver.
+    """
+
+    def __init__(self, shape, dtype=np.uint8, size=FRAME_RING_SIZE):
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.buffers = [np.empty(self.shape, dtype=dtype) for _ in range(max(1, size))]
+        self._owners = [0] * len(self.buffers)
+        self._index = 0
+        # next() roda na thread de captura; release() nas de detecção e do Tk.
+        self._lock = threading.Lock()
+
+    def next(self):
+        """Próximo buffer livre, já reservado para quem chamou, ou None se todos estiverem em uso."""
+        with self._lock:
+            for _ in range(len(self.buffers)):
+                index = self._index
+                self._index = (self._index + 1) % len(self.buffers)
+                if not self._owners[index]:
+                    self._owners[index] = 1
+                    return self.buffers[index]
+        return None
+
+    def _slot(self, frame):
+        for index, buffer in enumerate(self.buffers):
+            if buffer is frame:
+                return index
+        return None
+
+    def retain(self, frame):
+        """Acrescenta um dono a 'frame'; arrays que não são deste anel são ignorados."""
+        with self._lock:
+            index = self._slot(frame)
+            if index is not None:
+                self._owners[index] += 1
+
+    def release(self, frame):
+        """Devolve 'frame' ao anel; arrays de outro anel (ex.: de uma configuração anterior) são ignorados."""
+        with self._lock:
+            index = self._slot(frame)
+            if index is not None and self._owners[index]:
+                self._owners[index] -= 1
+
+
+# Conversão do stream 'lores' (sempre YUV420) para o formato do detector.
+LORES_CONVERSIONS = {
+    "BGR": cv2.COLOR_YUV2BGR_I420,
+    "RGB": cv2.COLOR_YUV2RGB_I420,
+}
+
+
+def lores_size_for(width, height, detection_width):
+    """Tamanho do stream 'lores' com a mesma proporção do 'main', ou None se não houver redução."""
+    if not detection_width or detection_width >= width:
+        return None
+    detection_height = int(round(height * detection_width / width / 2)) * 2
+    return (detection_width, detection_height)
+
+
+def frame_shape(width, height, pixel_format):
+    return (height, width) if pixel_format == "GRAY" else (height, width, 3)
+
+
+# Conversão de BGR (formato do cv2.VideoCapture) para o formato entregue.
+BGR_CONVERSIONS = {
+    "RGB": cv2.COLOR_BGR2RGB,
+    "GRAY": cv2.COLOR_BGR2GRAY,
+}
+
+
+class FpsMeter:
+    """FPS real medido pelos instantes de chegada dos últimos 'window' frames."""
+
+    def __init__(self, window=FPS_METER_WINDOW):
+        self._times = deque(maxlen=window)
+
+    def tick(self, timestamp=None):
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        self._times.append(timestamp)
+        return timestamp
+
+    def fps(self):
+        times = tuple(self._times)
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+
+class Pacer:
+    """Espera até o instante do próximo frame a 'fps'; se ficar para trás, recomeça do agora em vez de correr."""
+
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self._next = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self._next is None or now - self._next > self.interval:
+            self._next = now
+        elif self._next > now:
+            time.sleep(self._next - now)
+        self._next += self.interval
+
+
+CapturedFrame = namedtuple("CapturedFrame", ("sequence", "timestamp", "frame", "detection_frame"))
+
+
+class RecentFrames:
+    """
+    Os N frames mais recentes entregues pelo callback da câmera, com número de sequência e instante.
+    O produtor (thread da Picamera2) nunca espera; o consumidor pega o mais novo sem bloquear
+    (latest) ou espera a chegada de um mais novo que o último visto (wait_newer).
+    A lista é dona dos frames que guarda e os devolve com 'release' quando saem dela; quem pega um
+    frame com latest() ou wait_newer() vira dono também ('retain') e deve devolvê-lo ao terminar.
+    """
+
+    def __init__(self, size=CAPTURE_RECENT_FRAMES, retain=None, release=None):
+        self.size = max(1, size)
+        self._frames = deque()
+        self._condition = threading.Condition()
+        self._retain = retain
+        self._release = release
+        self.sequence = 0
+
+    def push(self, frame, detection_frame, timestamp):
+        with self._condition:
+            self.sequence += 1
+            self._frames.append(CapturedFrame(self.sequence, timestamp, frame, detection_frame))
+            if len(self._frames) > self.size:
+                self._drop(self._frames.popleft())
+            self._condition.notify_all()
+
+    def _drop(self, captured):
+        if self._release:
+            self._release(captured)
+
+    def _take(self, captured):
+        # Ainda sob o lock: o produtor não pode devolver o frame antes de o consumidor virar dono.
+        if captured is not None and self._retain:
+            self._retain(captured)
+        return captured
+
+    def latest(self):
+        with self._condition:
+            return self._take(self._frames[-1] if self._frames else None)
+
+    def wait_newer(self, sequence, timeout=None):
+        """Frame mais recente com sequência maior que 'sequence' (None: qualquer um), ou None no timeout."""
+        with self._condition:
+            newer = lambda: self._frames and (sequence is None or self._frames[-1].sequence > sequence)
+            if not self._condition.wait_for(newer, timeout):
+                return None
+            return self._take(self._frames[-1])
+
+    def drop_oldest(self):
+        """Devolve o frame mais antigo da lista, para liberar um buffer do anel. False se estiver vazia."""
+        with self._condition:
+            if not self._frames:
+                return False
+            self._drop(self._frames.popleft())
+            return True
+
+    def clear(self):
+        with self._condition:
+            for captured in self._frames:
+                self._drop(captured)
+            self._frames.clear()
+
+
+class FrameSource:
+    """
+    Interface comum das fontes de frames (Picamera2, cv2.VideoCapture, arquivo de vídeo, sintética).
+    Os frames são entregues em 'output_format' e escritos num FrameRing, sem alocação por frame.
+    get_properties() informa o FPS medido (o nominal enquanto ainda não há frames suficientes).
+    """
+
+    # Só a Picamera2 entrega um segundo stream reduzido para a detecção.
+    dual_stream = False
+
+    def __init__(self, output_format="BGR", ring_size=FRAME_RING_SIZE, name="câmera"):
+        if output_format not in FRAME_FORMATS:
+            raise ValueError(f"Formato de saída inválido: {output_format}")
+        self.output_format = output_format
+        self.ring_size = ring_size
+        self.frame_ring = None
+        self.width = None
+        self.height = None
+        self.fps_meter = FpsMeter()
+        # Instante de captura do último frame, em segundos (relógio da fonte; monotônico por padrão).
+        self.last_timestamp = None
+        self.frames_overwritten = 0  # frames que chegaram e foram substituídos ou descartados antes de serem lidos
+        self.log = RateLimitedLog(name)
+
+    @property
+    def active_detection_format(self):
+        return self.output_format
+
+    @property
+    def measured_fps(self):
+        return self.fps_meter.fps()
+
+    def nominal_fps(self):
+        """FPS anunciado pela fonte, usado até haver medição."""
+        return 30.0
+
+    def _configure(self, width, height):
+        self.width, self.height = width, height
+        # O anel é realocado apenas quando a configuração muda, nunca por frame.
+        self.frame_ring = FrameRing(frame_shape(width, height, self.output_format), size=self.ring_size)
+
+    def set_properties(self, width, height):
+        self._configure(width, height)
+        return self.get_properties()
+
+    def get_properties(self):
+        measured = self.measured_fps
+        return {'width': self.width, 'height': self.height, 'fps': measured or self.nominal_fps(),
+                'fps_measured': bool(measured)}
+
+    def get_frame(self):
+        raise NotImplementedError
+
+    def get_frame_pair(self):
+        """(ok, frame, frame_deteccao); sem stream de detecção separado, os dois são o mesmo frame."""
+        ret, frame = self.get_frame()
+        return (ret, frame, frame)
+
+    def release(self):
+        pass
+
+    def _rings(self):
+        return (self.frame_ring,)
+
+    def release_frame(self, frame, detection_frame=None):
+        """
+        Devolve ao anel os frames entregues por get_frame()/get_frame_pair(), quando o dono terminou de usá-los.
+        Um frame não devolvido nunca é reescrito; com o anel todo em uso, os frames novos são descartados.
+        """
+        self._update_owners("release", frame, detection_frame)
+
+    def _update_owners(self, method, frame, detection_frame=None):
+        # Sem stream separado o frame de detecção é o próprio frame: conta como um dono só.
+        buffers = (frame,) if detection_frame is None or detection_frame is frame else (frame, detection_frame)
+        for ring in self._rings():
+            if ring is not None:
+                for buffer in buffers:
+                    getattr(ring, method)(buffer)
+
+    def _ring_full(self):
+        """O frame novo foi descartado: todos os buffers do anel estão em uso."""
+        self.frames_overwritten += 1
+        self.log.log("anel", f"Todos os {len(self.frame_ring.buffers)} buffers do anel em uso; frame descartado")
+
+    def _store_bgr(self, bgr):
+        """
+        Copia um frame BGR para o próximo buffer do anel, redimensionando e convertendo se preciso.
+        Retorna None (frame descartado) se o anel estiver todo em uso.
+        """
+        self.last_timestamp = self.fps_meter.tick()
+        frame = self.frame_ring.next()
+        if frame is None:
+            self._ring_full()
+            return None
+        if bgr.shape[1] != self.width or bgr.shape[0] != self.height:
+            bgr = cv2.resize(bgr, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        if self.output_format == "BGR":
+            np.copyto(frame, bgr)
+        else:
+            cv2.cvtColor(bgr, BGR_CONVERSIONS[self.output_format], dst=frame)
+        return frame
+
+
+class PicameraSource(FrameSource):
+    """Câmera do Raspberry Pi via Picamera2, com stream 'lores' opcional para a detecção."""
+
+    def __init__(self, camera_index=0, output_format="BGR", ring_size=FRAME_RING_SIZE,
+                 detection_format=None, detection_width=None, async_capture=PICAMERA_ASYNC_CAPTURE,
+                 recent_frames=CAPTURE_RECENT_FRAMES):
+        # Formato entregue por get_frame() (stream 'main', usado na exibição).
+        # No modo assíncrono os anéis também guardam os 'recent_frames' mais recentes.
+        super().__init__(output_format, ring_size + (recent_frames if async_capture else 0),
+                         name=f"câmera {camera_index}")
+        detection_format = detection_format or output_format
+        if detection_format not in PICAMERA_FORMATS:
+            raise ValueError(f"Formato de saída inválido: {detection_format}")
+
+        # Importada só aqui: as outras fontes funcionam em máquinas sem a Picamera2.
+        from picamera2 import Picamera2, MappedArray
+        self._mapped_array = MappedArray
 
-class Camera:
-   
-    def __init__(self, camera_index=0):
         # Inicializa a câmera usando picamera2
         self.vid = Picamera2(camera_num=camera_index)
-    
+
+        # Stream 'lores' para a detecção: o ISP reduz a imagem em hardware, então o custo do
+        # detector não depende da resolução de exibição. detection_width=None desativa.
+        self.detection_format = detection_format
+        self.detection_width = detection_width
+        self.lores_size = None
+        self.detection_ring = None
+
+        # Modo assíncrono: o callback da Picamera2 copia cada frame concluído para o anel dos
+        # mais recentes, e get_frame() só pega o mais novo, sem esperar uma captura completa.
+        self.recent = (RecentFrames(recent_frames, self._retain_captured, self._release_captured)
+                       if async_capture else None)
+        self._last_sequence = None
+        if async_capture:
+            self.vid.post_callback = self._on_request
+
         # Configurações padrão para a pré-visualização e captura.
-        # Define o stream principal com uma resolução inicial e formato BGR888 para compatibilidade com OpenCV.
-        # Um stream 'lores' (baixa resolução) pode ser adicionado se você quiser uma pré-visualização separada,
-        # mas para sua aplicação, o stream 'main' será exibido diretamente.
-        self.video_config = self.vid.create_video_configuration(main={"size": (640, 480), "format": "BGR888"}) 
+        # O stream 'main' é pedido já no formato de pixel do detector.
+        self._configure(640, 480)
+
+        self.log.log("inicio", "Câmera inicializada com picamera2.")
+
+    def _configure(self, width, height):
+        self.lores_size = lores_size_for(width, height, self.detection_width)
+        streams = {"main": {"size": (width, height), "format": PICAMERA_FORMATS[self.output_format]}}
+        if self.lores_size:
+            # No Pi 4 o 'lores' só aceita YUV420. Larguras múltiplas de 64 evitam preenchimento de stride.
+            streams["lores"] = {"size": self.lores_size, "format": "YUV420"}
+        self.video_config = self.vid.create_video_configuration(**streams)
         self.vid.configure(self.video_config)
+
+        # Anéis prontos antes de iniciar: com o callback ativo, os frames chegam logo após o start().
+        super()._configure(width, height)
+        if self.lores_size:
+            lores_width, lores_height = self.lores_size
+            self.detection_ring = FrameRing(frame_shape(lores_width, lores_height, self.detection_format),
+                                            size=self.ring_size)
+        else:
+            self.detection_ring = None
+        if self.recent is not None:
+            self.recent.clear()
         self.vid.start()
-    
-        print(f"Câmera inicializada com picamera2.")
+
+    @property
+    def dual_stream(self):
+        return self.lores_size is not None
+
+    def _rings(self):
+        return (self.frame_ring, self.detection_ring)
+
+    def _retain_captured(self, captured):
+        self._update_owners("retain", captured.frame, captured.detection_frame)
+
+    def _release_captured(self, captured):
+        self.release_frame(captured.frame, captured.detection_frame)
+
+    @property
+    def active_detection_format(self):
+        """Formato do frame de detecção: o do 'lores' quando ativo, senão o próprio 'main'."""
+        return self.detection_format if self.dual_stream else self.output_format
 
     def set_properties(self, width, height):
         # Interrompe a câmera para aplicar novas configurações
-        self.vid.stop() 
-        
+        self.vid.stop()
+
         # Cria uma nova configuração de vídeo com a resolução desejada.
-        # O FPS não é diretamente "setado" aqui como em cv2.VideoCapture.
-        # O picamera2 tentará a taxa de quadros máxima para a resolução especificada,
-        # que geralmente será 30 FPS para as resoluções que você listou.
-        self.video_config = self.vid.create_video_configuration(main={"size": (width, height), "format": "BGR888"})
-        self.vid.configure(self.video_config)
-        self.vid.start()
-        
+        # O FPS não é diretamente "setado" aqui como em cv2.VideoCapture:
+        # o picamera2 usa a taxa máxima para a resolução, e get_properties() informa a medida.
+        self._configure(width, height)
+
         # Retorna as propriedades que foram definidas (ou as mais próximas que a câmera pode suportar).
         return self.get_properties()
 
-    def get_properties(self):
-        # Obtém a resolução atual do stream 'main' após a configuração.
-        width, height = self.vid.camera_properties['PixelArraySize'] 
-        
-        # Para o FPS, a picamera2 não expõe um CAP_PROP_FPS fácil para o FPS real durante o streaming.
-        # Considerando que a Raspberry Pi Camera V2 geralmente opera a 30 FPS para essas resoluções,
-        # vamos retornar 30 como o FPS "real" que o programa usará para a lógica de descarte.
-        # Isso pode ser ajustado se você tiver uma câmera com capacidades diferentes.
-        actual_fps = 30 # Valor típico para a Raspberry Pi Camera V2
-        return {'width': width, 'height': height, 'fps': actual_fps}
+    def nominal_fps(self):
+        # Duração de quadro configurada pelo libcamera (em µs); 30 se o controle não estiver disponível.
+        try:
+            return 1e6 / self.video_config["controls"]["FrameDurationLimits"][0]
+        except (KeyError, TypeError, IndexError, ZeroDivisionError):
+            return 30.0
+
+    def _copy_request(self, request):
+        """
+        Copia 'main' (e 'lores', se ativo) de uma requisição para os próximos buffers dos anéis.
+        Em vez de capture_array (que aloca uma cópia) + cvtColor (que aloca outra), mapeia o
+        buffer da requisição e copia direto. Retorna (frame, frame_deteccao, instante em s),
+        ou None se um dos anéis estiver todo em uso.
+        """
+        # SensorTimestamp (ns): instante do início da exposição, sem o atraso de entrega ao Python.
+        timestamp = request.get_metadata().get("SensorTimestamp")
+        timestamp = self.fps_meter.tick(timestamp / 1e9 if timestamp else None)
+
+        buffers = self._reserve_buffers()
+        if buffers is None:
+            self._ring_full()
+            return None
+        frame, detection_frame = buffers
+        try:
+            with self._mapped_array(request, "main") as mapped:
+                # O recorte remove o preenchimento de stride; no YUV420 planar as
+                # primeiras 'altura' linhas são o plano Y (luminância).
+                height, width = frame.shape[:2]
+                np.copyto(frame, mapped.array[:height, :width])
+
+            if self.dual_stream:
+                with self._mapped_array(request, "lores") as mapped:
+                    lores_width, lores_height = self.lores_size
+                    if self.detection_format == "GRAY":
+                        np.copyto(detection_frame, mapped.array[:lores_height, :lores_width])
+                    else:
+                        # Conversão pequena (resolução de detecção) escrita direto no buffer do anel.
+                        yuv = mapped.array[:lores_height * 3 // 2, :lores_width]
+                        cv2.cvtColor(yuv, LORES_CONVERSIONS[self.detection_format], dst=detection_frame)
+        except Exception:
+            # Sem frame entregue, ninguém mais devolveria os buffers reservados.
+            self.release_frame(frame, detection_frame)
+            raise
+        return frame, detection_frame, timestamp
+
+    def _reserve_buffers(self):
+        """
+        (frame, frame_deteccao) livres nos anéis, ou None. No modo assíncrono, com o anel cheio, os
+        frames mais antigos da lista dos recentes são devolvidos até liberar um buffer: perde-se um
+        frame velho ainda não lido (contado pela lacuna de sequência em _capture), não o novo.
+        """
+        while True:
+            frame = self.frame_ring.next()
+            detection_frame = frame
+            if frame is not None and self.dual_stream:
+                detection_frame = self.detection_ring.next()
+                if detection_frame is None:
+                    self.release_frame(frame)
+                    frame = None
+            if frame is not None:
+                return frame, detection_frame
+            if self.recent is None or not self.recent.drop_oldest():
+                return None
+
+    def _on_request(self, request):
+        # Chamado pela thread da Picamera2 a cada frame concluído; a requisição é devolvida por ela.
+        try:
+            copied = self._copy_request(request)
+        except Exception as e:
+            self.log.log("callback", f"Erro ao copiar frame: {e}")
+            return
+        if copied is not None:
+            self.recent.push(*copied)
+
+    def newest_frame(self):
+        """
+        Frame mais recente (CapturedFrame) sem bloquear, ou None. Só no modo assíncrono.
+        O chamador vira dono dos frames e deve devolvê-los com release_frame().
+        """
+        return self.recent.latest() if self.recent is not None else None
+
+    def _capture(self):
+        """(frame, frame_deteccao) do próximo frame, ou None se a câmera não entregou nada."""
+        if self.recent is not None:
+            # Espera só até chegar um frame mais novo que o último entregue; se o consumidor
+            # ficou para trás, pula direto para o mais recente.
+            captured = self.recent.wait_newer(self._last_sequence, timeout=1.0)
+            if captured is None:
+                self.log.log("timeout", "Nenhum frame novo da câmera em 1 s")
+                return None
+            if self._last_sequence is not None and captured.sequence > self._last_sequence + 1:
+                self.frames_overwritten += captured.sequence - self._last_sequence - 1
+            self._last_sequence = captured.sequence
+            self.last_timestamp = captured.timestamp
+            return captured.frame, captured.detection_frame
+
+        request = self.vid.capture_request()
+        if request is None:
+            self.log.log("falha", "Falha ao capturar frame")
+            return None
+        try:
+            copied = self._copy_request(request)
+        finally:
+            request.release()
+        if copied is None:
+            return None
+        frame, detection_frame, self.last_timestamp = copied
+        return frame, detection_frame
 
     def get_frame(self):
-        # Captura um frame do stream principal como um array NumPy.
-        # 'copy=False' pode ser usado para evitar a cópia, mas 'capture_array' já retorna uma cópia para segurança.
-        frame = self.vid.capture_array("main")
-        if frame is not None:
-            print("Frame capturado")
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            return (True, frame_bgr)
-        print("Falha ao capturar frame")
-        return (False, None)
+        # O frame retornado é um buffer do anel, reaproveitado depois de devolvido com release_frame().
+        captured = self._capture()
+        if captured is None:
+            return (False, None)
+        return (True, captured[0])
+
+    def get_frame_pair(self):
+        """
+        'main' e 'lores' da mesma requisição.
+        Retorna (ok, frame_main, frame_deteccao); sem stream 'lores', o frame de detecção é o próprio 'main'.
+        """
+        captured = self._capture()
+        if captured is None:
+            return (False, None, None)
+        return (True, captured[0], captured[1])
 
     def release(self):
+        if self.recent is not None:
+            self.vid.post_callback = None
         try:
             self.vid.stop()
         except Exception as e:
-            print(f"Erro ao parar a câmera: {e}")
+            self.log.log("parar", f"Erro ao parar a câmera: {e}")
         try:
             self.vid.close()
         except Exception as e:
-            print(f"Erro ao fechar a câmera: {e}")
-        print("Recursos da câmera liberados.")
\ No newline at end of file
+            self.log.log("fechar", f"Erro ao fechar a câmera: {e}")
+        self.log.log("liberar", "Recursos da câmera liberados.")
+
+
+class OpenCVSource(FrameSource):
+    """
+    Câmera via cv2.VideoCapture: V4L2/USB pelo índice, ou uma URL (RTSP, HTTP) em 'device'.
+    Se a câmera não aceitar a resolução pedida, o frame é redimensionado.
+    """
+
+    def __init__(self, camera_index=0, output_format="BGR", ring_size=FRAME_RING_SIZE, device=CAMERA_DEVICE):
+        super().__init__(output_format, ring_size, name=f"câmera {camera_index if device is None else device}")
+        self.device = camera_index if device is None else device
+        self.vid = cv2.VideoCapture(self.device)
+        if not self.vid.isOpened():
+            raise IOError(f"Não foi possível abrir a câmera {self.device}")
+        self._configure(640, 480)
+        self.log.log("inicio", f"Câmera {self.device} inicializada com cv2.VideoCapture.")
+
+    def _configure(self, width, height):
+        self.vid.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.vid.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        super()._configure(width, height)
+
+    def nominal_fps(self):
+        return self.vid.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def get_frame(self):
+        ret, bgr = self.vid.read()
+        if not ret:
+            return (False, None)
+        frame = self._store_bgr(bgr)
+        return (frame is not None, frame)
+
+    def release(self):
+        self.vid.release()
+        self.log.log("liberar", "Recursos da câmera liberados.")
+
+
+class VideoFileSource(FrameSource):
+    """
+    Reprodução de um arquivo de vídeo como se fosse uma câmera.
+    realtime=True respeita o FPS do arquivo; False entrega os frames o mais rápido possível
+    (útil para medir a vazão máxima do pipeline). Com loop=True volta ao início no fim do arquivo.
+    """
+
+    def __init__(self, path=VIDEO_FILE_PATH, output_format="BGR", ring_size=FRAME_RING_SIZE,
+                 realtime=VIDEO_FILE_REALTIME, loop=VIDEO_FILE_LOOP):
+        super().__init__(output_format, ring_size, name=f"vídeo {path}")
+        self.path = path
+        self.vid = cv2.VideoCapture(path)
+        if not self.vid.isOpened():
+            raise IOError(f"Não foi possível abrir o vídeo: {path}")
+        self.loop = loop
+        self.file_fps = self.vid.get(cv2.CAP_PROP_FPS) or 30.0
+        self.pacer = Pacer(self.file_fps if realtime else 0)
+        width = int(self.vid.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
+        height = int(self.vid.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 480
+        self._configure(width, height)
+        self.log.log("inicio", f"Reproduzindo {path} ({self.file_fps:.1f} FPS, "
+                               f"{'tempo real' if realtime else 'sem espera'}).")
+
+    def nominal_fps(self):
+        return self.file_fps if self.pacer.interval else 0.0
+
+    def get_frame(self):
+        self.pacer.wait()
+        ret, bgr = self.vid.read()
+        if not ret and self.loop:
+            self.vid.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, bgr = self.vid.read()
+        if not ret:
+            return (False, None)
+        frame = self._store_bgr(bgr)
+        return (frame is not None, frame)
+
+    def release(self):
+        self.vid.release()
+
+
+class SyntheticSource(FrameSource):
+    """
+    Frames gerados, sem hardware nem arquivo: um gradiente que desliza e um disco em movimento.
+    O conteúdo muda a cada frame (o porteiro de movimento e o rastreador têm trabalho),
+    com custo de geração de uma cópia de memória por frame.
+    """
+
+    def __init__(self, camera_index=0, output_format="BGR", ring_size=FRAME_RING_SIZE, fps=SYNTHETIC_FPS):
+        super().__init__(output_format, ring_size, name=f"câmera sintética {camera_index}")
+        self.fps = fps
+        self.pacer = Pacer(fps)
+        self.seed = camera_index
+        self.frame_counter = 0
+        self._configure(640, 480)
+
+    def _configure(self, width, height):
+        super()._configure(width, height)
+        # Padrão com uma largura extra para deslizar; gerado uma vez por configuração.
+        self.period = max(64, width // 4)
+        x = np.arange(width + self.period, dtype=np.float32)
+        y = np.arange(height, dtype=np.float32)[:, None]
+        base = 127 + 60 * np.sin(2 * np.pi * x / self.period) + 40 * np.cos(2 * np.pi * (y / height + self.seed / 4))
+        base = np.clip(base, 0, 255).astype(np.uint8)
+        if self.output_format == "GRAY":
+            self.pattern = base
+        else:
+            self.pattern = np.dstack([base, np.roll(base, self.period // 3, axis=1), np.roll(base, self.period // 2, axis=1)])
+
+    def nominal_fps(self):
+        return self.fps
+
+    def get_frame(self):
+        self.pacer.wait()
+        frame = self.frame_ring.next()
+        if frame is None:
+            self._ring_full()
+            return (False, None)
+        shift = (self.frame_counter * 4) % self.period
+        np.copyto(frame, self.pattern[:, shift:shift + self.width])
+
+        # Disco percorrendo o frame numa elipse, com o tamanho de uma face próxima.
+        t = self.frame_counter / max(self.fps, 1.0)
+        center = (int(self.width * (0.5 + 0.3 * np.cos(t))), int(self.height * (0.5 + 0.3 * np.sin(1.3 * t))))
+        color = 200 if self.output_format == "GRAY" else (150, 180, 220)
+        cv2.circle(frame, center, max(8, self.height // 8), color, -1)
+
+        self.frame_counter += 1
+        self.last_timestamp = self.fps_meter.tick()
+        return (True, frame)
+
+
+def open_camera(camera_index=0, output_format="BGR", detection_format=None, detection_width=None,
+                source=CAMERA_SOURCE):
+    """
+    Abre a fonte de frames configurada em CAMERA_SOURCE. Só a Picamera2 tem o stream 'lores';
+    nas outras fontes a detecção usa o próprio frame, entregue no formato do detector.
+    """
+    if source == "picamera2":
+        return PicameraSource(camera_index=camera_index, output_format=output_format,
+                              detection_format=detection_format, detection_width=detection_width)
+    # Sem stream separado: entrega direto no formato do detector (a exibição converte se preciso).
+    output_format = detection_format or output_format
+    if source == "opencv":
+        return OpenCVSource(camera_index=camera_index, output_format=output_format)
+    if source == "file":
+        return VideoFileSource(output_format=output_format)
+    if source == "synthetic":
+        return SyntheticSource(camera_index=camera_index, output_format=output_format)
+    raise ValueError(f"Fonte de frames desconhecida: {source}")
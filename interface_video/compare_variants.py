@@ -0,0 +1,146 @@
+"""
+Compara as variantes de precisão (fp32/fp16/int8) dos detectores neurais num vídeo de referência.
+
+Para cada variante mede a latência na CPU e a concordância com o modelo fp32 do mesmo
+detector e tamanho de entrada: uma face conta como concordante quando as caixas se
+sobrepõem com IoU >= --iou. Variantes cujo modelo não existe são relatadas e ignoradas.
+Uso (a partir de interface_video/):
+
+    python compare_variants.py --video gravacao.mp4
+    python compare_variants.py --frames frames/ --detectors ssd --output variantes.csv
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from algoritmos.base import iou_matrix
+from algoritmos.face_recognition_yolo_onnx import SUPPORTED_INPUT_SIZES, SUPPORTED_PRECISIONS
+from algoritmos.registry import create_detector
+from benchmark import load_frames, prepare_frames, write_results
+from config import RESOLUTION_OPTIONS
+
+# detector -> lista de (rótulo do grupo, kwargs); o primeiro de cada grupo (fp32) é a referência.
+VARIANTS = {
+    "ssd": [("300", {"precision": precision}) for precision in ("fp32", "fp16", "int8")],
+    "yolo_onnx": [(str(size), {"input_size": size, "precision": precision})
+                  for size in SUPPORTED_INPUT_SIZES for precision in SUPPORTED_PRECISIONS],
+}
+
+
+def match_count(reference, candidate, iou_threshold):
+    """Pareamento guloso pela maior IoU. Retorna (pares, soma das IoUs dos pares)."""
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0, 0.0
+    iou = iou_matrix(reference.boxes, candidate.boxes)
+    matches, iou_sum = 0, 0.0
+    while True:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[i, j] < iou_threshold:
+            break
+        matches += 1
+        iou_sum += float(iou[i, j])
+        iou[i, :] = -1
+        iou[:, j] = -1
+    return matches, iou_sum
+
+
+def run_variant(detector, frames, warmup=5):
+    """Latências (ms) e detecções de cada frame."""
+    for frame in frames[:warmup]:
+        detector.detect(frame, detector.input_format)
+    latencies = np.empty(len(frames), dtype=np.float64)
+    results = []
+    for i, frame in enumerate(frames):
+        start = time.perf_counter()
+        results.append(detector.detect(frame, detector.input_format))
+        latencies[i] = (time.perf_counter() - start) * 1000
+    return latencies, results
+
+
+def agreement(reference_results, results, iou_threshold):
+    reference_total = sum(len(r) for r in reference_results)
+    candidate_total = sum(len(r) for r in results)
+    matches, iou_sum = 0, 0.0
+    for reference, candidate in zip(reference_results, results):
+        m, s = match_count(reference, candidate, iou_threshold)
+        matches += m
+        iou_sum += s
+    recall = matches / reference_total if reference_total else 1.0
+    precision = matches / candidate_total if candidate_total else 1.0
+    return {
+        "agreement_recall": recall,
+        "agreement_precision": precision,
+        "agreement_f1": 2 * recall * precision / (recall + precision) if recall + precision else 0.0,
+        "matched_mean_iou": iou_sum / matches if matches else 0.0,
+        "faces_reference": reference_total,
+        "faces_variant": candidate_total,
+    }
+
+
+def compare(frames, detector_names, iou_threshold):
+    for name in detector_names:
+        references = {}
+        for group, kwargs in VARIANTS[name]:
+            variant = {"detector": name, "group": group, **kwargs}
+            try:
+                detector = create_detector(name, **kwargs)
+            except Exception as e:
+                print(f"[{name} {kwargs}] ignorado: {e}", file=sys.stderr)
+                yield {**variant, "error": repr(e)}
+                continue
+
+            prepared = prepare_frames(frames, frames[0].shape[1], frames[0].shape[0], detector.input_format)
+            latencies, results = run_variant(detector, prepared)
+            p50, p95 = np.percentile(latencies, [50, 95])
+            row = {**variant, "algorithm": detector.algorithm_name, "frames": len(prepared),
+                   "latency_mean_ms": float(latencies.mean()), "latency_p50_ms": float(p50),
+                   "latency_p95_ms": float(p95)}
+
+            if group not in references:
+                # Primeira variante do grupo que carregou (normalmente a fp32): referência das demais.
+                references[group] = (results, row["latency_mean_ms"], detector.algorithm_name)
+            reference_results, reference_latency, row["reference"] = references[group]
+            row["speedup"] = reference_latency / row["latency_mean_ms"] if row["latency_mean_ms"] else 0.0
+            row.update(agreement(reference_results, results, iou_threshold))
+            yield row
+            del detector
+
+
+def print_table(results):
+    print(f"\n{'variante':<28} {'p50':>8} {'p95':>8} {'ganho':>6} {'recall':>7} {'precisão':>9} {'IoU':>5}",
+          file=sys.stderr)
+    for r in results:
+        if "error" in r:
+            continue
+        print(f"{r['algorithm']:<28} {r['latency_p50_ms']:>6.1f}ms {r['latency_p95_ms']:>6.1f}ms "
+              f"{r['speedup']:>5.2f}x {r['agreement_recall']:>7.2%} {r['agreement_precision']:>9.2%} "
+              f"{r['matched_mean_iou']:>5.2f}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência e concordância das variantes fp32/fp16/int8.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="vídeo de referência")
+    source.add_argument("--frames", help="diretório com imagens de referência")
+    parser.add_argument("--detectors", nargs="*", default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument("--resolution", default=next(iter(RESOLUTION_OPTIONS)), choices=list(RESOLUTION_OPTIONS),
+                        help="resolução em que os frames são entregues aos detectores")
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU mínima para duas caixas concordarem")
+    parser.add_argument("--max-frames", type=int, default=200)
+    parser.add_argument("--output", help="arquivo de saída (.jsonl ou .csv); padrão: JSON Lines na saída padrão")
+    args = parser.parse_args()
+
+    frames, _ = load_frames(args.video, args.frames, args.max_frames)
+    resolution = RESOLUTION_OPTIONS[args.resolution]
+    frames = prepare_frames(frames, resolution["width"], resolution["height"], "BGR")
+    print(f"{len(frames)} frames de referência em {resolution['width']}x{resolution['height']}.", file=sys.stderr)
+
+    results = list(compare(frames, args.detectors, args.iou))
+    write_results(results, args.output)
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,4 +12,195 @@ FPS_OPTIONS = {
     "Alta (15 FPS)": 15,
     "Média (10 FPS)": 10,
     "Baixa (5 FPS)": 5,
-}
\ No newline at end of file
+}
+
+# Intervalo de detecção (modo rastreamento)
+# O detector roda a cada N frames; nos intermediários um rastreador de fluxo óptico
+# propaga as caixas, mantendo a exibição fluida com custo de detecção dividido por N.
+DETECTION_INTERVAL_OPTIONS = {
+    "Todo frame (sem rastreamento)": 1,
+    "A cada 2 frames": 2,
+    "A cada 3 frames": 3,
+    "A cada 5 frames": 5,
+}
+
+# Tamanho das filas entre captura, detecção e exibição.
+# Quando uma fila enche, o frame mais antigo é descartado.
+PIPELINE_QUEUE_SIZE = 2
+
+# Cadência da detecção, guiada pelos instantes de captura (veja frame_scheduler.py).
+# "fixed" processa exatamente o FPS pedido na GUI; "latency" também limita ao que o detector
+# sustenta, medido pelo tempo de processamento recente.
+FRAME_PACING_MODE = "fixed"
+FRAME_SCHEDULER_WINDOW = 60      # frames processados usados no FPS alcançado e no jitter
+
+# Contextos do detector por câmera (veja detector_pool.py): os pesos são compartilhados e cada
+# contexto tem o próprio estado de inferência, então as câmeras detectam em paralelo.
+# None = um contexto por câmera; 1 = todas as câmeras no mesmo detector, uma de cada vez.
+DETECTOR_POOL_SIZE = None
+
+# Detecção em processos separados (modo Múltiplas Câmeras).
+# Quando ativado, cada núcleo roda um processo com seu próprio modelo e os frames
+# são trocados por memória compartilhada. None = um processo por núcleo.
+USE_PROCESS_DETECTOR = False
+PROCESS_DETECTOR_WORKERS = None
+PROCESS_DETECTOR_SLOTS_PER_WORKER = 2
+PROCESS_DETECTOR_TIMEOUT = 10.0  # segundos
+
+# Modo de múltiplas câmeras com detectores que aceitam lote (SSD, YOLO): junta o frame
+# mais recente de cada câmera e roda uma única inferência. A janela é quanto esperar
+# pelas outras câmeras depois que o primeiro frame chega.
+USE_BATCH_SCHEDULER = True
+BATCH_WINDOW_MS = 10
+BATCH_DETECT_TIMEOUT = 10.0  # segundos de espera por um lote antes de desistir do frame
+
+# Fonte dos frames: "picamera2" (câmera do Raspberry Pi), "opencv" (cv2.VideoCapture: V4L2/USB,
+# ou a URL em CAMERA_DEVICE, p. ex. RTSP), "file" (reproduz VIDEO_FILE_PATH) ou "synthetic"
+# (gerados, sem hardware). As fontes medem o FPS real pelos instantes de chegada dos frames.
+CAMERA_SOURCE = "picamera2"
+CAMERA_DEVICE = None             # None usa o índice da câmera
+VIDEO_FILE_PATH = "gravacao.mp4"
+VIDEO_FILE_REALTIME = True       # False entrega os frames o mais rápido possível
+VIDEO_FILE_LOOP = True
+SYNTHETIC_FPS = 30.0
+FPS_METER_WINDOW = 60            # frames usados na medição do FPS
+
+# Captura assíncrona na Picamera2: o callback de cada requisição concluída copia o frame para
+# um anel com os CAPTURE_RECENT_FRAMES mais recentes (com sequência e instante), e o pipeline
+# pega sempre o mais novo. False volta à captura bloqueante (capture_request a cada frame).
+PICAMERA_ASYNC_CAPTURE = True
+CAPTURE_RECENT_FRAMES = 3
+
+# Buffers pré-alocados por câmera. Precisa cobrir os frames em trânsito:
+# as duas filas do pipeline + captura, detecção e exibição em andamento.
+# O anel não cresce: com todos os buffers em uso, o frame novo é descartado.
+FRAME_RING_SIZE = 2 * PIPELINE_QUEUE_SIZE + 3
+
+# Detecção no stream 'lores' da Picamera2 (reduzido em hardware pelo ISP).
+# As caixas são reescaladas para o stream 'main' antes de desenhar.
+# None desativa e a detecção volta a rodar no 'main'. Use múltiplos de 64.
+# As cascatas pedem um 'lores' mais largo quando a face a FACE_MAX_DISTANCE_M ficaria abaixo de
+# CASCADE_MIN_FACE_PX (320 px com a geometria padrão dá ~13 px; são necessários ~768).
+DETECTION_STREAM_WIDTH = 320
+
+# Porteiro de movimento: só chama o detector quando algo muda na cena,
+# e apenas nas regiões alteradas.
+USE_MOTION_GATE = False
+MOTION_GATE_WIDTH = 160          # largura do frame reduzido usado na diferença de fundo
+MOTION_THRESHOLD = 25            # diferença mínima de intensidade (0-255) para contar como movimento
+MOTION_MIN_AREA = 0.002          # fração mínima da imagem para uma região ser considerada
+MOTION_REGION_MARGIN = 0.25      # margem adicionada em volta de cada região (fração do tamanho)
+MOTION_FULL_FRAME_RATIO = 0.5    # acima dessa fração de área alterada, detecta o frame inteiro
+MOTION_FULL_REFRESH_FRAMES = 90  # força uma detecção completa periodicamente
+
+# Detectores disponíveis pelo nome registrado em algoritmos/registry.py
+# e algoritmo carregado ao iniciar a aplicação.
+DEFAULT_DETECTOR = "yolo"
+
+# YOLOv8-face exportado para ONNX (detector "yolo_onnx", gerado por export_yolo_onnx.py).
+# Tamanho de entrada: 320, 416 ou 640 (menor = mais rápido, perde faces pequenas).
+# Backend "onnxruntime" (se instalado) ou "opencv" (cv2.dnn). Threads: None usa o padrão do backend.
+YOLO_ONNX_INPUT_SIZE = 320
+YOLO_ONNX_BACKEND = "onnxruntime"
+YOLO_ONNX_THREADS = None
+
+# Precisão dos modelos neurais: "fp32", "fp16" ou "int8".
+# SSD: fp32/fp16 escolhem o caffemodel (e, no fp16, o cálculo em meia precisão quando o OpenCV suporta);
+#      int8 quantiza a rede fp32 ao carregar, calibrando com QUANT_CALIBRATION_SOURCE.
+# YOLO ONNX: escolhe o arquivo gerado por quantize_models.py (yolov8n-face-<tamanho>-<precisão>.onnx).
+# Compare latência e concordância das variantes com compare_variants.py.
+SSD_PRECISION = "fp16"
+SSD_INPUT_SIZE = 300
+YOLO_ONNX_PRECISION = "fp32"
+QUANT_CALIBRATION_SOURCE = "arquivos_algoritmos/calibracao"  # vídeo ou diretório de imagens
+QUANT_CALIBRATION_FRAMES = 32
+
+# Desenho das caixas nos frames. Desligar em execuções sem tela.
+ANNOTATE_FRAMES = True
+
+# Métricas de desempenho: quantas medições recentes guardar por estágio,
+# intervalo de amostragem da CPU (s) e janela do FPS móvel (s).
+METRICS_WINDOW = 1000
+CPU_SAMPLE_INTERVAL = 1.0
+FPS_WINDOW_SECONDS = 5.0
+
+# Registro de métricas por sessão em JSON Lines (uma linha por câmera a cada
+# METRICS_LOG_INTERVAL segundos e uma final ao fechar), para não perder a execução numa falha.
+METRICS_LOG_PATH = "performance_log.jsonl"
+METRICS_LOG_INTERVAL = 10.0
+
+# Endpoint HTTP local com as métricas ao vivo (/metrics no formato do Prometheus, /metrics.json).
+METRICS_HTTP_ENABLED = False
+METRICS_HTTP_HOST = "127.0.0.1"
+METRICS_HTTP_PORT = 9108
+
+# Controle adaptativo de qualidade: mede a latência de detecção e a CPU ao vivo e desce
+# (ou sobe) um nível da escada abaixo com histerese, sem reiniciar as câmeras.
+#   scale    -> fração da resolução do frame entregue ao detector
+#   interval -> detecção a cada N frames, com rastreamento entre elas (nunca abaixo do escolhido na GUI)
+#   detector -> opcional; troca o backend (nome registrado) nos níveis mais baratos
+ADAPTIVE_QUALITY = False
+ADAPTIVE_LATENCY_BUDGET_MS = None  # None: 1000 / FPS desejado (o detector acompanha a câmera)
+ADAPTIVE_CPU_CEILING = 85.0        # % de CPU do sistema
+ADAPTIVE_CHECK_INTERVAL_MS = 1000
+ADAPTIVE_WINDOW = 30               # últimas medições consideradas em cada verificação
+ADAPTIVE_DOWN_CHECKS = 3           # verificações seguidas acima do limite para baixar a qualidade
+ADAPTIVE_UP_CHECKS = 10            # verificações seguidas com folga para subir a qualidade
+ADAPTIVE_UP_MARGIN = 0.6           # "folga" = abaixo desta fração do orçamento e do teto de CPU
+ADAPTIVE_LEVELS = [
+    {"scale": 1.0, "interval": 1},
+    {"scale": 0.75, "interval": 1},
+    {"scale": 0.5, "interval": 1},
+    {"scale": 0.5, "interval": 2},
+    {"scale": 0.5, "interval": 3},
+    {"scale": 0.5, "interval": 3, "detector": "lbp"},
+]
+
+# Cascatas (Viola, LBP): tamanho esperado das faces a partir da geometria da cena.
+# Com o campo de visão horizontal da câmera e a faixa de distâncias das pessoas, a menor face
+# (mais distante) e a maior (mais próxima) viram minSize/maxSize do detectMultiScale.
+# Com CASCADE_DOWNSCALE a imagem é reduzida até a menor face ficar com CASCADE_MIN_FACE_PX pixels.
+# A imagem nunca é ampliada: se a menor face já for menor que isso, minSize fica em CASCADE_MIN_FACE_PX
+# e as faces mais distantes não são encontradas (aviso no console).
+CAMERA_HFOV_DEGREES = 53.5   # câmera v1 do Raspberry Pi (OV5647)
+FACE_WIDTH_M = 0.16
+FACE_MIN_DISTANCE_M = 0.5
+FACE_MAX_DISTANCE_M = 4.0
+CASCADE_MIN_FACE_PX = 30
+CASCADE_DOWNSCALE = True
+
+# Conjunto de detectores: um barato (cascata) em todo frame e o detector selecionado
+# (forte) só para confirmar candidatos novos; as caixas são fundidas com NMS.
+# None desativa. O forte também roda a cada ENSEMBLE_REFRESH_FRAMES para achar o que o barato perdeu.
+ENSEMBLE_CHEAP_DETECTOR = None   # ex.: "lbp" ou "viola"
+ENSEMBLE_CONFIRM_IOU = 0.3       # sobreposição mínima para o forte confirmar um candidato
+ENSEMBLE_CONFIRM_TTL = 15        # frames em que uma confirmação continua valendo
+ENSEMBLE_NMS_IOU = 0.4
+ENSEMBLE_REFRESH_FRAMES = 30
+
+# Recorte e refinamento: uma etapa rápida propõe regiões ("cascade": detector barato em baixa
+# resolução; "motion": regiões com movimento) e o detector pesado roda, em lote, só sobre recortes
+# quadrados dessas regiões, ampliados até a entrada da rede. Melhora faces pequenas em câmeras
+# de alta resolução sem inferência no frame inteiro. Usa o frame 'main' (desliga o 'lores').
+USE_CROP_REFINE = False
+CROP_REFINE_PROPOSALS = "cascade"           # "cascade" ou "motion"
+CROP_REFINE_PROPOSAL_DETECTOR = "lbp"       # detector das propostas no modo "cascade"
+CROP_REFINE_CONTEXT = 1.0                   # margem em volta de cada proposta (fração do tamanho)
+CROP_REFINE_MAX_CROPS = 6                   # acima disso roda no frame inteiro
+CROP_REFINE_FULL_INTERVAL = 30              # frame inteiro periodicamente, para achar o que as propostas perdem
+CROP_REFINE_NMS_IOU = 0.4
+
+# Reconhecimento (identidade) depois da detecção: descritor de cada face comparado com a galeria
+# gerada por enroll_faces.py. O descritor fica em cache por face rastreada e só é recalculado
+# a cada RECOGNITION_REFRESH_FRAMES frames. Extratores: "dlib" (128 dimensões) ou "onnx" (ArcFace/MobileFaceNet).
+USE_RECOGNITION = False
+RECOGNITION_EMBEDDER = "dlib"
+EMBEDDING_ONNX_MODEL = "arquivos_algoritmos/embedding/mobilefacenet.onnx"
+EMBEDDING_ONNX_INPUT_SIZE = 112
+RECOGNITION_GALLERY_PATH = "arquivos_algoritmos/galeria/galeria"  # sem extensão (.npy/.json)
+RECOGNITION_THRESHOLD = None       # semelhança mínima; None usa o padrão do extrator
+RECOGNITION_REFRESH_FRAMES = 30
+RECOGNITION_CACHE_MAX_AGE = 90     # frames sem ver uma face até descartá-la do cache
+# Índice aproximado (listas invertidas) para galerias com pelo menos esse número de vetores; None desativa.
+RECOGNITION_ANN_MIN_SIZE = 20000
+RECOGNITION_ANN_PROBES = 8
@@ -0,0 +1,103 @@
+import threading
+
+from algoritmos.base import Detections, DetectorWrapper, nms
+from algoritmos.preprocessing import FrameCache
+from motion_gate import MotionRegionFinder, merge_boxes
+from config import (CROP_REFINE_CONTEXT, CROP_REFINE_MAX_CROPS, CROP_REFINE_FULL_INTERVAL, CROP_REFINE_NMS_IOU)
+
+
+def square_crop(box, context, frame_w, frame_h):
+    """Quadrado centrado na caixa (x, y, w, h), com 'context' de margem, limitado ao frame."""
+    x, y, w, h = box
+    side = int(max(w, h) * (1 + context))
+    side = min(side, frame_w, frame_h)
+    x0 = min(max(0, int(x + w / 2 - side / 2)), frame_w - side)
+    y0 = min(max(0, int(y + h / 2 - side / 2)), frame_h - side)
+    return x0, y0, side, side
+
+
+class CropRefineDetector(DetectorWrapper):
+    """
+    Detecção em dois estágios: propostas baratas e o detector pesado só nos recortes.
+
+    As propostas vêm de um detector barato (cascata, que já roda em resolução reduzida) ou de um
+    MotionRegionFinder, somadas às faces do frame anterior para que uma face achada continue sendo
+    refinada. Cada proposta vira um recorte quadrado com margem, recortes sobrepostos são unidos e
+    todos vão juntos para detect_batch(); o detector pesado redimensiona cada recorte para a sua
+    entrada, o que amplia as faces pequenas. Sem propostas, com recortes demais ou a cada
+    'full_interval' frames, roda no frame inteiro. Guarda estado, então é por câmera.
+    """
+
+    def __init__(self, detector, detector_lock=None, proposer=None, proposer_lock=None, context=CROP_REFINE_CONTEXT,
+                 max_crops=CROP_REFINE_MAX_CROPS, full_interval=CROP_REFINE_FULL_INTERVAL, nms_iou=CROP_REFINE_NMS_IOU):
+        super().__init__(detector)
+        self.detector_lock = detector_lock or threading.Lock()
+        # Sem detector de propostas, usa as regiões com movimento.
+        self.proposer = proposer
+        self.proposer_lock = proposer_lock or threading.Lock()
+        self.motion = None if proposer else MotionRegionFinder()
+        self.context = context
+        self.max_crops = max_crops
+        self.full_interval = full_interval
+        self.nms_iou = nms_iou
+
+        self.last_detections = Detections()
+        self.frames_since_full = None
+        self.frames_full = 0
+        self.frames_cropped = 0
+        self.crops_total = 0
+
+    @property
+    def algorithm_name(self):
+        return f"CropRefine({self.detector.algorithm_name})"
+
+    def detect(self, frame, frame_format="BGR"):
+        return self.detect_cached(FrameCache(frame, frame_format))
+
+    def _proposals(self, cache):
+        """Caixas candidatas (x, y, w, h), ou None quando o frame inteiro deve ser processado."""
+        if self.proposer is not None:
+            with self.proposer_lock:
+                return self.proposer.detect_cached(cache).boxes.tolist()
+        return self.motion.find(cache.gray())
+
+    def detect_cached(self, cache):
+        frame = cache.frame
+        frame_h, frame_w = frame.shape[:2]
+        proposals = self._proposals(cache)
+
+        full = (proposals is None or self.frames_since_full is None
+                or self.frames_since_full + 1 >= self.full_interval)
+        crops = []
+        if not full:
+            proposals = proposals + self.last_detections.boxes.tolist()
+            crops = merge_boxes([square_crop(box, self.context, frame_w, frame_h) for box in proposals])
+            full = len(crops) > self.max_crops
+
+        if full:
+            self.frames_full += 1
+            self.frames_since_full = 0
+            with self.detector_lock:
+                self.last_detections = self.detector.detect_cached(cache)
+            return self.last_detections
+
+        self.frames_since_full += 1
+        if not crops:
+            self.last_detections = Detections()
+            return self.last_detections
+
+        self.frames_cropped += 1
+        self.crops_total += len(crops)
+        # Os recortes são views do frame, sem cópia; o detector os amplia para a sua entrada.
+        views = [frame[y:y + h, x:x + w] for x, y, w, h in crops]
+        with self.detector_lock:
+            if self.detector.supports_batch:
+                results = self.detector.detect_batch(views, [cache.frame_format] * len(views))
+            else:
+                # Um a um, informando a largura do frame (as cascatas estimam o tamanho das faces por ela).
+                results = [self.detector.detect_cached(FrameCache(view, cache.frame_format, frame_w))
+                           for view in views]
+        merged = Detections.concatenate([detections.offset(x, y) for detections, (x, y, _, _) in zip(results, crops)])
+        # Recortes unidos podem se sobrepor às bordas de outros; a mesma face pode aparecer duas vezes.
+        self.last_detections = merged.select(nms(merged.boxes, merged.scores, self.nms_iou)) if len(merged) else merged
+        return self.last_detections
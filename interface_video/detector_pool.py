@@ -0,0 +1,56 @@
+import threading
+
+from config import DETECTOR_POOL_SIZE
+
+
+class DetectorPool:
+    """
+    Contextos de um mesmo detector para as threads de detecção das câmeras.
+    Cada contexto vem de detector.new_context(): compartilha os pesos imutáveis com os demais e tem o
+    próprio estado de inferência, então câmeras em contextos diferentes detectam em paralelo.
+    Detectores que não sabem separar pesos e estado recebem uma instância nova por contexto.
+
+    size: número máximo de contextos (None = um por câmera). Com mais câmeras que contextos, as
+    câmeras são repartidas pelos menos usados, e só as que dividem um contexto dividem o lock dele.
+    """
+
+    def __init__(self, detector, create_fn=None, size=DETECTOR_POOL_SIZE):
+        self.detector = detector
+        self.create_fn = create_fn
+        self.size = size
+        # O próprio detector é o primeiro contexto.
+        self._contexts = [(detector, threading.Lock())]
+        self._users = [set()]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._contexts)
+
+    def _new_context(self):
+        context = self.detector.new_context()
+        if context is None and self.create_fn:
+            context = self.create_fn()
+        return context
+
+    def acquire(self, owner):
+        """(contexto, lock) de 'owner' (ex.: índice da câmera); o mesmo dono recebe sempre o mesmo contexto."""
+        with self._lock:
+            for index, users in enumerate(self._users):
+                if owner in users:
+                    return self._contexts[index]
+
+            index = min(range(len(self._contexts)), key=lambda i: len(self._users[i]))
+            if self._users[index] and (self.size is None or len(self._contexts) < self.size):
+                context = self._new_context()
+                if context is not None:
+                    self._contexts.append((context, threading.Lock()))
+                    self._users.append(set())
+                    index = len(self._contexts) - 1
+            self._users[index].add(owner)
+            return self._contexts[index]
+
+    def release(self, owner):
+        """Devolve o contexto de 'owner'; os contextos ficam carregados para a próxima câmera."""
+        with self._lock:
+            for users in self._users:
+                users.discard(owner)
@@ -0,0 +1,90 @@
+"""
+Gera a galeria de identidades usada pelo reconhecimento (USE_RECOGNITION em config.py).
+
+Cada subdiretório de --images é uma pessoa, e as imagens dentro dele são fotos dela:
+
+    pessoas/
+      ana/  foto1.jpg foto2.jpg
+      joao/ perfil.png
+
+Em cada foto, a maior face encontrada pelo detector vira uma linha da galeria.
+Uso (a partir de interface_video/):
+
+    python enroll_faces.py --images pessoas/
+    python enroll_faces.py --images novas/ --append --embedder onnx
+"""
+import argparse
+import glob
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from algoritmos.embedding import EMBEDDERS, create_embedder
+from algoritmos.registry import available_detectors, create_detector
+from recognition import FaceGallery
+from config import RECOGNITION_EMBEDDER, RECOGNITION_GALLERY_PATH
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def iter_images(root):
+    """(pessoa, caminho) de cada imagem, em ordem."""
+    for person in sorted(os.listdir(root)):
+        folder = os.path.join(root, person)
+        if not os.path.isdir(folder):
+            continue
+        for path in sorted(glob.glob(os.path.join(folder, "*"))):
+            if path.lower().endswith(IMAGE_EXTENSIONS):
+                yield person, path
+
+
+def enroll(root, detector, embedder):
+    labels, embeddings = [], []
+    for person, path in iter_images(root):
+        image = cv2.imread(path)
+        if image is None:
+            print(f"{path}: não foi possível ler a imagem", file=sys.stderr)
+            continue
+        detections = detector.detect(image, "BGR")
+        if not len(detections):
+            print(f"{path}: nenhuma face encontrada", file=sys.stderr)
+            continue
+        largest = int(np.argmax(detections.boxes[:, 2] * detections.boxes[:, 3]))
+        embeddings.append(embedder.embed(image, "BGR", detections.boxes[largest:largest + 1])[0])
+        labels.append(person)
+    return labels, embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera a galeria de faces conhecidas para o reconhecimento.")
+    parser.add_argument("--images", required=True, help="diretório com um subdiretório de fotos por pessoa")
+    parser.add_argument("--output", default=RECOGNITION_GALLERY_PATH, help="caminho da galeria, sem extensão")
+    parser.add_argument("--embedder", default=RECOGNITION_EMBEDDER, choices=list(EMBEDDERS))
+    parser.add_argument("--detector", default="ssd", choices=available_detectors())
+    parser.add_argument("--append", action="store_true", help="acrescenta à galeria existente")
+    args = parser.parse_args()
+
+    labels, embeddings = enroll(args.images, create_detector(args.detector), create_embedder(args.embedder))
+    if not embeddings:
+        sys.exit("Nenhuma face cadastrada.")
+    embeddings = np.stack(embeddings)
+
+    if args.append and os.path.exists(args.output + ".npy"):
+        existing = FaceGallery(args.output, ann_min_size=None)
+        if existing.embedder != args.embedder:
+            sys.exit(f"A galeria existente usa o extrator '{existing.embedder}'.")
+        labels = list(existing.labels) + labels
+        embeddings = np.concatenate((np.asarray(existing.matrix), embeddings))
+        del existing  # fecha o arquivo mapeado antes de reescrevê-lo
+
+    FaceGallery.write(args.output, labels, embeddings, args.embedder)
+    print(f"Galeria {args.output}: {len(labels)} descritores de {len(set(labels))} pessoas "
+          f"({embeddings.shape[1]} dimensões).")
+    # Constrói o índice aproximado já aqui, se a galeria for grande o bastante para usá-lo.
+    FaceGallery(args.output)
+
+
+if __name__ == "__main__":
+    main()
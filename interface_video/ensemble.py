@@ -0,0 +1,84 @@
+import threading
+
+from algoritmos.base import Detections, FaceDetector, iou_matrix, nms
+from algoritmos.preprocessing import FrameCache
+from config import (ENSEMBLE_CONFIRM_IOU, ENSEMBLE_CONFIRM_TTL, ENSEMBLE_NMS_IOU, ENSEMBLE_REFRESH_FRAMES)
+
+
+class EnsembleDetector(FaceDetector):
+    """
+    Detector barato em todo frame e detector forte só para confirmar.
+
+    Os dois recebem o mesmo preprocessing.FrameCache, então cinza, RGB e o blob do SSD são feitos
+    uma vez por frame. O forte roda quando surge um candidato que não bate com nenhuma confirmação
+    recente (ou a cada 'refresh_frames'); candidatos sem caixa do forte por perto são descartados,
+    e as caixas do forte que o barato perdeu entram no resultado. Guarda estado, então é por câmera.
+    """
+
+    def __init__(self, cheap, strong, cheap_lock=None, strong_lock=None, confirm_iou=ENSEMBLE_CONFIRM_IOU,
+                 confirm_ttl=ENSEMBLE_CONFIRM_TTL, nms_iou=ENSEMBLE_NMS_IOU, refresh_frames=ENSEMBLE_REFRESH_FRAMES):
+        self.cheap = cheap
+        self.strong = strong
+        self.cheap_lock = cheap_lock or threading.Lock()
+        self.strong_lock = strong_lock or threading.Lock()
+        self.confirm_iou = confirm_iou
+        self.confirm_ttl = confirm_ttl
+        self.nms_iou = nms_iou
+        self.refresh_frames = refresh_frames
+
+        # A câmera entrega o formato do detector forte; o barato converte pelo cache.
+        self.input_format = strong.input_format
+        self.label = f"{cheap.label}+{strong.label}"
+        self.color = strong.color
+        self.has_scores = strong.has_scores
+
+        self.confirmed = Detections()
+        self.confirmed_frame = None
+        self.frame_counter = 0
+        self.strong_runs = 0
+
+    @property
+    def algorithm_name(self):
+        return f"Ensemble({self.cheap.algorithm_name}+{self.strong.algorithm_name})"
+
+    def detect(self, frame, frame_format="BGR"):
+        return self.detect_cached(FrameCache(frame, frame_format))
+
+    def detect_cached(self, cache):
+        self.frame_counter += 1
+        with self.cheap_lock:
+            candidates = self.cheap.detect_cached(cache)
+
+        confirmation_valid = (self.confirmed_frame is not None
+                              and self.frame_counter - self.confirmed_frame < self.confirm_ttl)
+        refresh = self.confirmed_frame is None or self.frame_counter - self.confirmed_frame >= self.refresh_frames
+
+        if not refresh:
+            if len(candidates) == 0:
+                return candidates
+            if confirmation_valid and len(self.confirmed):
+                overlap = iou_matrix(candidates.boxes, self.confirmed.boxes)
+                if (overlap.max(axis=1) >= self.confirm_iou).all():
+                    # Todos os candidatos já foram confirmados há pouco: custo só do barato.
+                    return self._with_scores_from(candidates, self.confirmed, overlap)
+
+        with self.strong_lock:
+            strong = self.strong.detect_cached(cache)
+        self.strong_runs += 1
+        self.confirmed = strong
+        self.confirmed_frame = self.frame_counter
+        return self._fuse(candidates, strong)
+
+    @staticmethod
+    def _with_scores_from(candidates, reference, overlap):
+        # Cada candidato herda a confiança da caixa do forte com que mais se sobrepõe.
+        return Detections(candidates.boxes, reference.scores[overlap.argmax(axis=1)])
+
+    def _fuse(self, candidates, strong):
+        if len(candidates) == 0 or len(strong) == 0:
+            return strong
+        overlap = iou_matrix(candidates.boxes, strong.boxes)
+        keep = overlap.max(axis=1) >= self.confirm_iou
+        confirmed = self._with_scores_from(candidates.select(keep), strong, overlap[keep]) if keep.any() else Detections()
+        merged = Detections.concatenate([strong, confirmed])
+        return merged.select(nms(merged.boxes, merged.scores, self.nms_iou))
@@ -0,0 +1,43 @@
+"""
+Exporta o YOLOv8-face (.pt) para ONNX, um arquivo por tamanho de entrada, para o detector "yolo_onnx".
+
+Precisa do ultralytics só na máquina onde a exportação é feita; o Raspberry Pi
+roda o .onnx com onnxruntime ou cv2.dnn. Uso (a partir de interface_video/):
+
+    python export_yolo_onnx.py                    # 320, 416 e 640
+    python export_yolo_onnx.py --sizes 320 --opset 12
+
+As variantes fp16/int8 são geradas a partir destes arquivos por quantize_models.py.
+"""
+import argparse
+import shutil
+
+from algoritmos.face_recognition_yolo_onnx import SUPPORTED_INPUT_SIZES, model_path_for
+
+DEFAULT_WEIGHTS = "arquivos_algoritmos/yolo/yolov8n-face.pt"
+
+
+def export(weights, sizes, opset):
+    from ultralytics import YOLO
+
+    for size in sizes:
+        model = YOLO(weights)
+        # Entrada fixa (sem eixos dinâmicos): o cv2.dnn e o onnxruntime otimizam melhor.
+        exported = model.export(format="onnx", imgsz=size, opset=opset, simplify=True, dynamic=False)
+        target = model_path_for(size)
+        shutil.move(exported, target)
+        print(f"{size}x{size}: {target}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta o YOLOv8-face para ONNX.")
+    parser.add_argument("--weights", default=DEFAULT_WEIGHTS)
+    parser.add_argument("--sizes", nargs="*", type=int, default=list(SUPPORTED_INPUT_SIZES),
+                        choices=SUPPORTED_INPUT_SIZES)
+    parser.add_argument("--opset", type=int, default=12)
+    args = parser.parse_args()
+    export(args.weights, args.sizes, args.opset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import threading
+
+import numpy as np
+
+from config import FRAME_PACING_MODE, FRAME_SCHEDULER_WINDOW
+
+
+class FrameScheduler:
+    """
+    Decide quais frames capturados vão para a detecção, pelos instantes de captura e não por contagem.
+    Cada frame soma 'taxa alvo × intervalo desde o frame anterior' a um crédito; com crédito >= 1 o frame
+    é processado e o crédito cai em 1. A média fica exatamente na taxa pedida (20 FPS numa câmera de 30
+    processa 2 de cada 3 frames), o que a divisão inteira de FPS não fazia.
+
+    Modos:
+      "fixed"   -> taxa alvo = desired_fps (<= 0: todos os frames);
+      "latency" -> taxa alvo limitada ao que o detector consegue sustentar (média móvel do tempo
+                   de processamento), para não enfileirar frames que seriam descartados depois.
+
+    Os instantes vêm da câmera (SensorTimestamp da Picamera2) ou do relógio monotônico.
+    """
+
+    def __init__(self, desired_fps, mode=FRAME_PACING_MODE, window=FRAME_SCHEDULER_WINDOW, smoothing=0.1):
+        if mode not in ("fixed", "latency"):
+            raise ValueError(f"Modo de cadência inválido: {mode}")
+        self.desired_fps = desired_fps
+        self.mode = mode
+        self.window = window
+        self.smoothing = smoothing
+
+        self.processing_time = None  # média móvel exponencial, em segundos
+        self._credit = 1.0           # o primeiro frame é sempre processado
+        self._last_capture = None
+        self._capture_interval = None
+        self._accepted = np.zeros(window, dtype=np.float64)
+        self._accepted_count = 0
+
+        self.frames_seen = 0
+        self.frames_skipped = 0   # descartados de propósito pela cadência
+        self.frames_missed = 0    # lacunas entre capturas: frames que a câmera entregou e não vimos
+        # should_process() roda na thread de captura, record_processing() na de detecção e stats() no Tk.
+        self._lock = threading.Lock()
+
+    @property
+    def target_fps(self):
+        """Taxa alvo atual em FPS, ou 0 para processar todos os frames."""
+        target = self.desired_fps if self.desired_fps and self.desired_fps > 0 else 0.0
+        if self.mode == "latency" and self.processing_time:
+            sustainable = 1.0 / self.processing_time
+            target = min(target, sustainable) if target else sustainable
+        return target
+
+    def record_processing(self, seconds):
+        """Tempo gasto pela detecção de um frame; alimenta o modo "latency"."""
+        with self._lock:
+            if self.processing_time is None:
+                self.processing_time = seconds
+            else:
+                self.processing_time += self.smoothing * (seconds - self.processing_time)
+
+    def should_process(self, timestamp):
+        with self._lock:
+            return self._should_process(timestamp)
+
+    def _should_process(self, timestamp):
+        self.frames_seen += 1
+        if self._last_capture is not None:
+            interval = timestamp - self._last_capture
+            if interval > 0:
+                self._count_gap(interval)
+                target = self.target_fps
+                # Teto de 2: guarda a fração que sobrou, mas depois de uma pausa não processa uma rajada.
+                self._credit = min(2.0, self._credit + target * interval) if target else 1.0
+        self._last_capture = timestamp
+
+        if self._credit < 1.0 - 1e-6:  # tolerância para a soma de frações em ponto flutuante
+            self.frames_skipped += 1
+            return False
+        self._credit -= 1.0
+        self._accepted[self._accepted_count % self.window] = timestamp
+        self._accepted_count += 1
+        return True
+
+    def _count_gap(self, interval):
+        # Intervalo típico da câmera (média móvel); um intervalo bem maior indica frames perdidos.
+        if self._capture_interval is None:
+            self._capture_interval = interval
+            return
+        if interval > 1.5 * self._capture_interval:
+            self.frames_missed += int(round(interval / self._capture_interval)) - 1
+        else:
+            self._capture_interval += self.smoothing * (interval - self._capture_interval)
+
+    def _recent_accepted(self):
+        count = min(self._accepted_count, self.window)
+        if self._accepted_count <= self.window:
+            return self._accepted[:count].copy()
+        start = self._accepted_count % self.window
+        return np.concatenate((self._accepted[start:], self._accepted[:start]))
+
+    def stats(self):
+        """FPS alcançado e jitter (desvio padrão dos intervalos entre frames processados), mais contadores."""
+        # Cópia consistente sob o lock; as contas são feitas fora dele.
+        with self._lock:
+            times = self._recent_accepted()
+            target_fps = self.target_fps
+            frames_skipped = self.frames_skipped
+            frames_missed = self.frames_missed
+        intervals = np.diff(times)
+        achieved = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else 0.0
+        return {
+            "target_fps": target_fps,
+            "achieved_fps": achieved,
+            "jitter_ms": float(intervals.std() * 1000) if len(intervals) > 1 else 0.0,
+            "frames_skipped": frames_skipped,
+            "frames_missed": frames_missed,
+        }
+
+    def poll_interval_ms(self, minimum=5, maximum=50):
+        """Intervalo para quem consome os resultados sem ser avisado (a GUI): meio período do alvo."""
+        target = self.target_fps or (1.0 / self._capture_interval if self._capture_interval else 0.0)
+        if not target:
+            return minimum
+        return int(min(maximum, max(minimum, 500.0 / target)))
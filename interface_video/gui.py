@@ -1,16 +1,28 @@
 import tkinter as tk
 from PIL import Image, ImageTk
 import cv2
-from config import RESOLUTION_OPTIONS, FPS_OPTIONS
+from config import RESOLUTION_OPTIONS, FPS_OPTIONS, DETECTION_INTERVAL_OPTIONS
 
 class GUI:
-    def __init__(self, master, title="Interface Adaptativa para IoT"):
+    def __init__(self, master, title="Interface Adaptativa para IoT", detector_names=(), default_detector=None):
         self.master = master
         self.master.title(title)
        
         self.control_frame = tk.Frame(master)
         self.control_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
 
+        # --- Frame para o Menu de Algoritmo ---
+        self.selected_detector_name = tk.StringVar(master)
+        if detector_names:
+            detector_frame = tk.Frame(self.control_frame)
+            detector_frame.pack(side=tk.TOP, pady=2, fill=tk.X)
+            tk.Label(detector_frame, text="Algoritmo:").pack(side=tk.LEFT, padx=(0, 5))
+            self.selected_detector_name.set(default_detector if default_detector in detector_names else detector_names[0])
+            self.detector_option_menu = tk.OptionMenu(detector_frame, self.selected_detector_name, *detector_names)
+            self.detector_option_menu.pack(side=tk.LEFT, padx=5)
+        else:
+            self.selected_detector_name.set(default_detector or "")
+
         # --- Frame para o Menu de Modo de Câmera ---
         mode_frame = tk.Frame(self.control_frame)
         mode_frame.pack(side=tk.TOP, pady=2, fill=tk.X)
@@ -47,6 +59,15 @@ class GUI:
         self.selected_fps_value.set(list(FPS_OPTIONS.keys())[0])
         self.fps_option_menu = tk.OptionMenu(fps_frame, self.selected_fps_value, *list(FPS_OPTIONS.keys()))
         self.fps_option_menu.pack(side=tk.LEFT, padx=5)
+
+        # --- Frame para o Menu de Intervalo de Detecção ---
+        interval_frame = tk.Frame(self.control_frame)
+        interval_frame.pack(side=tk.TOP, pady=2, fill=tk.X)
+        tk.Label(interval_frame, text="Intervalo de Detecção:").pack(side=tk.LEFT, padx=(0, 5))
+        self.selected_detection_interval = tk.StringVar(master)
+        self.selected_detection_interval.set(list(DETECTION_INTERVAL_OPTIONS.keys())[0])
+        self.detection_interval_option_menu = tk.OptionMenu(interval_frame, self.selected_detection_interval, *list(DETECTION_INTERVAL_OPTIONS.keys()))
+        self.detection_interval_option_menu.pack(side=tk.LEFT, padx=5)
        
         self.apply_button = tk.Button(self.control_frame, text="Aplicar Configurações")
         self.apply_button.pack(side=tk.LEFT, padx=5)
@@ -85,6 +106,8 @@ class GUI:
         selected_fps_name = self.selected_fps_value.get()
         desired_fps = FPS_OPTIONS.get(selected_fps_name)
 
+        detection_interval = DETECTION_INTERVAL_OPTIONS.get(self.selected_detection_interval.get(), 1)
+
         if resolution_settings and desired_fps is not None:
             return {
                 'mode': mode,
@@ -92,6 +115,8 @@ class GUI:
                 'width': resolution_settings['width'],
                 'height': resolution_settings['height'],
                 'desired_fps': desired_fps,
+                'detection_interval': detection_interval,
+                'detector_name': self.selected_detector_name.get(),
             }
         return None
 
@@ -1,44 +1,78 @@
 import tkinter as tk
 from gui import GUI
-from camera import Camera
+from camera import open_camera
 
-from algoritmos.face_recognition import ViolaFaceRecognizer
-from algoritmos.face_recognition_hog import DLIBFaceRecognizer
-from algoritmos.face_recognition_lbp import LBPFaceRecognizer
-from algoritmos.face_recognition_ssd import SSDFaceDetector
-from algoritmos.face_recognition_yolo import YOLOv8FaceDetector
-from algoritmos.face_recognition_blazeface import BlazeFaceDetector
+# Os backends (dlib, mediapipe, ultralytics...) só são importados quando selecionados.
+from algoritmos.registry import available_detectors, create_detector, startup_report
 
 from performance_monitor import PerformanceMonitor
-from config import RESOLUTION_OPTIONS, FPS_OPTIONS
+from pipeline import FramePipeline
+from tracking import TrackingDetector
+from motion_gate import MotionGatedDetector
+from process_detector import ProcessDetectorService
+from metrics_export import MetricsHub
+from batch_scheduler import BatchScheduler
+from detector_pool import DetectorPool
+from quality_controller import QualityController, build_levels
+from ensemble import EnsembleDetector
+from crop_refine import CropRefineDetector
+from recognition import FaceGallery, FaceRecognizer
+from config import (RESOLUTION_OPTIONS, FPS_OPTIONS, USE_PROCESS_DETECTOR, DETECTION_STREAM_WIDTH, USE_MOTION_GATE,
+                    DEFAULT_DETECTOR, USE_BATCH_SCHEDULER, ADAPTIVE_QUALITY, ADAPTIVE_LATENCY_BUDGET_MS,
+                    ADAPTIVE_CHECK_INTERVAL_MS, ENSEMBLE_CHEAP_DETECTOR, USE_CROP_REFINE, CROP_REFINE_PROPOSALS,
+                    CROP_REFINE_PROPOSAL_DETECTOR, USE_RECOGNITION, RECOGNITION_EMBEDDER)
 
 import time
-import threading
 import cv2
+import numpy as np
 from PIL import Image, ImageTk
 
 # Classe para controlar uma única câmera e sua GUI (como antes)
 class CameraFeedController:
-    def __init__(self, master, camera_index, resolution_settings, desired_fps, face_recognizer_instance):
+    def __init__(self, master, camera_index, resolution_settings, desired_fps, face_recognizer_instance, detector_lock=None,
+                 detection_interval=1, metrics_hub=None, detector_name=None, detector_provider=None, recognizer=None):
         self.master = master
         self.camera_index = camera_index
         self.master.title(f"Câmera {self.camera_index} - Vídeo Feed")
 
         self.real_camera_fps = 30
         self.desired_fps = desired_fps # FPS desejado vindo da MainApp
+        self.resolution_settings = resolution_settings
+        self.metrics_hub = metrics_hub
+        # detector_provider(nome) -> (detector, lock): backends alternativos para o controle de qualidade.
+        self.detector_provider = detector_provider
+        self.detector_name = detector_name
     
-        self.frame_counter = 0
         self.running = True
+        self.pipeline = None
+        self.quality_controller = None
         
         self.performance_monitor = PerformanceMonitor()
 
         try:
-            self.camera = Camera(camera_index=self.camera_index)
-            self.face_recognizer = face_recognizer_instance
+            # A câmera entrega o frame de detecção já no formato de pixel que o detector usa.
+            # Com o stream 'lores' ativo, o 'main' fica em BGR só para exibição e anotações.
+            # O recorte e refinamento precisa da resolução cheia, então detecta no 'main'.
+            detection_format = getattr(face_recognizer_instance, "input_format", "BGR")
+            if DETECTION_STREAM_WIDTH and not USE_CROP_REFINE:
+                # As cascatas não ampliam a imagem: pedem um 'lores' largo o bastante para a face mais
+                # distante configurada (acima da largura do 'main', detectam no próprio 'main').
+                detection_width = max(DETECTION_STREAM_WIDTH,
+                                      -(-getattr(face_recognizer_instance, "min_input_width", 0) // 64) * 64)
+                self.camera = open_camera(camera_index=self.camera_index, output_format="BGR",
+                                          detection_format=detection_format, detection_width=detection_width)
+            else:
+                self.camera = open_camera(camera_index=self.camera_index, output_format=detection_format)
+            self.base_detector = face_recognizer_instance
+            self.base_detector_lock = detector_lock
+            self.detection_interval = detection_interval
+            self.face_recognizer, pipeline_detector_lock = self._build_detector_chain(
+                face_recognizer_instance, detector_lock, detection_interval, detector_name)
+            self.algorithm_name = self.face_recognizer.algorithm_name
             
             # Cria uma GUI simplificada para a janela do feed, sem os controles de seleção de câmera
             # Pois esses controles já foram definidos na MainApp.
-            self.video_gui = VideoFeedGUI(master) # Usaremos uma nova classe VideoFeedGUI para as janelas de feed
+            self.video_gui = VideoFeedGUI(master, self.performance_monitor) # Usaremos uma nova classe VideoFeedGUI para as janelas de feed
 
             self.master.protocol("WM_DELETE_WINDOW", self.quit_app)
 
@@ -49,70 +83,180 @@ class CameraFeedController:
 
             print(f"Câmera {self.camera_index} iniciada com resolução {resolution_settings['width']}x{resolution_settings['height']} e FPS simulado {self.desired_fps}.")
             print(f"Configurações reais da câmera {self.camera_index}: {actual_camera_props}")
+            # FPS nominal da fonte até haver medição; depois o pipeline usa o FPS medido.
+            self.real_camera_fps = actual_camera_props['fps']
+
+            # Captura e detecção rodam em threads próprias; o loop do Tk apenas exibe o último frame pronto.
+            self.pipeline = FramePipeline(
+                self.camera, self.face_recognizer, self._pacing_fps(detection_interval),
+                real_camera_fps=self.real_camera_fps,
+                performance_monitor=self.performance_monitor,
+                detector_lock=pipeline_detector_lock,
+                name=f"camera{self.camera_index}",
+                recognizer=recognizer,
+            )
+            self.pipeline.start()
+
+            if self.metrics_hub:
+                self.metrics_hub.register(self.camera_index, self.metrics_record)
+
+            if ADAPTIVE_QUALITY:
+                budget = ADAPTIVE_LATENCY_BUDGET_MS or 1000.0 / max(1, self.desired_fps)
+                self.quality_controller = QualityController(
+                    self.performance_monitor, self.apply_quality_level,
+                    build_levels(detection_interval, detector_name), latency_budget_ms=budget)
+                self.master.after(ADAPTIVE_CHECK_INTERVAL_MS, self.check_quality)
 
-            self.delay = 15
             self.update_video()
 
         except (ValueError, IOError) as e:
             self.show_error(str(e))
 
-    def update_video(self):
+    def _build_detector_chain(self, detector, detector_lock, detection_interval, detector_name=None):
+        """
+        Envolve o detector com o porteiro de movimento e o rastreador, que guardam estado
+        e por isso são por câmera; só a chamada ao detector compartilhado usa o lock.
+        Retorna (detector final, lock que o pipeline deve usar).
+        """
+        pipeline_detector_lock = detector_lock
+        # O conjunto e o recorte e refino guardam caixas em coordenadas do frame inteiro; recortes de
+        # movimento as misturariam. Com eles o porteiro vai para dentro, só no estágio barato.
+        motion_gate_outside = USE_MOTION_GATE
+        if ENSEMBLE_CHEAP_DETECTOR and ENSEMBLE_CHEAP_DETECTOR != detector_name and self.detector_provider:
+            # O conjunto usa os locks de cada detector internamente.
+            cheap, cheap_lock = self.detector_provider(ENSEMBLE_CHEAP_DETECTOR)
+            if USE_MOTION_GATE:
+                # Porteiro só no estágio barato: roda no frame inteiro e devolve coordenadas do frame.
+                cheap, cheap_lock = MotionGatedDetector(cheap, cheap_lock), None
+                motion_gate_outside = False
+            detector = EnsembleDetector(cheap, detector, cheap_lock, pipeline_detector_lock)
+            pipeline_detector_lock = None
+        elif USE_CROP_REFINE:
+            proposer, proposer_lock = None, None
+            if CROP_REFINE_PROPOSALS == "cascade" and self.detector_provider:
+                proposer, proposer_lock = self.detector_provider(CROP_REFINE_PROPOSAL_DETECTOR)
+                if USE_MOTION_GATE:
+                    # Porteiro nas propostas, no frame inteiro; sem cascata as propostas já são o movimento.
+                    proposer, proposer_lock = MotionGatedDetector(proposer, proposer_lock), None
+            detector = CropRefineDetector(detector, pipeline_detector_lock, proposer, proposer_lock)
+            pipeline_detector_lock = None
+            motion_gate_outside = False
+        if motion_gate_outside:
+            detector = MotionGatedDetector(detector, pipeline_detector_lock)
+            pipeline_detector_lock = None
+        if detection_interval > 1:
+            detector = TrackingDetector(detector, detection_interval, pipeline_detector_lock)
+            pipeline_detector_lock = None
+        return detector, pipeline_detector_lock
+
+    def _pacing_fps(self, detection_interval):
+        """
+        Taxa em que o pipeline aceita frames da câmera. Com rastreamento, todos passam pelo rastreador
+        (exibição na taxa da câmera) e o detector só roda nos quadros-chave, a cada 'detection_interval'
+        frames; sem ele, a taxa desejada. 0 = todos os frames (ou o sustentável, no modo "latency").
+        """
+        return 0 if detection_interval > 1 else self.desired_fps
+
+    def check_quality(self):
         if not self.running:
             return
+        self.quality_controller.check()
+        self.master.after(ADAPTIVE_CHECK_INTERVAL_MS, self.check_quality)
+
+    def apply_quality_level(self, level):
+        """Aplica um nível da escada de qualidade ao pipeline em execução, sem reiniciar a câmera."""
+        detector, detector_lock, detector_name = self.base_detector, self.base_detector_lock, self.detector_name
+        if level["detector"] and self.detector_provider:
+            try:
+                detector, detector_lock = self.detector_provider(level["detector"])
+                detector_name = level["detector"]
+            except Exception as e:
+                print(f"Câmera {self.camera_index}: detector '{level['detector']}' indisponível ({e}).")
+
+        # Rastreador e porteiro guardam frames e caixas da escala anterior; recomeça com uma cadeia nova.
+        self.face_recognizer, pipeline_detector_lock = self._build_detector_chain(
+            detector, detector_lock, level["interval"], detector_name)
+        self.pipeline.set_detector(self.face_recognizer, pipeline_detector_lock)
+        if self.pipeline.recognizer:
+            # O rastreador novo recomeça os track_ids; o cache de identidades não vale mais.
+            self.pipeline.recognizer.reset()
+        self.pipeline.detection_scale = level["scale"]
+        self.pipeline.scheduler.desired_fps = self._pacing_fps(level["interval"])
+        self.detection_interval = level["interval"]
+        self.algorithm_name = self.face_recognizer.algorithm_name
 
-        ret, frame = self.camera.get_frame()
-
-        if ret:
-            self.frame_counter += 1
-
-            if self.desired_fps <= 0:
-                frames_per_desired_frame = 1.0
-            else:
-                frames_per_desired_frame = int(self.real_camera_fps / self.desired_fps)
+    def update_video(self):
+        if not self.running:
+            return
 
-            if self.desired_fps == self.real_camera_fps or (self.frame_counter % frames_per_desired_frame) < 1:
-                self.performance_monitor.start()
-                processed_frame, faces_data = self.face_recognizer.process_frame(frame)
-                self.performance_monitor.stop_and_record()
-                                
-                self.video_gui.update_video_frame(processed_frame) # Atualiza a GUI do feed
+        packet = self.pipeline.get_latest_result()
+        if packet is not None:
+            # Atualiza a GUI do feed; depois de desenhado, o frame volta ao anel da câmera.
+            self.video_gui.update_video_frame(packet.frame, packet.frame_format,
+                                              lambda: self.pipeline.release_packet(packet))
 
-        self.master.after(self.delay, self.update_video)
+        # Sem aviso do pipeline (o Tk não pode ser chamado das threads): verifica a meio período do alvo.
+        self.master.after(self.pipeline.scheduler.poll_interval_ms(), self.update_video)
 
     def quit_app(self):
         print(f"Liberando recursos da câmera {self.camera_index} e fechando a janela do feed...")
         self.running = False
+        if self.pipeline:
+            self.pipeline.stop()
         
         self.print_and_save_summary()
+        if self.metrics_hub:
+            # Grava o registro final desta câmera no log da sessão.
+            self.metrics_hub.unregister(self.camera_index)
         
         self.camera.release()
         self.master.destroy()
         
     def print_and_save_summary(self):
-        """Imprime o resumo no console e salva em arquivo."""
+        """Imprime o resumo no console (o registro em arquivo fica com o MetricsHub)."""
         summary = self.performance_monitor.get_summary()
         if summary:
             print("\n" + "="*40)
             print("         RELATÓRIO DE DESEMPENHO")
             print("="*40)
-            print(f"Algoritmo utilizado: {self.face_recognizer.__class__.__name__}")
+            print(f"Algoritmo utilizado: {self.algorithm_name}")
             print(f"Frames processados: {summary['total_frames']}")
             print(f"Tempo Médio de Processamento: {summary['avg_processing_time_ms']:.2f} ms")
+            print(f"Tempo p50/p95/p99/máx: {summary['p50_processing_time_ms']:.2f} / {summary['p95_processing_time_ms']:.2f} / "
+                  f"{summary['p99_processing_time_ms']:.2f} / {summary['max_processing_time_ms']:.2f} ms")
+            for stage, stats in summary['stages'].items():
+                print(f"  {stage:<9} média {stats['mean']:7.2f} ms  p95 {stats['p95']:7.2f} ms  ({stats['count']} medições)")
             print(f"Uso Médio da CPU: {summary['avg_cpu_percent']:.2f} %")
+            if self.pipeline:
+                cadence = self.pipeline.get_stats()
+                print(f"FPS da câmera: {cadence['camera_fps']:.1f} | detecção: {cadence['achieved_fps']:.1f} de "
+                      f"{cadence['target_fps']:.1f} (jitter {cadence['jitter_ms']:.1f} ms, "
+                      f"{cadence['frames_skipped']} pulados, {cadence['frames_missed']} perdidos)")
+            print(f"Frames exibidos: {self.video_gui.repaints} ({self.video_gui.repaints_dropped} descartados na exibição)")
+            if self.pipeline and self.pipeline.recognizer:
+                print(f"Descritores calculados: {self.pipeline.recognizer.embeddings_computed} "
+                      f"(em cache por face rastreada)")
             print("="*40 + "\n")
 
-            # Pega as configurações para salvar no arquivo
-            settings = self.get_current_settings()
-            self.performance_monitor.save_to_file(self.face_recognizer.__class__.__name__, settings)
+            if not self.metrics_hub:
+                self.performance_monitor.save_to_file(self.algorithm_name, self.get_current_settings(),
+                                                      pipeline_stats=self.pipeline.get_stats() if self.pipeline else None)
+
+    def metrics_record(self):
+        """Registro atual desta câmera para o log da sessão e o endpoint de métricas."""
+        return self.performance_monitor.build_record(self.algorithm_name, self.get_current_settings(),
+                                                     self.pipeline.get_stats())
 
     def get_current_settings(self):
         """Método auxiliar para obter as configurações atuais da câmera."""
-        # Pode ser necessário passar as configurações para a classe
-        # ou obtê-las de alguma forma.
+        # Usa a resolução pedida: get_properties() devolve o tamanho do sensor, não o do stream.
         return {
-            "width": self.camera.get_properties()['width'],
-            "height": self.camera.get_properties()['height'],
-            "desired_fps": self.desired_fps
+            "camera_index": self.camera_index,
+            "width": self.resolution_settings['width'],
+            "height": self.resolution_settings['height'],
+            "desired_fps": self.desired_fps,
+            "detection_interval": self.detection_interval,
+            "detection_scale": self.pipeline.detection_scale if self.pipeline else 1.0,
         }
 
     def show_error(self, message):
@@ -122,21 +266,110 @@ class CameraFeedController:
 
 # Nova classe para a GUI das janelas de vídeo (simplificada, apenas o canvas)
 class VideoFeedGUI:
-    def __init__(self, master):
+    """
+    Exibição do vídeo com custo constante por frame:
+      - um único item de imagem no canvas e um PhotoImage reaproveitado (paste no lugar),
+        recriado só quando o tamanho exibido muda;
+      - o frame é reduzido ao tamanho da janela antes da conversão de cor;
+      - o desenho acontece quando o Tk fica ocioso; frames que chegam antes disso substituem
+        o pendente (descartados), então a janela nunca acumula atraso.
+    """
+
+    def __init__(self, master, performance_monitor=None):
         self.master = master
-        self.canvas = tk.Canvas(master, bg="black")
+        self.performance_monitor = performance_monitor
+        self.canvas = tk.Canvas(master, bg="black", highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", self._on_resize)
+
         self.photo = None # Para manter a referência da imagem
+        self.photo_key = None # (modo, largura, altura) do PhotoImage atual
+        self.image_item = None
+        self.window_size = None
+        self._rgb_buffer = None
+        self._pending = None
+        self.repaints = 0
+        self.repaints_dropped = 0
+
+    def _on_resize(self, event):
+        # Antes do primeiro frame o canvas tem o tamanho padrão do Tk (~378×265); só vale o tamanho
+        # depois que o primeiro desenho o ajustou ao vídeo (e os redimensionamentos do usuário).
+        if self.photo_key is None:
+            return
+        if event.width > 1 and event.height > 1:
+            self.window_size = (event.width, event.height)
 
-    def update_video_frame(self, frame):
-        h, w, _ = frame.shape
-        self.canvas.config(width=w, height=h)
-        
-        img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img_pil = Image.fromarray(img)
-        self.photo = ImageTk.PhotoImage(image=img_pil)
-        
-        self.canvas.create_image(0, 0, image=self.photo, anchor=tk.NW)
+    def update_video_frame(self, frame, frame_format="BGR", on_done=None):
+        """
+        Agenda a exibição do frame; se já houver um pendente, ele é substituído.
+        on_done() é chamado quando o frame não é mais usado (desenhado ou substituído).
+        """
+        if self._pending is not None:
+            self.repaints_dropped += 1
+            self._finish(self._pending)
+        else:
+            self.master.after_idle(self._paint)
+        self._pending = (frame, frame_format, on_done)
+
+    @staticmethod
+    def _finish(pending):
+        on_done = pending[2]
+        if on_done:
+            on_done()
+
+    def _display_size(self, frame):
+        h, w = frame.shape[:2]
+        if self.window_size is None:
+            return w, h
+        # Só reduz, mantendo a proporção; ampliar só custaria CPU.
+        scale = min(1.0, self.window_size[0] / w, self.window_size[1] / h)
+        return max(1, int(w * scale)), max(1, int(h * scale))
+
+    def _paint(self):
+        if self._pending is None:
+            return
+        pending = self._pending
+        self._pending = None
+        try:
+            # A janela pode ter sido fechada entre o agendamento e o desenho.
+            if self.canvas.winfo_exists():
+                self._draw(pending[0], pending[1])
+        finally:
+            # O PhotoImage já tem a sua cópia dos pixels.
+            self._finish(pending)
+
+    def _draw(self, frame, frame_format):
+        convert_start = time.perf_counter()
+        size = self._display_size(frame)
+        if size != (frame.shape[1], frame.shape[0]):
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+        # Frames RGB e de luminância já podem ir direto para o PIL.
+        if frame_format == "BGR":
+            if self._rgb_buffer is None or self._rgb_buffer.shape != frame.shape:
+                self._rgb_buffer = np.empty_like(frame)
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+        img_pil = Image.fromarray(frame)
+
+        display_start = time.perf_counter()
+        key = (img_pil.mode, size)
+        if key != self.photo_key:
+            if self.photo_key is None:
+                # Primeira imagem: a janela abre no tamanho do vídeo.
+                self.canvas.config(width=size[0], height=size[1])
+            self.photo = ImageTk.PhotoImage(image=img_pil)
+            self.photo_key = key
+            if self.image_item is None:
+                self.image_item = self.canvas.create_image(0, 0, image=self.photo, anchor=tk.NW)
+            else:
+                self.canvas.itemconfig(self.image_item, image=self.photo)
+        else:
+            self.photo.paste(img_pil)
+        self.repaints += 1
+
+        if self.performance_monitor:
+            self.performance_monitor.record_stage("convert", (display_start - convert_start) * 1000)
+            self.performance_monitor.record_stage("display", (time.perf_counter() - display_start) * 1000)
 
 
 # Classe da aplicação principal que gerencia a GUI de controle e os controladores de câmera
@@ -145,24 +378,113 @@ class MainApp:
         self.root = root
         self.root.title("Controle Central de Câmeras")
 
-        self.gui = GUI(root, title="Controle Central de Câmeras")
+        self.gui = GUI(root, title="Controle Central de Câmeras", detector_names=available_detectors(),
+                       default_detector=DEFAULT_DETECTOR)
         self.gui.set_callbacks(self.apply_settings, self.quit_app)
 
         self.camera_controllers = [] # Lista para manter referências a todos os controladores de câmera ativos
-        self.camera_threads = [] # Lista para manter referências às threads
-        
-        #self.face_recognizer = ViolaFaceRecognizer() 
-        #self.face_recognizer = DLIBFaceRecognizer() 
-        #self.face_recognizer = LBPFaceRecognizer() 
-        #self.face_recognizer = BlazeFaceDetector()
-        #self.face_recognizer = SSDFaceDetector()
-        
-        self.face_recognizer = YOLOv8FaceDetector()
 
-    def _launch_single_camera_controller(self, camera_index, resolution_settings, desired_fps,face_recognizer_instance):
-        """Lança um CameraFeedController em uma nova janela Toplevel."""
+        # Log periódico da sessão (JSON Lines) e endpoint HTTP opcional com as métricas ao vivo.
+        self.metrics_hub = MetricsHub()
+        self.metrics_hub.start()
+
+        # O algoritmo é escolhido pelo nome registrado (viola, hog, lbp, ssd, yolo, blazeface)
+        # e pode ser trocado pela GUI sem reiniciar a aplicação.
+        self.detector_name = None
+        self.face_recognizer = None
+        # Contextos do detector por câmera; None com o detector em processos separados.
+        self.detector_pool = None
+        self.batch_scheduler = None
+        # Pools dos backends alternativos (controle de qualidade, conjunto), carregados sob demanda.
+        self.fallback_detectors = {}
+        self._load_detector(DEFAULT_DETECTOR)
+
+        # Reconhecimento: galeria (memória mapeada) e extrator de descritores carregados uma vez;
+        # cada câmera tem o seu FaceRecognizer (cache por face rastreada) e um contexto do extrator.
+        self.gallery = None
+        self.embedder_pool = None
+        if USE_RECOGNITION:
+            self._load_recognition()
+
+    def _load_detector(self, name):
+        """Carrega o detector registrado como 'name', liberando o anterior."""
+        if name == self.detector_name:
+            return
+        self._release_detector()
+
+        if USE_PROCESS_DETECTOR:
+            # Um processo por núcleo, cada um com seu próprio modelo; o serviço aceita chamadas
+            # simultâneas, então as câmeras não precisam de lock entre si.
+            self.face_recognizer = ProcessDetectorService(name)
+            self.face_recognizer.start()
+            for worker_id, times in self.face_recognizer.worker_startup_times.items():
+                print(f"Processo {worker_id}: importação {times.get('import_s', 0) * 1000:.1f} ms, "
+                      f"carga do modelo {times.get('load_s', 0) * 1000:.1f} ms")
+        else:
+            self.face_recognizer = create_detector(name)
+            # Cada câmera recebe um contexto do pool: pesos compartilhados, inferência em paralelo.
+            self.detector_pool = DetectorPool(self.face_recognizer, lambda: create_detector(name))
+            print(startup_report([name]))
+        self.detector_name = name
+        print(f"Detector '{name}' ({self.face_recognizer.algorithm_name}) carregado.")
+
+    def _load_recognition(self):
+        # Importado só aqui: o extrator traz dlib ou onnxruntime, que não devem pesar na inicialização
+        # quando o reconhecimento está desligado.
+        from algoritmos.embedding import create_embedder
+        try:
+            gallery = FaceGallery()
+            if gallery.embedder and gallery.embedder != RECOGNITION_EMBEDDER:
+                raise ValueError(f"galeria gerada com '{gallery.embedder}', extrator configurado '{RECOGNITION_EMBEDDER}'")
+            embedder = create_embedder(RECOGNITION_EMBEDDER)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"Reconhecimento desativado: {e}")
+            return
+        self.gallery = gallery
+        self.embedder_pool = DetectorPool(embedder, lambda: create_embedder(RECOGNITION_EMBEDDER))
+        print(f"Galeria com {len(gallery)} descritores de {len(set(gallery.labels))} pessoas"
+              f"{' (índice aproximado)' if gallery.index is not None else ''}.")
+
+    def _create_recognizer(self, camera_index):
+        if not self.embedder_pool:
+            return None
+        embedder, embedder_lock = self.embedder_pool.acquire(camera_index)
+        return FaceRecognizer(embedder, self.gallery, embedder_lock)
+
+    def _get_fallback_detector(self, name, camera_index):
+        """
+        (detector, lock) de um backend alternativo (controle de qualidade, detector barato do conjunto)
+        para a câmera; cada backend é carregado uma vez e tem o seu pool de contextos.
+        """
+        if name not in self.fallback_detectors:
+            self.fallback_detectors[name] = DetectorPool(create_detector(name), lambda: create_detector(name))
+            print(startup_report([name]))
+        return self.fallback_detectors[name].acquire(camera_index)
+
+    def _release_detector(self):
+        if isinstance(self.face_recognizer, ProcessDetectorService):
+            self.face_recognizer.shutdown()
+        self.face_recognizer = None
+        self.detector_pool = None
+        self.detector_name = None
+
+    def _launch_single_camera_controller(self, camera_index, resolution_settings, desired_fps,face_recognizer_instance,
+                                         detection_interval=1):
+        """
+        Lança um CameraFeedController em uma nova janela Toplevel.
+        Deve ser chamado na thread do Tk; a captura e a detecção rodam nas threads do FramePipeline.
+        """
         top_level = tk.Toplevel(self.root)
-        controller = CameraFeedController(top_level, camera_index, resolution_settings, desired_fps, face_recognizer_instance)
+        # O agendador de lotes é o único que chama o detector e o serviço de processos aceita chamadas
+        # simultâneas; não há o que travar. Nos demais casos a câmera usa o seu contexto do pool.
+        detector_lock = None
+        if face_recognizer_instance is self.face_recognizer and self.detector_pool:
+            face_recognizer_instance, detector_lock = self.detector_pool.acquire(camera_index)
+        controller = CameraFeedController(top_level, camera_index, resolution_settings, desired_fps,
+                                          face_recognizer_instance, detector_lock, detection_interval,
+                                          self.metrics_hub, self.detector_name,
+                                          lambda name: self._get_fallback_detector(name, camera_index),
+                                          self._create_recognizer(camera_index))
         self.camera_controllers.append(controller)
 
     def apply_settings(self):
@@ -178,32 +500,37 @@ class MainApp:
         # Primeiro, fecha todas as câmeras e limpa os controladores existentes
         self._shutdown_all_cameras()
 
+        # Troca de algoritmo em tempo de execução (só recarrega se o nome mudou)
+        self._load_detector(settings['detector_name'])
+
         resolution_settings = {'width': settings['width'], 'height': settings['height']}
         desired_fps = settings['desired_fps']
+        detection_interval = settings['detection_interval']
 
         if settings['mode'] == "Câmera Única":
             camera_index = settings['camera_index']
-            # Lança o controlador da câmera em uma nova thread para evitar bloqueio da GUI
-            thread = threading.Thread(target=self._launch_single_camera_controller, 
-                                      args=(camera_index, resolution_settings, desired_fps, self.face_recognizer))
-            self.camera_threads.append(thread)
-            thread.start()
+            self._launch_single_camera_controller(camera_index, resolution_settings, desired_fps, self.face_recognizer,
+                                                  detection_interval)
         elif settings['mode'] == "Múltiplas Câmeras":
             # Aqui, você pode detectar automaticamente as câmeras disponíveis
             # ou usar um número fixo (ex: 0, 1, 2)
             num_detected_cameras = 2 # Exemplo: assume 2 câmeras para demonstração
             
-            if desired_fps > 15:
+            # Com o detector em processos separados cada câmera usa seu próprio núcleo; o limite não é necessário.
+            if desired_fps > 15 and not USE_PROCESS_DETECTOR:
                 print(f"fps reduzido para {15} para evitar sobrecarga.")
                 desired_fps = 15
+            # Detectores que aceitam lote (SSD, YOLO) fazem uma inferência para todas as câmeras.
+            detector = self.face_recognizer
+            if USE_BATCH_SCHEDULER and not USE_PROCESS_DETECTOR and self.face_recognizer.supports_batch:
+                self.batch_scheduler = BatchScheduler(self.face_recognizer, max_batch=num_detected_cameras)
+                detector = self.batch_scheduler
             # Lógica para detectar câmeras pode ser adicionada aqui, como:
             # detected_indices = self._detect_available_cameras()
             # for idx in detected_indices:
             for idx in range(num_detected_cameras):
-                thread = threading.Thread(target=self._launch_single_camera_controller, 
-                                          args=(idx, resolution_settings, desired_fps, self.face_recognizer))
-                self.camera_threads.append(thread)
-                thread.start()
+                self._launch_single_camera_controller(idx, resolution_settings, desired_fps, detector,
+                                                      detection_interval)
 
         print(f"Modo '{settings['mode']}' aplicado com Resolução {settings['width']}x{settings['height']} e FPS {settings['desired_fps']}.")
 
@@ -213,17 +540,25 @@ class MainApp:
             if controller.running:
                 controller.quit_app() # Isso irá chamar master.destroy() para a janela Toplevel
 
-        # Limpa as listas após um pequeno atraso para permitir que as threads finalizem
+        # quit_app() já aguarda o término das threads de captura e detecção de cada câmera.
+        for pool in [self.detector_pool, self.embedder_pool, *self.fallback_detectors.values()]:
+            if pool:
+                for controller in self.camera_controllers:
+                    pool.release(controller.camera_index)
         self.camera_controllers = []
-        self.camera_threads = []
-        # Pode ser necessário um join() para as threads se a sincronização for crítica,
-        # mas para este caso de encerramento, não é estritamente necessário bloquear.
-        time.sleep(1) # Dá um tempo para as janelas se fecharem
+
+        if self.batch_scheduler:
+            print(f"Inferência em lote: {self.batch_scheduler.batches} lotes, "
+                  f"{self.batch_scheduler.average_batch_size():.2f} frames por lote em média.")
+            self.batch_scheduler.shutdown()
+            self.batch_scheduler = None
 
     def quit_app(self):
         """Fecha a aplicação principal e todos os recursos das câmeras."""
         print("Fechando a aplicação central...")
         self._shutdown_all_cameras() # Garante que todas as câmeras sejam desligadas
+        self._release_detector()
+        self.metrics_hub.stop()
         self.root.destroy()
 
 if __name__ == "__main__":
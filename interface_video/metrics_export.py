@@ -0,0 +1,215 @@
+import csv
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import (METRICS_LOG_PATH, METRICS_LOG_INTERVAL, METRICS_HTTP_ENABLED, METRICS_HTTP_HOST,
+                    METRICS_HTTP_PORT)
+
+
+def new_session_id():
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+
+def flatten_record(record):
+    """Para CSV: os estágios viram colunas '<estágio>_mean_ms' e '<estágio>_p95_ms'."""
+    flat = {key: value for key, value in record.items() if key != "stages"}
+    for stage, stats in record.get("stages", {}).items():
+        flat[f"{stage}_mean_ms"] = stats["mean"]
+        flat[f"{stage}_p95_ms"] = stats["p95"]
+    return flat
+
+
+def append_records(path, records):
+    """Acrescenta registros ao arquivo: CSV se a extensão for .csv, senão JSON Lines (um objeto por linha)."""
+    if not records:
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if not path.endswith(".csv"):
+        with open(path, "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        return
+
+    rows = [flatten_record(record) for record in records]
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, newline="") as f:
+            fieldnames = next(csv.reader(f), [])
+        write_header = False
+    else:
+        fieldnames = []
+        for row in rows:
+            fieldnames += [key for key in row if key not in fieldnames]
+        write_header = True
+    with open(path, "a", newline="") as f:
+        # Colunas novas (ex.: um estágio que ainda não tinha medições) são ignoradas para manter o cabeçalho.
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus(records):
+    """Converte os registros das câmeras no formato de texto do Prometheus."""
+    metrics = {
+        "vigia_fps": ("gauge", "Frames processados por segundo (janela móvel)", []),
+        # Quantis da janela móvel (METRICS_WINDOW), não acumulados: gauges, não 'summary'.
+        "vigia_latency_p50_ms": ("gauge", "Latência de inferência, mediana da janela recente", []),
+        "vigia_latency_p95_ms": ("gauge", "Latência de inferência, percentil 95 da janela recente", []),
+        "vigia_latency_p99_ms": ("gauge", "Latência de inferência, percentil 99 da janela recente", []),
+        "vigia_latency_max_ms": ("gauge", "Latência de inferência, máximo da janela recente", []),
+        "vigia_stage_latency_ms": ("gauge", "Latência média por estágio do pipeline", []),
+        "vigia_frames_total": ("counter", "Frames processados", []),
+        "vigia_frames_captured_total": ("counter", "Frames capturados", []),
+        "vigia_dropped_frames_total": ("counter", "Frames descartados por estágio", []),
+        "vigia_cpu_percent": ("gauge", "Uso médio de CPU do sistema", []),
+        "vigia_camera_fps": ("gauge", "FPS medido da fonte de frames", []),
+        "vigia_achieved_fps": ("gauge", "FPS alcançado na detecção (instantes de captura)", []),
+        "vigia_jitter_ms": ("gauge", "Desvio padrão dos intervalos entre frames processados", []),
+        "vigia_frames_skipped_total": ("counter", "Frames pulados pela cadência", []),
+        "vigia_frames_missed_total": ("counter", "Frames perdidos entre capturas", []),
+    }
+    for record in records:
+        labels = f'camera="{_escape_label(record["camera_index"])}",algorithm="{_escape_label(record["algorithm"])}"'
+        metrics["vigia_fps"][2].append((labels, record.get("fps", 0.0)))
+        for key in ("latency_p50_ms", "latency_p95_ms", "latency_p99_ms", "latency_max_ms"):
+            if key in record:
+                metrics[f"vigia_{key}"][2].append((labels, record[key]))
+        for stage, stats in record.get("stages", {}).items():
+            metrics["vigia_stage_latency_ms"][2].append((f'{labels},stage="{stage}"', stats["mean"]))
+        metrics["vigia_frames_total"][2].append((labels, record.get("total_frames", 0)))
+        metrics["vigia_frames_captured_total"][2].append((labels, record.get("frames_captured", 0)))
+        for stage in ("capture", "display"):
+            key = f"dropped_{stage}"
+            if key in record:
+                metrics["vigia_dropped_frames_total"][2].append((f'{labels},stage="{stage}"', record[key]))
+        metrics["vigia_cpu_percent"][2].append((labels, record.get("cpu_percent", 0.0)))
+        for name, key in (("vigia_camera_fps", "camera_fps"), ("vigia_achieved_fps", "achieved_fps"),
+                          ("vigia_jitter_ms", "jitter_ms"), ("vigia_frames_skipped_total", "frames_skipped"),
+                          ("vigia_frames_missed_total", "frames_missed")):
+            if key in record:
+                metrics[name][2].append((labels, record[key]))
+
+    lines = []
+    for name, (kind, help_text, samples) in metrics.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{{{labels}}} {float(value):.6g}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHub:
+    """
+    Ponto central das métricas de todas as câmeras.
+      - grava registros JSON Lines por sessão a cada METRICS_LOG_INTERVAL segundos
+        (uma falha no meio da execução perde no máximo um intervalo);
+      - opcionalmente expõe /metrics (Prometheus) e /metrics.json via HTTP local.
+    Cada câmera registra uma função que retorna o seu registro atual.
+    """
+
+    def __init__(self, log_path=METRICS_LOG_PATH, interval=METRICS_LOG_INTERVAL, http_enabled=METRICS_HTTP_ENABLED,
+                 http_host=METRICS_HTTP_HOST, http_port=METRICS_HTTP_PORT):
+        self.session_id = new_session_id()
+        self.log_path = log_path
+        self.interval = interval
+        self.http_enabled = http_enabled
+        self.http_address = (http_host, http_port)
+        self._sources = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._server = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metricas", daemon=True)
+        self._thread.start()
+        if self.http_enabled:
+            self._start_http_server()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def register(self, key, record_fn):
+        with self._lock:
+            self._sources[key] = record_fn
+
+    def unregister(self, key, final=True):
+        """Remove a fonte; com 'final', grava um último registro dela antes."""
+        with self._lock:
+            record_fn = self._sources.pop(key, None)
+        if record_fn and final:
+            record = self._build(record_fn, "final")
+            if record:
+                append_records(self.log_path, [record])
+
+    def snapshot(self, kind="periodic"):
+        with self._lock:
+            sources = list(self._sources.values())
+        records = [self._build(record_fn, kind) for record_fn in sources]
+        return [record for record in records if record]
+
+    def _build(self, record_fn, kind):
+        try:
+            record = record_fn()
+        except Exception as e:
+            print(f"Erro ao coletar métricas: {e}")
+            return None
+        if not record:
+            return None
+        record.update({"session_id": self.session_id, "record": kind, "timestamp": time.time()})
+        return record
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                append_records(self.log_path, self.snapshot())
+            except OSError as e:
+                print(f"Erro ao gravar métricas em {self.log_path}: {e}")
+
+    def _start_http_server(self):
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = format_prometheus(hub.snapshot("live")).encode()
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(hub.snapshot("live")).encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # sem log por requisição no console
+
+        try:
+            self._server = ThreadingHTTPServer(self.http_address, Handler)
+        except OSError as e:
+            print(f"Não foi possível abrir o endpoint de métricas em {self.http_address}: {e}")
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metricas-http", daemon=True).start()
+        print(f"Métricas disponíveis em http://{self.http_address[0]}:{self.http_address[1]}/metrics")
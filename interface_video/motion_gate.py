@@ -0,0 +1,158 @@
+import threading
+
+import cv2
+import numpy as np
+
+from algoritmos.base import Detections, DetectorWrapper
+from algoritmos.frame_format import to_gray
+from algoritmos.preprocessing import FrameCache
+from config import (MOTION_GATE_WIDTH, MOTION_THRESHOLD, MOTION_MIN_AREA, MOTION_REGION_MARGIN,
+                    MOTION_FULL_FRAME_RATIO, MOTION_FULL_REFRESH_FRAMES)
+
+
+def _boxes_overlap(box_a, box_b):
+    ax, ay, aw, ah = box_a
+    bx, by, bw, bh = box_b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+def merge_boxes(boxes):
+    """Une caixas (x, y, w, h) sobrepostas até não haver mais sobreposição."""
+    boxes = list(boxes)
+    merged = True
+    while merged:
+        merged = False
+        result = []
+        while boxes:
+            x, y, w, h = boxes.pop()
+            i = 0
+            while i < len(boxes):
+                if _boxes_overlap((x, y, w, h), boxes[i]):
+                    bx, by, bw, bh = boxes.pop(i)
+                    x0, y0 = min(x, bx), min(y, by)
+                    x1, y1 = max(x + w, bx + bw), max(y + h, by + bh)
+                    x, y, w, h = x0, y0, x1 - x0, y1 - y0
+                    merged = True
+                else:
+                    i += 1
+            result.append((x, y, w, h))
+        boxes = result
+    return boxes
+
+
+class MotionRegionFinder:
+    """
+    Regiões com movimento num frame, por diferença contra um fundo de média móvel
+    calculado numa versão reduzida e em tons de cinza. Guarda o fundo, então é por câmera.
+    """
+
+    def __init__(self, gate_width=MOTION_GATE_WIDTH, threshold=MOTION_THRESHOLD, min_area=MOTION_MIN_AREA,
+                 margin=MOTION_REGION_MARGIN, full_frame_ratio=MOTION_FULL_FRAME_RATIO, learning_rate=0.05):
+        self.gate_width = gate_width
+        self.threshold = threshold
+        self.min_area = min_area
+        self.margin = margin
+        self.full_frame_ratio = full_frame_ratio
+        self.learning_rate = learning_rate
+        self.background = None
+        self.dilate_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+    def find(self, gray):
+        """
+        Retorna a lista de regiões com movimento (vazia se a cena está parada),
+        ou None quando o frame inteiro deve ser processado.
+        """
+        frame_h, frame_w = gray.shape[:2]
+        scale = min(1.0, self.gate_width / float(frame_w))
+        small = cv2.resize(gray, (max(1, int(frame_w * scale)), max(1, int(frame_h * scale))),
+                           interpolation=cv2.INTER_AREA)
+        small = cv2.GaussianBlur(small, (5, 5), 0)
+
+        if self.background is None or self.background.shape != small.shape:
+            self.background = small.astype(np.float32)
+            return None
+
+        diff = cv2.absdiff(small, cv2.convertScaleAbs(self.background))
+        cv2.accumulateWeighted(small, self.background, self.learning_rate)
+        _, mask = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        mask = cv2.dilate(mask, self.dilate_kernel, iterations=2)
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        min_area = self.min_area * small.shape[0] * small.shape[1]
+        boxes = []
+        for contour in contours:
+            if cv2.contourArea(contour) < min_area:
+                continue
+            x, y, w, h = cv2.boundingRect(contour)
+            # Volta para a escala do frame, com margem para a face caber inteira no recorte.
+            pad_x, pad_y = w * self.margin, h * self.margin
+            x0 = max(0, int((x - pad_x) / scale))
+            y0 = max(0, int((y - pad_y) / scale))
+            x1 = min(frame_w, int((x + w + pad_x) / scale))
+            y1 = min(frame_h, int((y + h + pad_y) / scale))
+            boxes.append((x0, y0, x1 - x0, y1 - y0))
+
+        boxes = merge_boxes(boxes)
+        area = sum(w * h for _, _, w, h in boxes)
+        if area > self.full_frame_ratio * frame_w * frame_h:
+            return None
+        return boxes
+
+
+class MotionGatedDetector(DetectorWrapper):
+    """
+    Porteiro de movimento na frente de qualquer detector.
+    Usa um MotionRegionFinder sobre o frame:
+      - sem movimento: o detector não roda e o último resultado é reutilizado;
+      - com movimento: o detector roda só nas regiões alteradas (dilatadas e com margem)
+        e as caixas são levadas de volta às coordenadas do frame.
+    A cada MOTION_FULL_REFRESH_FRAMES frames o frame inteiro é detectado de novo para corrigir desvios.
+    Guarda estado, então cada câmera precisa da sua própria instância.
+    """
+
+    def __init__(self, detector, detector_lock=None, gate_width=MOTION_GATE_WIDTH, threshold=MOTION_THRESHOLD,
+                 min_area=MOTION_MIN_AREA, margin=MOTION_REGION_MARGIN, full_frame_ratio=MOTION_FULL_FRAME_RATIO,
+                 full_refresh_frames=MOTION_FULL_REFRESH_FRAMES, learning_rate=0.05):
+        super().__init__(detector)
+        self.detector_lock = detector_lock or threading.Lock()
+        self.motion = MotionRegionFinder(gate_width, threshold, min_area, margin, full_frame_ratio, learning_rate)
+        self.full_refresh_frames = full_refresh_frames
+
+        self.last_detections = Detections()
+        self.frames_since_full = 0
+        self.frames_skipped = 0
+        self.frames_cropped = 0
+        self.frames_full = 0
+
+    def detect(self, frame, frame_format="BGR"):
+        regions = self.motion.find(to_gray(frame, frame_format))
+        self.frames_since_full += 1
+
+        if regions is None or self.frames_since_full >= self.full_refresh_frames:
+            self.frames_full += 1
+            self.frames_since_full = 0
+            with self.detector_lock:
+                self.last_detections = self.detector.detect(frame, frame_format)
+            return self.last_detections
+
+        if not regions:
+            # Cena parada: reaproveita o resultado anterior sem chamar o detector.
+            self.frames_skipped += 1
+            return self.last_detections
+
+        self.frames_cropped += 1
+        # Faces fora das regiões alteradas continuam válidas.
+        previous = self.last_detections
+        keep = np.array([not any(_boxes_overlap(box, region) for region in regions)
+                         for box in previous.boxes.tolist()], dtype=bool)
+        results = [previous.select(keep)] if len(previous) else []
+
+        with self.detector_lock:
+            for x, y, w, h in regions:
+                # O recorte é uma view, sem cópia; as caixas voltam para as coordenadas do frame.
+                crop = FrameCache(frame[y:y + h, x:x + w], frame_format, reference_width=frame.shape[1])
+                crop_detections = self.detector.detect_cached(crop)
+                results.append(crop_detections.offset(x, y))
+
+        self.last_detections = Detections.concatenate(results)
+        return self.last_detections
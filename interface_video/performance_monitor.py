@@ -1,60 +1,209 @@
+import threading
 import time
+from contextlib import contextmanager
+
+import numpy as np
 import psutil
 
+from metrics_export import append_records
+from config import METRICS_WINDOW, CPU_SAMPLE_INTERVAL, FPS_WINDOW_SECONDS, METRICS_LOG_PATH
+
+# Estágios medidos separadamente ao longo do pipeline.
+STAGES = ("capture", "convert", "infer", "recognize", "annotate", "display")
+
+
+class RingBuffer:
+    """Buffer circular de tamanho fixo sobre um array NumPy; 'count' conta todos os valores já inseridos."""
+
+    def __init__(self, capacity, dtype=np.float64):
+        self.values = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def append(self, value):
+        with self._lock:
+            self.values[self.count % self.capacity] = value
+            self.count += 1
+
+    def snapshot(self):
+        """Cópia dos valores guardados, do mais antigo para o mais recente."""
+        with self._lock:
+            n = min(self.count, self.capacity)
+            if self.count <= self.capacity:
+                return self.values[:n].copy()
+            start = self.count % self.capacity
+            return np.concatenate((self.values[start:], self.values[:start]))
+
+    def since(self, count):
+        """Valores inseridos depois que 'count' valores já tinham sido inseridos (até a capacidade)."""
+        snapshot = self.snapshot()
+        new = min(len(snapshot), max(0, self.count - count))
+        return snapshot[len(snapshot) - new:]
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+
+def summarize(values):
+    """Média, percentis e máximo de uma série (em ms)."""
+    if len(values) == 0:
+        return None
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"mean": float(values.mean()), "p50": float(p50), "p95": float(p95),
+            "p99": float(p99), "max": float(values.max())}
+
+
+class CpuSampler:
+    """
+    Amostra o uso de CPU do sistema numa thread própria, a cada 'interval' segundos,
+    em vez de chamar psutil.cpu_percent() a cada frame. Compartilhado por todos os monitores.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, interval=CPU_SAMPLE_INTERVAL, capacity=3600):
+        self.interval = interval
+        self.samples = RingBuffer(capacity)
+        self.timestamps = RingBuffer(capacity)
+        psutil.cpu_percent(interval=None)  # a primeira leitura sempre retorna 0
+        self._thread = threading.Thread(target=self._run, name="cpu-sampler", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.samples.append(psutil.cpu_percent(interval=None))
+            self.timestamps.append(time.monotonic())
+
+    def since(self, start_time):
+        """Amostras coletadas a partir de 'start_time' (relógio monotônico)."""
+        timestamps = self.timestamps.snapshot()
+        samples = self.samples.snapshot()
+        n = min(len(timestamps), len(samples))
+        return samples[-n:][timestamps[-n:] >= start_time] if n else samples[:0]
+
+    def latest(self):
+        samples = self.samples.snapshot()
+        return float(samples[-1]) if len(samples) else 0.0
+
+
 class PerformanceMonitor:
-    def __init__(self):
+    """
+    Registro de métricas com memória limitada.
+    Guarda as últimas METRICS_WINDOW medições de cada estágio em buffers circulares,
+    amostra a CPU por tempo (CpuSampler) e resume com p50/p95/p99/máximo e FPS móvel.
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
         self.start_time = None
-        self.end_time = None
-        self.metrics_history = []
+        self.created_at = time.monotonic()
+        self.stages = {stage: RingBuffer(window) for stage in STAGES}
+        # Instantes de conclusão de cada frame processado, para o FPS móvel.
+        self.frame_times = RingBuffer(window)
+        self.cpu_sampler = CpuSampler.shared()
 
     def start(self):
-        """Inicia a medição de tempo."""
+        """Inicia a medição de tempo da inferência."""
         self.start_time = time.perf_counter()
 
     def stop_and_record(self):
-        """Finaliza a medição, calcula as métricas e as armazena."""
-        self.end_time = time.perf_counter()
-        
-        if self.start_time and self.end_time:
-            processing_time = (self.end_time - self.start_time) * 1000
-            self.metrics_history.append({
-                "processing_time_ms": processing_time,
-                "cpu_percent": psutil.cpu_percent()
-            })
-        
-        # Reseta os tempos para a próxima medição
+        """Finaliza a medição da inferência e registra o frame."""
+        if self.start_time is not None:
+            end_time = time.perf_counter()
+            self.record_stage("infer", (end_time - self.start_time) * 1000)
+            self.frame_times.append(time.monotonic())
+
+        # Reseta o tempo para a próxima medição
         self.start_time = None
-        self.end_time = None
-    
+
+    def record_stage(self, stage, duration_ms):
+        self.stages[stage].append(duration_ms)
+
+    @contextmanager
+    def measure(self, stage):
+        """Mede o bloco 'with' como o estágio indicado."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, (time.perf_counter() - start) * 1000)
+
+    def rolling_fps(self, window_seconds=FPS_WINDOW_SECONDS):
+        """FPS de processamento nos últimos 'window_seconds' segundos."""
+        times = self.frame_times.snapshot()
+        times = times[times >= time.monotonic() - window_seconds]
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
     def get_summary(self):
-        """Calcula a média das métricas registradas."""
-        if not self.metrics_history:
+        """Resumo das métricas registradas (None se nenhum frame foi processado)."""
+        infer = self.stages["infer"].snapshot()
+        if len(infer) == 0:
             return None
-            
-        total_time = sum(m['processing_time_ms'] for m in self.metrics_history)
-        total_cpu = sum(m['cpu_percent'] for m in self.metrics_history)
-        
-        num_frames = len(self.metrics_history)
-        
+
+        latency = summarize(infer)
+        cpu = self.cpu_sampler.since(self.created_at)
+        stages = {}
+        for stage, buffer in self.stages.items():
+            stats = summarize(buffer.snapshot())
+            if stats:
+                stats["count"] = buffer.count
+                stages[stage] = stats
+
         return {
-            "avg_processing_time_ms": total_time / num_frames,
-            "avg_cpu_percent": total_cpu / num_frames,
-            "total_frames": num_frames
+            "avg_processing_time_ms": latency["mean"],
+            "p50_processing_time_ms": latency["p50"],
+            "p95_processing_time_ms": latency["p95"],
+            "p99_processing_time_ms": latency["p99"],
+            "max_processing_time_ms": latency["max"],
+            "avg_cpu_percent": float(cpu.mean()) if len(cpu) else self.cpu_sampler.latest(),
+            "fps": self.rolling_fps(),
+            "total_frames": self.stages["infer"].count,
+            "stages": stages,
         }
-        
-    def save_to_file(self, algorithm_name, settings):
-        """Salva o resumo em um arquivo de texto."""
+
+    def build_record(self, algorithm_name, settings, pipeline_stats=None):
+        """
+        Registro plano (uma linha de JSON/CSV) com as configurações da câmera e o resumo atual.
+        Retorna None se nenhum frame foi processado.
+        """
         summary = self.get_summary()
         if not summary:
-            return
-
-        filename = "performance_log.txt"
-        with open(filename, "a") as f: # Abre em modo 'append' para não sobrescrever
-            f.write("--- Relatório de Desempenho ---\n")
-            f.write(f"Algoritmo: {algorithm_name}\n")
-            f.write(f"Resolução: {settings['width']}x{settings['height']}\n")
-            f.write(f"FPS Alvo: {settings['desired_fps']}\n")
-            f.write(f"Frames Processados: {summary['total_frames']}\n")
-            f.write(f"Tempo Médio de Processamento: {summary['avg_processing_time_ms']:.2f} ms\n")
-            f.write(f"Uso Médio da CPU: {summary['avg_cpu_percent']:.2f} %\n")
-            f.write("-" * 30 + "\n\n")
\ No newline at end of file
+            return None
+        record = {
+            "camera_index": settings.get("camera_index"),
+            "algorithm": algorithm_name,
+            "resolution": f"{settings['width']}x{settings['height']}",
+            "target_fps": settings["desired_fps"],
+            "detection_interval": settings.get("detection_interval", 1),
+            "detection_scale": settings.get("detection_scale", 1.0),
+            "fps": summary["fps"],
+            "total_frames": summary["total_frames"],
+            "latency_mean_ms": summary["avg_processing_time_ms"],
+            "latency_p50_ms": summary["p50_processing_time_ms"],
+            "latency_p95_ms": summary["p95_processing_time_ms"],
+            "latency_p99_ms": summary["p99_processing_time_ms"],
+            "latency_max_ms": summary["max_processing_time_ms"],
+            "cpu_percent": summary["avg_cpu_percent"],
+            "stages": summary["stages"],
+        }
+        if pipeline_stats:
+            record.update(pipeline_stats)
+        return record
+
+    def save_to_file(self, algorithm_name, settings, filename=METRICS_LOG_PATH, pipeline_stats=None):
+        """Acrescenta o registro atual ao arquivo (.csv ou JSON Lines)."""
+        record = self.build_record(algorithm_name, settings, pipeline_stats)
+        if record:
+            record["timestamp"] = time.time()
+            append_records(filename, [record])
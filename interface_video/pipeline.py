@@ -0,0 +1,278 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from annotation import Annotator
+from config import PIPELINE_QUEUE_SIZE
+from frame_scheduler import FrameScheduler
+from rate_limited_log import RateLimitedLog
+
+
+class DropOldestQueue:
+    """
+    Fila limitada entre os estágios do pipeline.
+    Quando está cheia, o item mais antigo é descartado para dar lugar ao novo,
+    assim um estágio lento nunca bloqueia o estágio anterior.
+    on_drop(item) é chamado para cada item descartado (inclusive por clear()).
+    """
+
+    def __init__(self, maxsize=PIPELINE_QUEUE_SIZE, on_drop=None):
+        self.maxsize = max(1, maxsize)
+        self.on_drop = on_drop
+        self._items = deque()
+        self._condition = threading.Condition()
+        self.dropped = 0
+
+    def _drop(self, item):
+        if self.on_drop:
+            self.on_drop(item)
+
+    def put(self, item):
+        with self._condition:
+            if len(self._items) >= self.maxsize:
+                self._drop(self._items.popleft())
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """Retira o item mais antigo, esperando até 'timeout' segundos. Retorna None se a fila continuar vazia."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._items, timeout):
+                return None
+            return self._items.popleft()
+
+    def get_latest(self):
+        """Retira apenas o item mais recente (sem bloquear) e descarta os anteriores."""
+        with self._condition:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            for old in self._items:
+                self._drop(old)
+            self._items.clear()
+            return item
+
+    def clear(self):
+        with self._condition:
+            for item in self._items:
+                self._drop(item)
+            self._items.clear()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._items)
+
+
+class FramePacket:
+    """
+    Frame em trânsito pelo pipeline, com o resultado da detecção (Detections) quando já processado.
+    'detection_frame' é o frame entregue ao detector: o próprio 'frame' ou o stream 'lores' da câmera.
+    Os frames são buffers do anel da câmera: quem consome o pacote por último o devolve com
+    FramePipeline.release_packet().
+    """
+
+    __slots__ = ("frame_id", "timestamp", "frame", "frame_format", "detection_frame", "detection_format", "detections",
+                 "identities")
+
+    def __init__(self, frame_id, timestamp, frame, frame_format="BGR", detection_frame=None,
+                 detection_format=None, detections=None, identities=None):
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.frame = frame
+        self.frame_format = frame_format
+        self.detection_frame = frame if detection_frame is None else detection_frame
+        self.detection_format = detection_format or frame_format
+        self.detections = detections
+        # (identidade ou None, semelhança) por face, com o estágio de reconhecimento ativo.
+        self.identities = identities
+
+
+class FramePipeline:
+    """
+    Pipeline produtor/consumidor de uma câmera:
+      captura (thread) -> fila -> detecção (thread) -> fila -> exibição (loop do Tk).
+    Cada estágio roda no seu próprio ritmo; a GUI só consome o último frame pronto.
+    """
+
+    def __init__(self, camera, face_recognizer, desired_fps, real_camera_fps=30,
+                 performance_monitor=None, detector_lock=None, queue_size=PIPELINE_QUEUE_SIZE, name="camera",
+                 annotator=None, scheduler=None, recognizer=None):
+        self.camera = camera
+        self.desired_fps = desired_fps
+        self.real_camera_fps = real_camera_fps
+        # Escolhe quais frames vão para a detecção pelos instantes de captura.
+        self.scheduler = scheduler or FrameScheduler(desired_fps)
+        self.performance_monitor = performance_monitor
+        # O mesmo detector pode ser compartilhado entre câmeras; o lock evita chamadas concorrentes.
+        self.set_detector(face_recognizer, detector_lock)
+        # Fração da resolução entregue ao detector (ajustada pelo controle adaptativo de qualidade).
+        self.detection_scale = 1.0
+        self.name = name
+        # Formato de pixel entregue pela câmera (BGR, RGB ou GRAY), repassado ao detector e à exibição.
+        self.frame_format = getattr(camera, "output_format", "BGR")
+        # Estágio de anotação separado da inferência; pode ser desligado para execuções sem tela.
+        self.annotator = annotator or Annotator()
+        # Reconhecimento opcional (recognition.FaceRecognizer), no frame de exibição em resolução cheia.
+        self.recognizer = recognizer
+
+        # Erros por frame (câmera desconectada, detector falhando) não inundam o console.
+        self.log = RateLimitedLog(name)
+
+        # Pacotes descartados pelas filas devolvem os buffers à câmera.
+        self.capture_queue = DropOldestQueue(queue_size, on_drop=self.release_packet)
+        self.result_queue = DropOldestQueue(queue_size, on_drop=self.release_packet)
+
+        self._stop_event = threading.Event()
+        self._threads = []
+        self.frames_captured = 0
+        self.frames_processed = 0
+
+    def start(self):
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name=f"{self.name}-captura", daemon=True),
+            threading.Thread(target=self._detection_loop, name=f"{self.name}-deteccao", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=2.0):
+        """Sinaliza o fim das threads e espera que terminem."""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.capture_queue.clear()
+        self.result_queue.clear()
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def set_detector(self, face_recognizer, detector_lock=None):
+        """Troca o detector em uso; vale a partir do próximo frame, sem parar as threads."""
+        self._detector = (face_recognizer, detector_lock or threading.Lock())
+
+    @property
+    def face_recognizer(self):
+        return self._detector[0]
+
+    @property
+    def detector_lock(self):
+        return self._detector[1]
+
+    def get_latest_result(self):
+        """
+        Chamado pela GUI: retorna o último FramePacket processado, ou None se não houver novidade.
+        A GUI devolve o pacote com release_packet() depois de exibi-lo.
+        """
+        return self.result_queue.get_latest()
+
+    def release_packet(self, packet):
+        """Devolve ao anel da câmera os frames do pacote; chamadas repetidas não têm efeito."""
+        if packet.frame is not None:
+            self.camera.release_frame(packet.frame, packet.detection_frame)
+        packet.frame = None
+        packet.detection_frame = None
+
+    def get_stats(self):
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_processed": self.frames_processed,
+            "dropped_capture": self.capture_queue.dropped,
+            "dropped_display": self.result_queue.dropped,
+            "camera_fps": getattr(self.camera, "measured_fps", 0.0) or self.real_camera_fps,
+            "frames_overwritten": getattr(self.camera, "frames_overwritten", 0),
+            **self.scheduler.stats(),
+        }
+
+    def _capture_loop(self):
+        frame_counter = 0
+        while not self._stop_event.is_set():
+            capture_start = time.perf_counter()
+            try:
+                if getattr(self.camera, "dual_stream", False):
+                    ret, frame, detection_frame = self.camera.get_frame_pair()
+                else:
+                    ret, frame = self.camera.get_frame()
+                    detection_frame = frame
+            except Exception as e:
+                self.log.log("captura", f"Erro na captura: {e}")
+                ret, frame = False, None
+
+            if not ret:
+                # Evita girar em falso enquanto a câmera não entrega frames.
+                self._stop_event.wait(0.01)
+                continue
+
+            if self.performance_monitor:
+                self.performance_monitor.record_stage("capture", (time.perf_counter() - capture_start) * 1000)
+            frame_counter += 1
+            self.frames_captured += 1
+            timestamp = getattr(self.camera, "last_timestamp", None) or time.monotonic()
+            if self.scheduler.should_process(timestamp):
+                detection_format = getattr(self.camera, "active_detection_format", self.frame_format)
+                self.capture_queue.put(FramePacket(frame_counter, time.monotonic(), frame, self.frame_format,
+                                                   detection_frame, detection_format))
+            else:
+                self.camera.release_frame(frame, detection_frame)
+
+    def _detection_loop(self):
+        while not self._stop_event.is_set():
+            packet = self.capture_queue.get(timeout=0.1)
+            if packet is None:
+                continue
+
+            # Lidos juntos: a troca de detector pode acontecer entre dois frames.
+            face_recognizer, detector_lock = self._detector
+            detection_frame = packet.detection_frame
+            if self.detection_scale < 1.0:
+                h, w = detection_frame.shape[:2]
+                size = (max(1, int(w * self.detection_scale)), max(1, int(h * self.detection_scale)))
+                detection_frame = cv2.resize(detection_frame, size, interpolation=cv2.INTER_AREA)
+
+            try:
+                with detector_lock:
+                    if self.performance_monitor:
+                        self.performance_monitor.start()
+                    infer_start = time.perf_counter()
+                    detections = face_recognizer.detect(detection_frame, packet.detection_format)
+                    self.scheduler.record_processing(time.perf_counter() - infer_start)
+                    if self.performance_monitor:
+                        self.performance_monitor.stop_and_record()
+            except Exception as e:
+                self.log.log("deteccao", f"Erro na detecção: {e}")
+                self.release_packet(packet)
+                continue
+
+            if detection_frame is not packet.frame:
+                # Detecção feita no 'lores' ou em escala reduzida: leva as caixas para as coordenadas do 'main'.
+                scale_x = packet.frame.shape[1] / detection_frame.shape[1]
+                scale_y = packet.frame.shape[0] / detection_frame.shape[0]
+                detections = detections.scaled(scale_x, scale_y)
+            if packet.detection_frame is not packet.frame:
+                # O 'lores' não é mais usado: volta ao anel antes da anotação e da exibição.
+                self.camera.release_frame(packet.detection_frame)
+            packet.detection_frame = None
+            if self.recognizer and len(detections):
+                try:
+                    recognize_start = time.perf_counter()
+                    detections, packet.identities = self.recognizer.recognize(packet.frame, packet.frame_format,
+                                                                              detections)
+                    if self.performance_monitor:
+                        self.performance_monitor.record_stage(
+                            "recognize", (time.perf_counter() - recognize_start) * 1000)
+                except Exception as e:
+                    self.log.log("reconhecimento", f"Erro no reconhecimento: {e}")
+            if self.performance_monitor and self.annotator.enabled:
+                with self.performance_monitor.measure("annotate"):
+                    self.annotator.draw(packet.frame, detections, face_recognizer, packet.identities)
+            else:
+                self.annotator.draw(packet.frame, detections, face_recognizer, packet.identities)
+            packet.detections = detections
+            self.frames_processed += 1
+            self.result_queue.put(packet)
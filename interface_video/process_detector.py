@@ -0,0 +1,258 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import resource_tracker, shared_memory
+
+import cv2
+import numpy as np
+
+from algoritmos.base import FaceDetector
+from algoritmos.registry import create_detector, STARTUP_TIMES
+from config import PROCESS_DETECTOR_WORKERS, PROCESS_DETECTOR_SLOTS_PER_WORKER, PROCESS_DETECTOR_TIMEOUT
+
+
+def _limit_worker_threads():
+    # Cada processo já ocupa um núcleo; threads internas do OpenCV/PyTorch só disputariam CPU entre si.
+    cv2.setNumThreads(1)
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def _run_task(detector, shm, shape, dtype, frame_format):
+    """Executa o detector sobre o frame que está na memória compartilhada."""
+    frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return detector.detect(frame, frame_format)
+
+
+def _attach(shm_name):
+    """
+    Mapeia um bloco criado pelo processo principal. O dono é o principal (que faz o unlink): sem isso,
+    o resource_tracker do trabalhador também o registraria e, ao sair, acusaria vazamento ou o removeria de novo.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=shm_name, track=False)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _worker_main(worker_id, detector_name, detector_kwargs, task_queue, result_queue):
+    """Loop de um processo trabalhador: carrega seu próprio modelo e atende tarefas até receber None."""
+    _limit_worker_threads()
+    try:
+        detector = create_detector(detector_name, **detector_kwargs)
+    except Exception as e:
+        result_queue.put(("init_error", worker_id, repr(e)))
+        return
+    # O processo principal não importa o backend; recebe daqui o que precisa saber sobre ele.
+    result_queue.put(("ready", worker_id, {
+        "algorithm_name": detector.algorithm_name,
+        "input_format": detector.input_format,
+        "label": detector.label,
+        "color": detector.color,
+        "has_scores": detector.has_scores,
+        "startup_times": STARTUP_TIMES.get(detector_name, {}),
+    }))
+
+    attached = {}  # slot_index -> SharedMemory já mapeada neste processo
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        task_id, slot_index, shm_name, shape, dtype, frame_format = task
+        shm = attached.get(slot_index)
+        if shm is None or shm.name != shm_name:
+            # O slot foi recriado pelo processo principal (frame maior); troca o mapeamento.
+            if shm is not None:
+                shm.close()
+            shm = _attach(shm_name)
+            attached[slot_index] = shm
+
+        try:
+            detections = _run_task(detector, shm, shape, dtype, frame_format)
+            result_queue.put(("result", task_id, detections))
+        except Exception as e:
+            result_queue.put(("error", task_id, repr(e)))
+
+    for shm in attached.values():
+        shm.close()
+
+
+class ProcessDetectorService(FaceDetector):
+    """
+    Serviço de detecção com um processo trabalhador por núcleo.
+    Cada processo importa o backend e carrega sua própria instância do detector, evitando o GIL;
+    o processo principal nunca importa o backend.
+    Os frames trafegam por blocos de memória compartilhada; apenas os metadados e o
+    resultado (Detections, pequeno) passam pelas filas.
+
+    Expõe o mesmo 'detect(frame)' dos detectores, podendo ser chamado
+    ao mesmo tempo por várias threads (uma por câmera).
+    """
+
+    def __init__(self, detector_name, detector_kwargs=None, num_workers=PROCESS_DETECTOR_WORKERS,
+                 slots_per_worker=PROCESS_DETECTOR_SLOTS_PER_WORKER):
+        self.detector_name = detector_name
+        self.detector_kwargs = detector_kwargs or {}
+        self.num_workers = num_workers or os.cpu_count() or 1
+        # Preenchidos com os dados enviados pelos processos quando ficam prontos.
+        self._algorithm_name = detector_name
+        self.worker_startup_times = {}
+
+        # 'spawn' evita fazer fork de um processo que já tem Tk e threads ativas.
+        self._ctx = mp.get_context("spawn")
+        self._task_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+        self._workers = []
+
+        num_slots = self.num_workers * max(1, slots_per_worker)
+        self._slots = [None] * num_slots
+        self._free_slots = queue.Queue()
+        for slot_index in range(num_slots):
+            self._free_slots.put(slot_index)
+
+        self._pending = {}  # task_id -> (Future, slot_index)
+        self._pending_lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._collector = None
+        self._started = False
+
+    @property
+    def algorithm_name(self):
+        return self._algorithm_name
+
+    def start(self, timeout=120):
+        """Inicia os processos e espera todos carregarem o modelo."""
+        if self._started:
+            return
+        for worker_id in range(self.num_workers):
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(worker_id, self.detector_name, self.detector_kwargs, self._task_queue, self._result_queue),
+                name=f"detector-{worker_id}",
+                daemon=True,
+            )
+            process.start()
+            self._workers.append(process)
+
+        for _ in range(self.num_workers):
+            kind, worker_id, payload = self._result_queue.get(timeout=timeout)
+            if kind == "init_error":
+                self.shutdown()
+                raise RuntimeError(f"Falha ao carregar {self.detector_name} no processo {worker_id}: {payload}")
+            self._algorithm_name = payload["algorithm_name"]
+            self.input_format = payload["input_format"]
+            self.label = payload["label"]
+            self.color = payload["color"]
+            self.has_scores = payload["has_scores"]
+            self.worker_startup_times[worker_id] = payload["startup_times"]
+
+        self._collector = threading.Thread(target=self._collect_results, name="detector-resultados", daemon=True)
+        self._collector.start()
+        self._started = True
+        print(f"{self.num_workers} processos de detecção ({self.algorithm_name}) prontos.")
+
+    def submit(self, frame, frame_format="BGR"):
+        """Copia o frame para um slot livre de memória compartilhada e agenda a detecção. Retorna um Future."""
+        if not self._started:
+            raise RuntimeError("ProcessDetectorService não foi iniciado.")
+
+        try:
+            slot_index = self._free_slots.get(timeout=PROCESS_DETECTOR_TIMEOUT)
+        except queue.Empty:
+            raise FutureTimeoutError("Nenhum slot de memória compartilhada livre.") from None
+        shm = self._get_slot(slot_index, frame.nbytes)
+        view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)
+        np.copyto(view, frame)
+        del view
+
+        future = Future()
+        task_id = next(self._task_ids)
+        with self._pending_lock:
+            self._pending[task_id] = (future, slot_index)
+        self._task_queue.put((task_id, slot_index, shm.name, frame.shape, frame.dtype.str, frame_format))
+        return future
+
+    def detect(self, frame, frame_format="BGR"):
+        future = self.submit(frame, frame_format)
+        try:
+            return future.result(timeout=PROCESS_DETECTOR_TIMEOUT)
+        except FutureTimeoutError:
+            self._abandon(future)
+            raise
+
+    def _abandon(self, future):
+        """
+        Desiste de um pedido sem resposta (processo travado ou lento): o slot volta a circular e uma
+        resposta tardia é ignorada. Sem isso, cada tempo esgotado prenderia um slot para sempre.
+        """
+        with self._pending_lock:
+            for task_id, (pending, slot_index) in self._pending.items():
+                if pending is future:
+                    del self._pending[task_id]
+                    self._free_slots.put(slot_index)
+                    break
+        future.cancel()
+
+    def shutdown(self):
+        """Encerra os processos e libera a memória compartilhada."""
+        for _ in self._workers:
+            self._task_queue.put(None)
+        for process in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._workers = []
+
+        if self._collector is not None:
+            self._result_queue.put(("stop", None, None))
+            self._collector.join(timeout=2)
+            self._collector = None
+
+        with self._pending_lock:
+            for future, _ in self._pending.values():
+                future.set_exception(RuntimeError("ProcessDetectorService encerrado."))
+            self._pending.clear()
+
+        for slot_index, shm in enumerate(self._slots):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+                self._slots[slot_index] = None
+        self._started = False
+
+    def _get_slot(self, slot_index, nbytes):
+        shm = self._slots[slot_index]
+        if shm is None or shm.size < nbytes:
+            # Primeiro uso, ou a resolução aumentou: recria o bloco com o novo tamanho.
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._slots[slot_index] = shm
+        return shm
+
+    def _collect_results(self):
+        while True:
+            kind, task_id, payload = self._result_queue.get()
+            if kind == "stop":
+                break
+
+            with self._pending_lock:
+                entry = self._pending.pop(task_id, None)
+            if entry is None:
+                continue
+            future, slot_index = entry
+            self._free_slots.put(slot_index)
+            if kind == "result":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(f"Erro no processo de detecção: {payload}"))
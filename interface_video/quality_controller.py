@@ -0,0 +1,109 @@
+import time
+
+from config import (ADAPTIVE_LEVELS, ADAPTIVE_LATENCY_BUDGET_MS, ADAPTIVE_CPU_CEILING, ADAPTIVE_WINDOW,
+                    ADAPTIVE_DOWN_CHECKS, ADAPTIVE_UP_CHECKS, ADAPTIVE_UP_MARGIN)
+
+
+def build_levels(detection_interval=1, detector_name=None, levels=ADAPTIVE_LEVELS):
+    """
+    Escada de qualidade a partir de ADAPTIVE_LEVELS, do mais caro para o mais barato.
+    O intervalo nunca fica abaixo do escolhido na GUI, um 'detector' igual ao selecionado
+    vira None (usa o detector da câmera) e níveis repetidos são removidos.
+    """
+    ladder = []
+    for level in levels:
+        detector = level.get("detector")
+        normalized = {
+            "scale": float(level.get("scale", 1.0)),
+            "interval": max(int(level.get("interval", 1)), detection_interval),
+            "detector": None if detector == detector_name else detector,
+        }
+        if not ladder or ladder[-1] != normalized:
+            ladder.append(normalized)
+    return ladder
+
+
+def describe_level(level):
+    text = f"escala {level['scale']:.2f}, detecção a cada {level['interval']} frame(s)"
+    if level["detector"]:
+        text += f", detector '{level['detector']}'"
+    return text
+
+
+class QualityController:
+    """
+    Controle em malha fechada da qualidade de uma câmera.
+    A cada check() compara a latência média de detecção recente com o orçamento e a CPU com o teto:
+    acima de qualquer um por ADAPTIVE_DOWN_CHECKS verificações seguidas, desce um nível; com folga
+    nos dois por ADAPTIVE_UP_CHECKS verificações, sobe um. Subir exige mais tempo que descer
+    (histerese), e só contam medições feitas depois da última mudança.
+    """
+
+    def __init__(self, performance_monitor, apply_level, levels, latency_budget_ms=ADAPTIVE_LATENCY_BUDGET_MS,
+                 cpu_ceiling=ADAPTIVE_CPU_CEILING, window=ADAPTIVE_WINDOW, down_checks=ADAPTIVE_DOWN_CHECKS,
+                 up_checks=ADAPTIVE_UP_CHECKS, up_margin=ADAPTIVE_UP_MARGIN):
+        self.performance_monitor = performance_monitor
+        self.apply_level = apply_level
+        self.levels = levels
+        self.latency_budget_ms = latency_budget_ms
+        self.cpu_ceiling = cpu_ceiling
+        self.window = window
+        self.down_checks = down_checks
+        self.up_checks = up_checks
+        self.up_margin = up_margin
+
+        self.level_index = 0
+        self.changes = 0
+        self._over = 0
+        self._under = 0
+        self._mark()
+
+    @property
+    def level(self):
+        return self.levels[self.level_index]
+
+    def _mark(self):
+        self._since_count = self.performance_monitor.stages["infer"].count
+        self._since_time = time.monotonic()
+
+    def measure(self):
+        """(latência média em ms, CPU média em %) desde a última mudança, ou None sem medições suficientes."""
+        latencies = self.performance_monitor.stages["infer"].since(self._since_count)[-self.window:]
+        if len(latencies) < min(self.window, 5):
+            return None
+        cpu = self.performance_monitor.cpu_sampler.since(self._since_time)
+        cpu_percent = float(cpu[-self.window:].mean()) if len(cpu) else self.performance_monitor.cpu_sampler.latest()
+        return float(latencies.mean()), cpu_percent
+
+    def check(self):
+        """Avalia as medições recentes e muda de nível se preciso. Retorna True se mudou."""
+        measurement = self.measure()
+        if measurement is None:
+            return False
+        latency_ms, cpu_percent = measurement
+
+        if latency_ms > self.latency_budget_ms or cpu_percent > self.cpu_ceiling:
+            self._over += 1
+            self._under = 0
+        elif latency_ms < self.latency_budget_ms * self.up_margin and cpu_percent < self.cpu_ceiling * self.up_margin:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self.down_checks and self.level_index < len(self.levels) - 1:
+            return self._set_level(self.level_index + 1, latency_ms, cpu_percent)
+        if self._under >= self.up_checks and self.level_index > 0:
+            return self._set_level(self.level_index - 1, latency_ms, cpu_percent)
+        return False
+
+    def _set_level(self, index, latency_ms, cpu_percent):
+        direction = "reduzida" if index > self.level_index else "aumentada"
+        print(f"Qualidade {direction} (latência {latency_ms:.1f}/{self.latency_budget_ms:.1f} ms, "
+              f"CPU {cpu_percent:.0f}/{self.cpu_ceiling:.0f} %): nível {index}, {describe_level(self.levels[index])}")
+        self.level_index = index
+        self.apply_level(self.levels[index])
+        self.changes += 1
+        self._over = self._under = 0
+        self._mark()
+        return True
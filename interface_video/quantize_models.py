@@ -0,0 +1,97 @@
+"""
+Gera as variantes fp16 e int8 do YOLOv8-face em ONNX a partir do fp32 de export_yolo_onnx.py.
+
+  fp16 -> pesos e ativações em meia precisão (entradas/saídas continuam float32);
+  int8 -> quantização estática (QDQ) do onnxruntime, calibrada com frames reais
+          de QUANT_CALIBRATION_SOURCE, pré-processados exatamente como no detector.
+
+O SSD não precisa de arquivo: o int8 é quantizado pelo próprio cv2.dnn ao carregar
+(veja SSD_PRECISION em config.py). Uso (a partir de interface_video/):
+
+    python quantize_models.py                       # todos os tamanhos, fp16 e int8
+    python quantize_models.py --sizes 320 --precisions int8 --calibration gravacao.mp4
+"""
+import argparse
+import os
+
+import numpy as np
+
+from algoritmos.calibration import load_calibration_frames
+from algoritmos.face_recognition_yolo_onnx import SUPPORTED_INPUT_SIZES, model_path_for, letterbox, to_blob
+from config import QUANT_CALIBRATION_SOURCE, QUANT_CALIBRATION_FRAMES
+
+
+def calibration_blobs(frames, size):
+    blobs = []
+    for frame in frames:
+        canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+        letterbox(frame, canvas)
+        blobs.append(to_blob(canvas))
+    return blobs
+
+
+def convert_fp16(source, target):
+    import onnx
+    from onnxconverter_common import float16
+
+    model = onnx.load(source)
+    model = float16.convert_float_to_float16(model, keep_io_types=True)
+    onnx.save(model, target)
+
+
+def quantize_int8(source, target, blobs):
+    import onnxruntime as ort
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType, quantize_static)
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    input_name = ort.InferenceSession(source, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self._blobs = iter(blobs)
+
+        def get_next(self):
+            blob = next(self._blobs, None)
+            return None if blob is None else {input_name: blob}
+
+    # Inferência de formas e fusões antes de quantizar, como recomenda o onnxruntime.
+    prepared = target + ".pre.onnx"
+    quant_pre_process(source, prepared)
+    try:
+        quantize_static(prepared, target, Reader(), quant_format=QuantFormat.QDQ, per_channel=True,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    finally:
+        os.remove(prepared)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera as variantes fp16/int8 do YOLOv8-face em ONNX.")
+    parser.add_argument("--sizes", nargs="*", type=int, default=list(SUPPORTED_INPUT_SIZES),
+                        choices=SUPPORTED_INPUT_SIZES)
+    parser.add_argument("--precisions", nargs="*", default=["fp16", "int8"], choices=["fp16", "int8"])
+    parser.add_argument("--calibration", default=QUANT_CALIBRATION_SOURCE,
+                        help="vídeo ou diretório de imagens para calibrar o int8")
+    parser.add_argument("--calibration-frames", type=int, default=QUANT_CALIBRATION_FRAMES)
+    args = parser.parse_args()
+
+    frames = None
+    if "int8" in args.precisions:
+        frames = load_calibration_frames(args.calibration, args.calibration_frames)
+        print(f"{len(frames)} frames de calibração carregados de {args.calibration}.")
+
+    for size in args.sizes:
+        source = model_path_for(size)
+        if not os.path.exists(source):
+            print(f"{source} não encontrado; rode export_yolo_onnx.py primeiro.")
+            continue
+        for precision in args.precisions:
+            target = model_path_for(size, precision)
+            if precision == "fp16":
+                convert_fp16(source, target)
+            else:
+                quantize_int8(source, target, calibration_blobs(frames, size))
+            print(f"{size} {precision}: {target} ({os.path.getsize(target) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
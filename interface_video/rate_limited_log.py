@@ -0,0 +1,30 @@
+import threading
+import time
+
+
+class RateLimitedLog:
+    """
+    Mensagens de console com limite de frequência, para eventos que podem ocorrer a cada frame
+    (falhas de captura, frames sobrescritos). Cada chave imprime no máximo uma vez por 'interval'
+    segundos; as repetições suprimidas no intervalo são contadas e informadas na próxima mensagem.
+    """
+
+    def __init__(self, name, interval=5.0):
+        self.name = name
+        self.interval = interval
+        self._last = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def log(self, key, message):
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return
+            self._last[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            message += f" (+{suppressed} ocorrências nos últimos {self.interval:.0f} s)"
+        print(f"[{self.name}] {message}")
@@ -0,0 +1,206 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from algoritmos.base import Detections
+from tracking import assign_track_ids
+from config import (RECOGNITION_GALLERY_PATH, RECOGNITION_THRESHOLD, RECOGNITION_REFRESH_FRAMES,
+                    RECOGNITION_CACHE_MAX_AGE, RECOGNITION_ANN_MIN_SIZE, RECOGNITION_ANN_PROBES)
+
+
+class IVFIndex:
+    """
+    Índice aproximado para galerias grandes (lista invertida): os vetores são agrupados por
+    k-means esférico e a busca compara a consulta só com os grupos dos 'probes' centroides mais
+    próximos. Guarda apenas centroides e a ordem das linhas; os vetores continuam no arquivo mapeado.
+    """
+
+    def __init__(self, centroids, order, offsets):
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, matrix, lists=None, iterations=10, seed=0):
+        count = len(matrix)
+        lists = lists or max(1, int(np.sqrt(count)))
+        rng = np.random.default_rng(seed)
+        # Treina numa amostra: o custo não cresce com a galeria inteira.
+        sample = np.asarray(matrix[np.sort(rng.choice(count, min(count, lists * 64), replace=False))])
+        centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for k in range(lists):
+                members = sample[assignment == k]
+                if len(members):
+                    centroids[k] = members.sum(axis=0)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        # Atribuição de toda a galeria, em blocos para não carregar o arquivo inteiro de uma vez.
+        assignment = np.concatenate([np.argmax(np.asarray(matrix[start:start + 65536]) @ centroids.T, axis=1)
+                                     for start in range(0, count, 65536)])
+        order = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=lists)))).astype(np.int64)
+        return cls(centroids.astype(np.float32), order, offsets)
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, order=self.order, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["centroids"], data["order"], data["offsets"])
+
+    def search(self, matrix, query, probes=RECOGNITION_ANN_PROBES):
+        """(linha, semelhança) do vizinho mais próximo de 'query' (vetor de norma 1)."""
+        nearest_lists = np.argsort(self.centroids @ query)[::-1][:probes]
+        candidates = np.concatenate([self.order[self.offsets[k]:self.offsets[k + 1]] for k in nearest_lists])
+        if not len(candidates):
+            return -1, -1.0
+        candidates.sort()  # leitura sequencial do arquivo mapeado
+        scores = np.asarray(matrix[candidates]) @ query
+        best = int(np.argmax(scores))
+        return int(candidates[best]), float(scores[best])
+
+
+class FaceGallery:
+    """
+    Galeria de identidades conhecidas:
+      <caminho>.npy     -> matriz N×D float32 contígua, linhas de norma 1, aberta com memória mapeada
+                           (só as páginas lidas vão para a RAM; várias câmeras e processos compartilham);
+      <caminho>.json    -> rótulo de cada linha e o extrator que gerou os vetores;
+      <caminho>.ivf.npz -> índice aproximado opcional (IVFIndex).
+    Uma pessoa pode ter várias linhas (fotos diferentes). Gerada por enroll_faces.py.
+    """
+
+    def __init__(self, path=RECOGNITION_GALLERY_PATH, ann_min_size=RECOGNITION_ANN_MIN_SIZE):
+        self.path = path
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        self.labels = np.asarray(meta["labels"], dtype=object)
+        self.embedder = meta.get("embedder")
+        self.matrix = np.load(path + ".npy", mmap_mode="r")
+        if self.matrix.dtype != np.float32 or len(self.matrix) != len(self.labels):
+            raise ValueError(f"Galeria inconsistente em {path}: {self.matrix.shape} {self.matrix.dtype}, "
+                             f"{len(self.labels)} rótulos")
+
+        self.index = None
+        if ann_min_size and len(self.matrix) >= ann_min_size:
+            index_path = path + ".ivf.npz"
+            if os.path.exists(index_path):
+                self.index = IVFIndex.load(index_path)
+            if self.index is None or self.index.offsets[-1] != len(self.matrix):
+                start = time.perf_counter()
+                self.index = IVFIndex.build(self.matrix)
+                self.index.save(index_path)
+                print(f"Índice aproximado da galeria construído em {time.perf_counter() - start:.1f} s.")
+
+    def __len__(self):
+        return len(self.matrix)
+
+    @property
+    def dimension(self):
+        return self.matrix.shape[1]
+
+    def match(self, embeddings):
+        """
+        Vizinho mais próximo de cada embedding (M×D, norma 1).
+        Busca exata: um único produto de matrizes M×D · D×N. Retorna (linhas, semelhanças).
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if not len(embeddings) or not len(self.matrix):
+            return np.full(len(embeddings), -1, dtype=np.int64), np.full(len(embeddings), -1.0, dtype=np.float32)
+        if self.index is not None:
+            results = [self.index.search(self.matrix, query) for query in embeddings]
+            return (np.array([row for row, _ in results], dtype=np.int64),
+                    np.array([score for _, score in results], dtype=np.float32))
+        scores = embeddings @ self.matrix.T
+        rows = np.argmax(scores, axis=1)
+        return rows, scores[np.arange(len(rows)), rows]
+
+    @staticmethod
+    def write(path, labels, embeddings, embedder_name):
+        """Grava uma galeria nova (substitui a anterior e o índice, que será refeito)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        np.save(path + ".npy", matrix)
+        with open(path + ".json", "w") as f:
+            json.dump({"labels": list(labels), "embedder": embedder_name, "dimension": int(matrix.shape[1])}, f)
+        if os.path.exists(path + ".ivf.npz"):
+            os.remove(path + ".ivf.npz")
+
+
+class FaceRecognizer:
+    """
+    Estágio de reconhecimento depois da detecção, um por câmera.
+    O descritor de uma face é calculado quando ela aparece e depois só a cada 'refresh_frames'
+    frames: o resultado fica em cache pelo 'track_id' (do rastreamento ou, sem ele, por sobreposição
+    com as faces do frame anterior). As faces que precisam de descritor num frame vão juntas numa
+    chamada ao extrator e numa busca na galeria.
+    """
+
+    def __init__(self, embedder, gallery, embedder_lock=None, threshold=RECOGNITION_THRESHOLD,
+                 refresh_frames=RECOGNITION_REFRESH_FRAMES, max_age=RECOGNITION_CACHE_MAX_AGE,
+                 iou_threshold=0.3):
+        self.embedder = embedder
+        self.embedder_lock = embedder_lock
+        self.gallery = gallery
+        self.threshold = embedder.default_threshold if threshold is None else threshold
+        self.refresh_frames = refresh_frames
+        self.max_age = max_age
+        self.iou_threshold = iou_threshold
+
+        # track_id -> (identidade ou None, semelhança, embedding, frame do cálculo, último frame visto)
+        self.cache = {}
+        self.frame_counter = 0
+        self.embeddings_computed = 0
+        self._previous = Detections()
+        self._next_track_id = 0
+
+    def reset(self):
+        """Esquece as faces em cache (ex.: quando a origem dos track_ids é trocada)."""
+        self.cache = {}
+        self._previous = Detections()
+
+    def recognize(self, frame, frame_format, detections):
+        """Retorna (detections com track_ids, lista de (identidade ou None, semelhança) por face)."""
+        self.frame_counter += 1
+        if detections.track_ids is None:
+            detections, self._next_track_id = assign_track_ids(detections, self._previous, self._next_track_id,
+                                                               self.iou_threshold)
+        self._previous = detections
+
+        # Referência local: reset() (de outra thread) troca o dicionário sem afetar esta chamada.
+        cache = self.cache
+        track_ids = detections.track_ids.tolist()
+        stale = [i for i, track_id in enumerate(track_ids)
+                 if track_id not in cache or self.frame_counter - cache[track_id][3] >= self.refresh_frames]
+        if stale:
+            boxes = detections.boxes[stale]
+            if self.embedder_lock:
+                with self.embedder_lock:
+                    embeddings = self.embedder.embed(frame, frame_format, boxes)
+            else:
+                embeddings = self.embedder.embed(frame, frame_format, boxes)
+            rows, scores = self.gallery.match(embeddings)
+            self.embeddings_computed += len(stale)
+            for i, embedding, row, score in zip(stale, embeddings, rows.tolist(), scores.tolist()):
+                identity = self.gallery.labels[row] if row >= 0 and score >= self.threshold else None
+                cache[track_ids[i]] = (identity, score, embedding, self.frame_counter, self.frame_counter)
+
+        identities = []
+        for track_id in track_ids:
+            identity, score, embedding, computed, _ = cache[track_id]
+            cache[track_id] = (identity, score, embedding, computed, self.frame_counter)
+            identities.append((identity, score))
+
+        if self.frame_counter % self.max_age == 0:
+            # Descarta faces que saíram de cena.
+            for track_id in [track_id for track_id, entry in cache.items()
+                             if self.frame_counter - entry[4] >= self.max_age]:
+                del cache[track_id]
+        return detections, identities
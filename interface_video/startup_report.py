@@ -0,0 +1,77 @@
+"""
+Relatório do custo de inicialização de cada detector.
+
+Cada backend é medido num processo Python novo, para que as importações de um
+não mascarem as do outro. Uso (a partir de interface_video/):
+
+    python startup_report.py            # todos os detectores
+    python startup_report.py yolo ssd   # apenas os escolhidos
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+
+def _measure_single(name):
+    """Executado no processo filho: importa e carrega um detector, imprimindo as medidas em JSON."""
+    start = time.perf_counter()
+    from algoritmos.registry import create_detector, STARTUP_TIMES
+    registry_s = time.perf_counter() - start
+
+    result = {"name": name, "registry_s": registry_s}
+    try:
+        create_detector(name)
+        result.update(STARTUP_TIMES.get(name, {}))
+    except Exception as e:
+        result["error"] = repr(e)
+    # ru_maxrss é em KiB no Linux.
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print(json.dumps(result))
+
+
+def measure(names):
+    results = []
+    for name in names:
+        completed = subprocess.run([sys.executable, __file__, "--single", name],
+                                   capture_output=True, text=True)
+        lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+        if lines:
+            results.append(json.loads(lines[-1]))
+        else:
+            stderr_lines = completed.stderr.strip().splitlines()
+            results.append({"name": name, "error": stderr_lines[-1] if stderr_lines else "sem saída"})
+    return results
+
+
+def main():
+    from algoritmos.registry import available_detectors
+
+    parser = argparse.ArgumentParser(description="Mede o tempo de importação e de carga de cada detector.")
+    parser.add_argument("detectors", nargs="*", help="nomes registrados (padrão: todos)")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    if args.single:
+        _measure_single(args.single)
+        return
+
+    results = measure(args.detectors or available_detectors())
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'detector':<10} {'importação':>12} {'carga':>10} {'RSS pico':>10}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['name']:<10} erro: {r['error']}")
+            continue
+        print(f"{r['name']:<10} {r.get('import_s', 0) * 1000:>9.1f} ms {r.get('load_s', 0) * 1000:>7.1f} ms "
+              f"{r['peak_rss_mb']:>7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
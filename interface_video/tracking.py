@@ -0,0 +1,155 @@
+import threading
+
+import cv2
+import numpy as np
+
+from algoritmos.base import Detections, DetectorWrapper, iou_matrix
+from algoritmos.frame_format import to_gray
+
+
+class OpticalFlowTracker:
+    """
+    Rastreador leve por fluxo óptico (Lucas-Kanade).
+    Em cada caixa são escolhidos alguns pontos de canto; entre frames, a caixa é
+    deslocada pela mediana do movimento dos pontos e escalada pela mediana da
+    variação de distância ao centróide. Todos os pontos de todas as faces são
+    rastreados numa única chamada ao calcOpticalFlowPyrLK.
+    """
+
+    def __init__(self, max_corners=20, min_points=4):
+        self.max_corners = max_corners
+        self.min_points = min_points
+        self.lk_params = dict(winSize=(15, 15), maxLevel=2,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+        self.prev_gray = None
+        self.detections = Detections()
+        self.points = []  # pontos rastreados de cada face (Nx1x2 float32)
+
+    def init(self, gray, detections):
+        self.prev_gray = gray
+        self.detections = detections
+        self.points = []
+        frame_h, frame_w = gray.shape[:2]
+        for x, y, w, h in detections.boxes.tolist():
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(frame_w, x + w), min(frame_h, y + h)
+            corners = None
+            if x1 - x0 >= 2 and y1 - y0 >= 2:
+                corners = cv2.goodFeaturesToTrack(gray[y0:y1, x0:x1], self.max_corners, 0.01, 3)
+            if corners is None or len(corners) < self.min_points:
+                # Sem textura suficiente: a caixa fica parada até o próximo quadro-chave.
+                corners = np.empty((0, 1, 2), dtype=np.float32)
+            else:
+                corners = corners.astype(np.float32) + np.array([x0, y0], dtype=np.float32)
+            self.points.append(corners)
+
+    def update(self, gray):
+        """Propaga as caixas para o novo frame. Faces que perdem os pontos rastreados são descartadas."""
+        if self.prev_gray is None or not len(self.detections):
+            self.prev_gray = gray
+            return Detections()
+
+        counts = [len(points) for points in self.points]
+        all_points = np.concatenate(self.points)
+        if len(all_points):
+            new_points, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, all_points, None, **self.lk_params)
+            status = status.reshape(-1).astype(bool)
+
+        boxes = self.detections.boxes.astype(np.float32)
+        keep = np.ones(len(boxes), dtype=bool)
+        points = []
+        start = 0
+        for i, count in enumerate(counts):
+            if count == 0:
+                points.append(self.points[i])
+                continue
+            end = start + count
+            ok = status[start:end]
+            old = all_points[start:end][ok].reshape(-1, 2)
+            new = new_points[start:end][ok].reshape(-1, 2)
+            start = end
+            if len(new) < self.min_points:
+                keep[i] = False
+                continue
+
+            dx, dy = np.median(new - old, axis=0)
+            old_dist = np.linalg.norm(old - old.mean(axis=0), axis=1)
+            new_dist = np.linalg.norm(new - new.mean(axis=0), axis=1)
+            valid = old_dist > 1e-3
+            scale = float(np.median(new_dist[valid] / old_dist[valid])) if valid.any() else 1.0
+
+            x, y, w, h = boxes[i]
+            cx, cy = x + w / 2.0 + dx, y + h / 2.0 + dy
+            w, h = w * scale, h * scale
+            boxes[i] = (cx - w / 2, cy - h / 2, w, h)
+            points.append(new.reshape(-1, 1, 2))
+
+        self.prev_gray = gray
+        self.detections = Detections(boxes, self.detections.scores, self.detections.track_ids).select(keep)
+        self.points = points
+        return self.detections
+
+
+def assign_track_ids(detections, previous, next_track_id, iou_threshold=0.3):
+    """
+    Dá a cada detecção o 'track_id' da detecção anterior mais sobreposta (IoU > iou_threshold),
+    ou um id novo. Retorna (Detections com track_ids, próximo id livre).
+    """
+    track_ids = np.full(len(detections), -1, dtype=np.int32)
+    if len(detections) and len(previous) and previous.track_ids is not None:
+        ious = iou_matrix(detections.boxes, previous.boxes)
+        # Associação gulosa pelos maiores IoU.
+        for flat in np.argsort(ious, axis=None)[::-1]:
+            i, j = np.unravel_index(flat, ious.shape)
+            if ious[i, j] <= iou_threshold:
+                break
+            if track_ids[i] < 0 and previous.track_ids[j] not in track_ids:
+                track_ids[i] = previous.track_ids[j]
+
+    for i in np.flatnonzero(track_ids < 0):
+        track_ids[i] = next_track_id
+        next_track_id += 1
+    return Detections(detections.boxes, detections.scores, track_ids), next_track_id
+
+
+class TrackingDetector(DetectorWrapper):
+    """
+    Roda o detector só nos quadros-chave (a cada 'detection_interval' frames) e
+    usa o OpticalFlowTracker para propagar as detecções nos frames intermediários.
+    Guarda estado de rastreamento, então cada câmera precisa da sua própria
+    instância (o detector envolvido pode ser compartilhado).
+    """
+
+    def __init__(self, detector, detection_interval, detector_lock=None, iou_threshold=0.3):
+        super().__init__(detector)
+        self.detection_interval = max(1, int(detection_interval))
+        self.detector_lock = detector_lock or threading.Lock()
+        self.iou_threshold = iou_threshold
+
+        self.tracker = OpticalFlowTracker()
+        self.frame_counter = 0
+        self.next_track_id = 0
+
+    def detect(self, frame, frame_format="BGR"):
+        gray = to_gray(frame, frame_format)
+        if gray is frame:
+            # O rastreador guarda a imagem como referência do próximo passo, e o frame GRAY de entrada
+            # ainda recebe as anotações da exibição: guarda uma cópia própria.
+            gray = frame.copy()
+        is_keyframe = self.frame_counter % self.detection_interval == 0
+        self.frame_counter += 1
+
+        if is_keyframe:
+            with self.detector_lock:
+                detections = self.detector.detect(frame, frame_format)
+            detections = self._assign_track_ids(detections)
+            self.tracker.init(gray, detections)
+            return detections
+
+        return self.tracker.update(gray)
+
+    def _assign_track_ids(self, detections):
+        """Mantém o 'track_id' de faces que continuam sobrepostas às rastreadas anteriormente."""
+        detections, self.next_track_id = assign_track_ids(detections, self.tracker.detections,
+                                                          self.next_track_id, self.iou_threshold)
+        return detections